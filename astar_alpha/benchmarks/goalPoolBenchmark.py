@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+'''
+Benchmark comparing serial Astar searches with a GoalPool when
+picking the cheapest of several candidate goals. Reports the
+wall time for each and the cheapest goal found.
+
+Run from the astar_alpha directory with the nodes on the path:
+
+    PYTHONPATH=nodes python benchmarks/goalPoolBenchmark.py
+'''
+import random
+import time
+
+from astar import Astar
+from goal_pool import GoalPool, pathCost
+
+CORNER1 = (-6.25,8.2)
+CORNER2 = (15.75,28.2)
+NUMCELLS = 200
+DENSITY = 0.15
+NUMGOALS = [4, 8, 16]
+PROCESSES = [2, 4]
+
+def makeQuery(searcher, numGoals):
+    random.seed(numGoals)
+    numCells = searcher.numCells
+    grid = searcher.createGrid()
+    for i in range(int(DENSITY*numCells*numCells)):
+        grid[random.randint(0,numCells-1)][random.randint(0,numCells-1)] = -1
+
+    start = searcher.transformGridToMap((0,0))
+    goals = list()
+    for i in range(numGoals):
+        point = (random.randint(numCells//2,numCells-1), random.randint(0,numCells-1))
+        grid[point[0]][point[1]] = 0
+        goals.append(searcher.transformGridToMap(point))
+    grid[0][0] = 0
+    return (grid, start, goals)
+
+def main():
+    searcher = Astar(CORNER1,CORNER2,NUMCELLS)
+
+    print "%-6s %-10s %10s %8s" % ('goals', 'planner', 'time (ms)', 'best')
+    for numGoals in NUMGOALS:
+        (grid, start, goals) = makeQuery(searcher, numGoals)
+        searcher.grid = grid
+
+        startTime = time.time()
+        costs = list()
+        for goal in goals:
+            searcher.computePath(start, goal)
+            costs.append(pathCost(searcher))
+        serial = time.time() - startTime
+
+        results = list()
+        for processes in PROCESSES:
+            pool = GoalPool(CORNER1,CORNER2,NUMCELLS,processes=processes)
+            try:
+                pool.updateGrid(grid)
+                startTime = time.time()
+                best = pool.cheapest(start, goals)
+                results.append((processes, time.time() - startTime, best))
+            finally:
+                pool.close()
+
+        print "%-6i %-10s %10.1f %8i" % (numGoals, 'serial', 1000*serial, costs.index(min(costs)))
+        for (processes, elapsed, best) in results:
+            print "%-6i %-10s %10.1f %8i" % (numGoals, 'pool(%i)' % processes, 1000*elapsed, best[0])
+
+if __name__ == '__main__':
+    main()
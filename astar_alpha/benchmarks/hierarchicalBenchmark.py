@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+'''
+Benchmark comparing Astar with HierarchicalAstar as the grid
+gets finer. Reports expanded cells, wall time and path cost for
+a query between opposite corners of the arena.
+
+The default arena is 22 m wide, so 440 cells is about a
+0.05 m cell size.
+
+Run from the astar_alpha directory with the nodes on the path:
+
+    PYTHONPATH=nodes python benchmarks/hierarchicalBenchmark.py
+'''
+import random
+import time
+
+from astar import Astar
+from hierarchical import HierarchicalAstar
+from plannerBenchmark import pathCost
+
+CORNER1 = (-6.25,8.2)
+CORNER2 = (15.75,28.2)
+NUMCELLS = [50, 110, 220, 440]
+DENSITY = 0.15
+NUMWALLS = 2
+
+def makeGrid(searcher, seed):
+    '''
+    Random clutter plus NUMWALLS walls that each leave a gap
+    '''
+    random.seed(seed)
+    numCells = searcher.numCells
+    grid = searcher.createGrid()
+    for i in range(int(DENSITY*numCells*numCells)):
+        grid[random.randint(0,numCells-1)][random.randint(0,numCells-1)] = -1
+
+    for i in range(NUMWALLS):
+        x = (i+1)*numCells//(NUMWALLS+1)
+        gap = random.randint(0,numCells-numCells//10)
+        grid[x,:] = -1
+        grid[x,gap:gap+numCells//10] = 0
+
+    grid[0][0] = 0
+    grid[numCells-1][numCells-1] = 0
+    return grid
+
+def timeSearch(searcher, grid):
+    '''
+    Returns a tuple of (wall time in ms, expansions, path cost)
+    for a query between opposite corners of the arena
+    '''
+    searcher.grid = grid.copy()
+    start = searcher.transformGridToMap((0,0))
+    goal = searcher.transformGridToMap((searcher.numCells-1,searcher.numCells-1))
+
+    startTime = time.time()
+    searcher.computePath(start, goal)
+    elapsed = time.time() - startTime
+
+    return (1000*elapsed, searcher.expansions, pathCost(searcher))
+
+def main():
+    print "%-6s %-20s %10s %12s %8s" % ('cells', 'planner', 'time (ms)', 'expansions', 'cost')
+    for numCells in NUMCELLS:
+        for name,cls in (('Astar', Astar), ('HierarchicalAstar', HierarchicalAstar)):
+            searcher = cls(CORNER1,CORNER2,numCells)
+            grid = makeGrid(searcher, numCells)
+            (elapsed, expansions, cost) = timeSearch(searcher, grid)
+            print "%-6i %-20s %10.1f %12i %8.1f" % (numCells, name, elapsed, expansions, cost)
+
+if __name__ == '__main__':
+    main()
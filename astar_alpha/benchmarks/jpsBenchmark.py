@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+'''
+Benchmark comparing Astar with JumpPointSearch on an open map
+and on cluttered maps. Reports expanded nodes and wall time for
+a query between opposite corners of the grid.
+
+Run from the astar_alpha directory with the nodes on the path:
+
+    PYTHONPATH=nodes python benchmarks/jpsBenchmark.py
+'''
+import random
+import time
+
+from astar import Astar
+from jps import JumpPointSearch
+
+NUMCELLS = [50, 100, 200]
+DENSITIES = [0.0, 0.1, 0.25]
+
+def makeGrid(searcher, density, seed):
+    '''
+    Randomly close density of the cells, leaving the corners open
+    '''
+    random.seed(seed)
+    numCells = searcher.numCells
+    grid = searcher.createGrid()
+    for i in range(int(density*numCells*numCells)):
+        grid[random.randint(0,numCells-1)][random.randint(0,numCells-1)] = -1
+    grid[0][0] = 0
+    grid[numCells-1][numCells-1] = 0
+    return grid
+
+def timeSearch(searcher, grid):
+    '''
+    Returns a tuple of (wall time in ms, expansions, path length)
+    for a query between the lower left and upper right cells
+    '''
+    numCells = searcher.numCells
+    searcher.grid = grid.copy()
+
+    start = time.time()
+    searcher.computePath((0.5,0.5),(numCells-0.5,numCells-0.5))
+    elapsed = time.time() - start
+
+    return (1000*elapsed, searcher.expansions, len(searcher.path))
+
+def main():
+    print "%-6s %8s %-16s %10s %12s %8s" % ('cells', 'density', 'planner', 'time (ms)', 'expansions', 'length')
+    for numCells in NUMCELLS:
+        for density in DENSITIES:
+            for name,cls in (('Astar', Astar), ('JumpPointSearch', JumpPointSearch)):
+                searcher = cls((0,0),(numCells,numCells),numCells)
+                grid = makeGrid(searcher, density, numCells)
+                (elapsed, expansions, length) = timeSearch(searcher, grid)
+                print "%-6i %8.2f %-16s %10.1f %12i %8i" % (numCells, density, name, elapsed, expansions, length)
+
+if __name__ == '__main__':
+    main()
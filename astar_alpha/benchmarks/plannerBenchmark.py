@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+'''
+Benchmark suite for the planners that doesn't need ROS.
+
+Generates reproducible random, maze and corridor maps, plans
+between opposite corners with each planner and writes the wall
+time, cells expanded, peak memory and path cost as JSON so runs
+from different releases can be compared.
+
+Every case runs in a fresh process so the peak memory of one
+search doesn't hide the next. Peak memory is how far the
+process high water mark (ru_maxrss) rose from just before the
+planner was created to the end of the search, and it is also
+split into the part from creating the planner and the part
+from the search.
+
+Run from the astar_alpha directory with the nodes on the path:
+
+    PYTHONPATH=nodes python benchmarks/plannerBenchmark.py
+    PYTHONPATH=nodes python benchmarks/plannerBenchmark.py --planners astar jps --sizes 50 100 --output results.json
+'''
+import argparse
+import json
+import platform
+import resource
+import sys
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from anytime import AnytimeAstar
+from astar import Astar
+from dstar_lite import DStarLite
+from hierarchical import HierarchicalAstar
+from jps import JumpPointSearch
+
+SIZES = [50, 100, 200, 500, 1000]
+MAPS = ['random', 'maze', 'corridor']
+DENSITIES = [0.1, 0.2, 0.3]
+PLANNERS = ['astar']
+SEED = 19
+
+def makePlanner(name, numCells):
+    '''
+    Planner called name for a numCells grid over (0,0) to (numCells,numCells)
+    so cell (x,y) has its center at (x+.5,y+.5)
+    '''
+    corner1 = (0,0)
+    corner2 = (numCells,numCells)
+    if name == 'astar':
+        return Astar(corner1, corner2, numCells)
+    elif name == 'dstarlite':
+        return DStarLite(corner1, corner2, numCells)
+    elif name == 'jps':
+        return JumpPointSearch(corner1, corner2, numCells)
+    elif name == 'hierarchical':
+        return HierarchicalAstar(corner1, corner2, numCells)
+    elif name == 'anytime':
+        # search until the path is optimal
+        return AnytimeAstar(corner1, corner2, numCells, timeBudget=None)
+    raise ValueError('unknown planner %s' % name)
+
+def randomMap(numCells, density, seed):
+    '''
+    Every cell is an obstacle with probability density
+    '''
+    random = np.random.RandomState(seed)
+    grid = np.zeros((numCells,numCells), dtype=np.int8)
+    grid[random.random_sample((numCells,numCells)) < density] = -1
+    return grid
+
+def mazeMap(numCells, density, seed):
+    '''
+    Perfect maze with 1 cell wide passages on the even cells,
+    carved by a depth first search. density isn't used
+    '''
+    random = np.random.RandomState(seed)
+    grid = np.empty((numCells,numCells), dtype=np.int8)
+    grid.fill(-1)
+
+    grid[0][0] = 0
+    stack = [(0,0)]
+    while len(stack) > 0:
+        (x,y) = stack[-1]
+        options = list()
+        for (dx,dy) in ((2,0),(-2,0),(0,2),(0,-2)):
+            nx = x + dx
+            ny = y + dy
+            if 0 <= nx < numCells and 0 <= ny < numCells and grid[nx][ny] == -1:
+                options.append((nx,ny))
+
+        if len(options) == 0:
+            stack.pop()
+            continue
+
+        (nx,ny) = options[random.randint(len(options))]
+        grid[(x+nx)//2][(y+ny)//2] = 0
+        grid[nx][ny] = 0
+        stack.append((nx,ny))
+
+    # the far corner is on an odd cell when numCells is even
+    end = numCells - 1
+    grid[end][end] = 0
+    grid[end-1][end] = 0
+    grid[end][end-1] = 0
+    return grid
+
+def corridorMap(numCells, density, seed):
+    '''
+    Walls across the grid with a gap at alternating ends so the
+    path has to snake through every corridor, plus clutter with
+    probability density/4 that can close off parts of a corridor
+    '''
+    grid = randomMap(numCells, density/4, seed)
+
+    spacing = max(numCells//10, 3)
+    gap = max(numCells//20, 1)
+    for i,x in enumerate(range(spacing, numCells-1, spacing)):
+        grid[x,:] = -1
+        if i % 2 == 0:
+            grid[x,numCells-gap:] = 0
+        else:
+            grid[x,:gap] = 0
+    return grid
+
+MAKERS = {'random': randomMap, 'maze': mazeMap, 'corridor': corridorMap}
+
+def makeMap(kind, numCells, density, seed):
+    grid = MAKERS[kind](numCells, density, seed)
+    grid[0][0] = 0
+    grid[numCells-1][numCells-1] = 0
+    return grid
+
+def pathCost(searcher):
+    gridPath = searcher.gridPath
+    cost = searcher.costModel.cost
+    return sum([cost(a,b) for a,b in zip(gridPath, gridPath[1:])])
+
+def runCase(case):
+    '''
+    Runs one case, meant to be called in a fresh process
+    '''
+    numCells = case['size']
+    grid = makeMap(case['map'], numCells, case['density'], case['seed'])
+
+    start = (0.5,0.5)
+    goal = (numCells-0.5,numCells-0.5)
+
+    # the planners allocate their workspace when they are
+    # created, so the baseline is taken before that
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    searcher = makePlanner(case['planner'], numCells)
+    searcher.grid = grid
+    constructed = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    startTime = time.time()
+    searcher.computePath(start, goal)
+    elapsed = time.time() - startTime
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    result = dict(case)
+    result['timeMs'] = 1000*elapsed
+    result['expansions'] = searcher.expansions
+    # ru_maxrss is in kilobytes on linux
+    result['peakMemoryBytes'] = 1024*(after - before)
+    result['constructionMemoryBytes'] = 1024*(constructed - before)
+    result['searchMemoryBytes'] = 1024*(after - constructed)
+    result['found'] = len(searcher.path) > 0
+    result['pathLength'] = len(searcher.path)
+    if result['found']:
+        result['pathCost'] = pathCost(searcher)
+    else:
+        result['pathCost'] = None
+    return result
+
+def makeCases(args):
+    cases = list()
+    for size in args.sizes:
+        for kind in args.maps:
+            if kind == 'maze':
+                densities = [0.0]
+            else:
+                densities = args.densities
+            for density in densities:
+                for planner in args.planners:
+                    cases.append({'map': kind, 'size': size, 'density': density,
+                                  'planner': planner, 'seed': args.seed + size})
+    return cases
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the astar_alpha planners')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES,
+                        help='cells per side of the maps')
+    parser.add_argument('--maps', nargs='+', default=MAPS, choices=MAPS)
+    parser.add_argument('--densities', type=float, nargs='+', default=DENSITIES,
+                        help='obstacle densities of the random and corridor maps')
+    parser.add_argument('--planners', nargs='+', default=PLANNERS,
+                        choices=['astar', 'dstarlite', 'jps', 'hierarchical', 'anytime'])
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--output', help='file to write the JSON to instead of stdout')
+    args = parser.parse_args()
+
+    results = list()
+    for case in makeCases(args):
+        # a new process for every case
+        pool = Pool(1)
+        try:
+            result = pool.apply(runCase, (case,))
+        finally:
+            pool.close()
+            pool.join()
+        results.append(result)
+
+        sys.stderr.write('%-9s %5i %.2f %-13s %10.1f ms %9i expanded\n' %
+                         (case['map'], case['size'], case['density'], case['planner'],
+                          result['timeMs'], result['expansions']))
+
+    report = {'python': platform.python_version(),
+              'machine': platform.machine(),
+              'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'results': results}
+
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+    else:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,413 @@
+import time
+
+import numpy as np
+
+from astar import Astar
+from open_list import OpenList
+
+INF = float('inf')
+
+class AnytimeAstar(Astar):
+    '''
+    Anytime version of the Astar planner (ARA*).
+
+    The first path is found quickly with a weighted heuristic
+    (g + epsilon*h) so it costs at most epsilon times the optimal
+    path. After that epsilon is lowered and the search continues
+    from where it left off, reusing all of the work already done,
+    until epsilon reaches 1 and the path is optimal.
+
+    Each call to computePath only searches for timeBudget seconds
+    and keeps the best path found so far, so the node can call it
+    once per cycle and the path keeps improving while the robot
+    drives. The search runs backwards from the goal, so when only
+    the start moves the search is kept and just re-prioritized.
+    When cells of the grid change only the part of the search that
+    went through them is redone, and the old path is kept until
+    there is a new one unless it runs into a new obstacle. A new
+    goal starts over.
+    '''
+    def __init__(self, corner1, corner2, numCells, costModel=None,
+                 timeBudget=0.04, initialEpsilon=3.0, epsilonStep=0.5):
+        Astar.__init__(self, corner1, corner2, numCells, costModel)
+
+        # seconds computePath is allowed to search for,
+        # None searches until the path is optimal
+        self.timeBudget = timeBudget
+
+        self.initialEpsilon = initialEpsilon
+        self.epsilonStep = epsilonStep
+
+        # how often the deadline gets checked
+        self.checkInterval = 64
+
+        self.resetSearch()
+
+    def resetSearch(self):
+        '''
+        Throw away the saved search
+        '''
+        # cost to goal for every cell that has been reached
+        self.gValues = dict()
+        # next cell towards the goal
+        self.parents = dict()
+        self.openList = OpenList()
+        self.closed = set()
+        # cells that got cheaper after they were expanded
+        self.incons = set()
+
+        self.epsilon = self.initialEpsilon
+
+        # grid space goal and start the search is for
+        self.searchGoal = None
+        self.searchStart = None
+        # copy of the grid the search is using
+        self.searchGrid = None
+        self.searchCells = None
+        # cell costs of the cost model the search is using
+        self.searchCosts = None
+
+        # True while a search with the current epsilon
+        # hasn't finished
+        self.improving = False
+
+        # the saved path costs at most epsilonBound times the
+        # optimal path. None if there is no path yet
+        self.epsilonBound = None
+
+        # True when the saved path is optimal or there is no path
+        self.converged = False
+
+        # number of cells expanded by the last call to computePath
+        self.expansions = 0
+
+    def key(self, point):
+        g = self.gValues[point]
+        h = self.costModel.heuristic(point, self.searchStart)
+        return (g + self.epsilon*h, h)
+
+    def rekey(self):
+        '''
+        Recompute the keys of everything on the open list after
+        epsilon or the start changed
+        '''
+        key = self.key
+        openList = OpenList()
+        openList.update([(point, key(point)) for point in self.openList])
+        self.openList = openList
+
+    def reachStart(self):
+        '''
+        A start on an obstacle is only entered from the cells next
+        to it. If they were already expanded before the start moved
+        there its cost has to be taken from them
+        '''
+        start = self.searchStart
+        cells = self.searchCells
+        numCells = self.numCells
+        if start in self.gValues or cells[start[0]*numCells + start[1]] != -1:
+            return
+
+        cost = self.costModel.cost
+        for neighbor in self.getNeighbors(start):
+            if neighbor not in self.gValues or cells[neighbor[0]*numCells + neighbor[1]] == -1:
+                continue
+            newG = self.gValues[neighbor] + cost(start, neighbor)
+            if newG < self.gValues.get(start, INF):
+                self.gValues[start] = newG
+                self.parents[start] = neighbor
+
+        if start in self.gValues:
+            self.openList[start] = self.key(start)
+
+    def improvePath(self, deadline):
+        '''
+        Weighted A* from the goal until the start can't be
+        improved with the current epsilon.
+
+        Returns False if the deadline ran out first
+        '''
+        openList = self.openList
+        gValues = self.gValues
+        parents = self.parents
+        closed = self.closed
+        incons = self.incons
+        start = self.searchStart
+        cells = self.searchCells
+        numCells = self.numCells
+        cost = self.costModel.cost
+        key = self.key
+
+        count = 0
+        while len(openList) > 0:
+            point = openList.smallest()
+            if start in gValues and not openList[point] < key(start):
+                return True
+
+            del openList[point]
+            closed.add(point)
+            self.expansions += 1
+
+            if cells[point[0]*numCells + point[1]] == -1 and point != start:
+                # a start from before that was on an obstacle
+                continue
+
+            g = gValues[point]
+            for neighbor in self.getNeighbors(point):
+                # moving from neighbor into point, only the start
+                # is allowed to be on an obstacle
+                if cells[neighbor[0]*numCells + neighbor[1]] == -1 and neighbor != start:
+                    continue
+
+                newG = g + cost(neighbor, point)
+                if newG < gValues.get(neighbor, INF):
+                    gValues[neighbor] = newG
+                    parents[neighbor] = point
+                    if neighbor in closed:
+                        incons.add(neighbor)
+                    else:
+                        openList[neighbor] = key(neighbor)
+
+            # always expand at least one cell so every call
+            # makes progress
+            count += 1
+            if(deadline is not None and count % self.checkInterval == 0 and
+               time.time() > deadline):
+                return False
+
+        return True
+
+    def computePath(self, start=None, goal=None):
+        '''
+        Improve the path from the specified start point to the goal
+        point for at most timeBudget seconds.
+
+        start is a tuple of the form (x,y) where x and y are coordinates
+        '''
+        if self.debug:
+            print "Computing path (anytime)..."
+
+        if start is None:
+            start = self.start
+        else:
+            self.start = start
+
+        if goal is None:
+            goal = self.goal
+        else:
+            self.goal = goal
+
+        if goal is None:
+            # clear the path and quit
+            self.resetSearch()
+            self.clearPath()
+            return
+
+        if start is None:
+            # nothing to search from, keep the path and quit
+            return
+
+        try:
+            goal = self.transformMapToGrid(goal)
+        except Exception:
+            # the goal can't be reached, clear the path and quit
+            self.resetSearch()
+            self.clearPath()
+            return
+
+        try:
+            start = self.transformMapToGrid(start)
+        except Exception:
+            # nothing to search from, keep the path and quit
+            return
+
+        if self.timeBudget is None:
+            deadline = None
+        else:
+            deadline = time.time() + self.timeBudget
+
+        self.expansions = 0
+
+        grid = self.grid
+        costs = self.costModel.cellCosts
+        if(goal != self.searchGoal or self.searchGrid is None or
+           ((not np.array_equal(grid, self.searchGrid) or costs is not self.searchCosts) and
+            not self.repairSearch(grid))):
+            # start over with the initial epsilon
+            self.resetSearch()
+            self.clearPath()
+            self.searchGoal = goal
+            self.searchStart = start
+            self.searchGrid = np.array(grid, dtype=np.int8)
+            self.searchCells = self.searchGrid.ravel().tolist()
+            self.searchCosts = costs
+
+            self.gValues[goal] = 0
+            self.parents[goal] = None
+            self.openList[goal] = self.key(goal)
+            self.improving = True
+
+            if self.searchCells[goal[0]*self.numCells + goal[1]] == -1 and start != goal:
+                # the goal can never be entered
+                self.openList = OpenList()
+
+        if start != self.searchStart:
+            # the costs to the goal are still right, only
+            # the priorities depend on where the start is
+            self.searchStart = start
+            self.reachStart()
+            self.rekey()
+            self.improving = True
+            self.converged = False
+
+        while not self.converged:
+            if not self.improving:
+                # tighten the bound and move the cells that got
+                # cheaper after being expanded back to the open list
+                self.epsilon = max(1.0, self.epsilon - self.epsilonStep)
+                for point in self.incons:
+                    self.openList[point] = self.key(point)
+                self.incons = set()
+                self.closed = set()
+                self.rekey()
+                self.improving = True
+
+            if not self.improvePath(deadline):
+                # out of time, keep the best path so far
+                break
+
+            self.improving = False
+            self.savePath()
+
+            if self.epsilon <= 1.0 or self.epsilonBound is None:
+                # optimal or there is no path at all
+                self.converged = True
+
+    def repairSearch(self, grid):
+        '''
+        Bring the saved search up to date with a grid where some
+        cells became obstacles or free, or cost something different
+        to enter.
+
+        Every cell whose way to the goal goes through a new obstacle,
+        or through a cell with a new cost, loses its cost. The cells
+        next to them, next to the freed cells and the cells with a
+        new cost are opened again so the search can grow back
+        into them. The search then continues with the same epsilon.
+        The path is dropped if it runs into a new obstacle, otherwise
+        it is kept until the search finds a new one.
+
+        Returns False if the search has to start over
+        '''
+        newGrid = np.array(grid, dtype=np.int8)
+        blockedNow = newGrid.ravel() == -1
+        changed = np.flatnonzero(blockedNow != (self.searchGrid.ravel() == -1))
+
+        numCells = self.numCells
+        blocked = list()
+        freed = list()
+        for index in changed.tolist():
+            if blockedNow[index]:
+                blocked.append(divmod(index, numCells))
+            else:
+                freed.append(divmod(index, numCells))
+
+        if self.searchGoal in blocked:
+            # the goal can't be entered anymore
+            return False
+
+        costs = self.costModel.cellCosts
+        oldCosts = self.searchCosts
+        costChanged = list()
+        if costs is not oldCosts:
+            if costs is None or oldCosts is None:
+                # cell costs were turned on or off
+                return False
+            for index in np.flatnonzero(np.not_equal(oldCosts, costs)).tolist():
+                costChanged.append(divmod(index, numCells))
+
+        gValues = self.gValues
+        parents = self.parents
+        openList = self.openList
+        closed = self.closed
+        incons = self.incons
+
+        # everything that reached the goal through a new obstacle
+        children = dict()
+        for point, parent in parents.iteritems():
+            if parent is not None:
+                children.setdefault(parent, []).append(point)
+
+        invalid = set()
+        stack = [point for point in blocked if point in gValues]
+        for point in costChanged:
+            stack.extend(children.get(point, ()))
+        while len(stack) > 0:
+            point = stack.pop()
+            if point in invalid:
+                continue
+            invalid.add(point)
+            stack.extend(children.get(point, ()))
+
+        for point in invalid:
+            del gValues[point]
+            del parents[point]
+            if point in openList:
+                del openList[point]
+            closed.discard(point)
+            incons.discard(point)
+
+        # the cells that still know their way to the goal
+        # grow back into the ones that lost it and the freed ones
+        frontier = set()
+        for point in list(invalid) + freed:
+            for neighbor in self.getNeighbors(point):
+                if neighbor in gValues:
+                    frontier.add(neighbor)
+        # and the cells with a new cost in case they got cheaper
+        for point in costChanged:
+            if point in gValues:
+                frontier.add(point)
+
+        self.searchGrid = newGrid
+        self.searchCells = newGrid.ravel().tolist()
+        self.searchCosts = costs
+
+        # run the current epsilon again with everything
+        # that might be out of date on the open list
+        for point in frontier | incons:
+            openList[point] = self.key(point)
+        self.incons = set()
+        self.closed = set()
+        self.improving = True
+        self.converged = False
+
+        # only the start may be on an obstacle
+        for point in self.gridPath[1:]:
+            if blockedNow[point[0]*numCells + point[1]]:
+                self.clearPath()
+                self.epsilonBound = None
+                break
+
+        return True
+
+    def savePath(self):
+        '''
+        Save the path through the search tree from the start
+        '''
+        start = self.searchStart
+        if start not in self.gValues:
+            # no path could be found
+            # clear the old path
+            self.clearPath()
+            self.epsilonBound = None
+            return
+
+        gridPath = list()
+        point = start
+        while point is not None:
+            gridPath.append(point)
+            point = self.parents[point]
+
+        self.setPath(gridPath)
+        self.epsilonBound = self.epsilon
@@ -1,21 +1,48 @@
+import time
+
+import numpy as np
+
+from cost_model import OctileCost, proximityCosts
+from search_stats import SearchStats
+from search_workspace import SearchWorkspace
+from smoothing import smoothPath
+
 class Astar():
-    def __init__(self, corner1, corner2, numCells):
+    def __init__(self, corner1, corner2, numCells, costModel=None):
         '''
         Constructor for Astar class.
         
         corner1 and corner2 are tuples of the form (x,y) where x and y are coordinates
         numCells is an integer
+        costModel is an instance of one of the cost_model classes. The default is OctileCost
         path is a list of geometry_msg Point messages
         '''
         
         self.c1 = corner1
         self.c2 = corner2
         self.numCells = numCells
+
+        # cost of moving between cells and the matching heuristic
+        if costModel is None:
+            costModel = OctileCost()
+        self.costModel = costModel
+
+        # the grid geometry never changes so precompute it
+        # once instead of for every transformed point
+        self.xMin = min(corner1[0],corner2[0])
+        self.yMin = min(corner1[1],corner2[1])
+
+        # width and height of grid cells
+        self.xStep = float(abs(corner1[0] - corner2[0]))/numCells
+        self.yStep = float(abs(corner1[1] - corner2[1]))/numCells
         
         # stores the latest computed path
         self.path = []
         self.__pathDict = dict()
 
+        # the latest computed path in grid space
+        self.gridPath = []
+
         # should be a tuple specifying the starting coordinates in map frame
         self.start = None
 
@@ -24,28 +51,55 @@ class Astar():
         
         self.grid = self.createGrid()
 
+        # number of cells expanded by the last search
+        self.expansions = 0
+
+        # g values, parents and the open list are reused
+        # by every search instead of being allocated again
+        self.workspace = SearchWorkspace(numCells*numCells)
+
+        # statistics of the last search, only
+        # collected when collectStats is True
+        self.stats = SearchStats()
+        self.collectStats = False
+
+        # print a message on every goal, obstacle
+        # update and search
+        self.debug = False
+
+        # static walls rasterized once, the local obstacle
+        # layer gets drawn on top of a copy of this
+        self.baseGrid = self.createGrid()
+
+        # grid coordinates of the cells in the local obstacle layer
+        self.localCells = np.zeros((0,2), dtype=np.intp)
+
+        # cells closer than costRadius king moves to an obstacle
+        # cost more to enter, see setCostRadius. cellCosts are
+        # the costs that were handed to the cost model
+        self.costRadius = 0
+        self.cellCosts = None
+
     def createGrid(self):
         '''
         This method uses the specified corners and the numCells to
         create a 2d array that will store the values used in the astar
         search
-        '''
-        # empty list
-        mapArray = list()
 
-        for i in range(self.numCells):
-            mapArray.append(list())
-            for j in range(self.numCells):
-                mapArray[i].append(0) # 0 is blank, 1 is path, -1 is obstacle
-
-        return mapArray
+        The grid is a numCells x numCells int8 numpy array so the cell
+        (x,y) lives at flat index x*numCells+y. A new grid is a single
+        zeroed allocation instead of numCells^2 python objects.
+        '''
+        # 0 is blank, 1 is path, -1 is obstacle
+        return np.zeros((self.numCells,self.numCells), dtype=np.int8)
 
     def updateGoal(self,goal,recompute=True):
         '''
         Will update the saved goal location. If recompute is left
         with the default value of True the path will be recomputed
         '''
-        print "Updating goal"
+        if self.debug:
+            print "Updating goal"
 
         self.goal = goal
         
@@ -66,10 +120,12 @@ class Astar():
         and false otherwise
         '''
 
-        print "Updating closed list"
+        if self.debug:
+            print "Updating closed list"
 
         # update the grid with all of the closed points
         (conflict, self.grid) = self.populateGrid(closedList)
+        conflict = self.__touchesPath(self.updateCellCosts()) or conflict
         
         # if there was a conflict and recompute was set to true then call the 
         # computePath method
@@ -79,6 +135,179 @@ class Astar():
         else:
             return False
 
+    def updateObstacles(self, added=None, cleared=None, recompute=True):
+        '''
+        Incrementally change the local obstacle layer instead of
+        rebuilding the grid.
+
+        added is a list of points (or an (N,2) array) in the map frame
+        that became local obstacles since the last update and cleared
+        is a list of points that no longer are. A cleared cell goes
+        back to its value in the base grid, so the static walls stay.
+        Only the added cells can block the current path, so only
+        they are checked against it.
+
+        This method will return True if a new path was computed
+        and false otherwise
+        '''
+        numCells = self.numCells
+        if added is None:
+            added = []
+        if cleared is None:
+            cleared = []
+
+        (addedIndices, valid) = self.transformMapToGridBatch(added)
+        addedIndices = addedIndices[valid]
+        (clearedIndices, valid) = self.transformMapToGridBatch(cleared)
+        clearedIndices = clearedIndices[valid]
+
+        addedFlat = np.unique(addedIndices[:,0]*numCells + addedIndices[:,1])
+        clearedFlat = np.unique(clearedIndices[:,0]*numCells + clearedIndices[:,1])
+        self.__changeLocal(addedFlat, clearedFlat)
+
+        return self.__checkAdded(np.union1d(addedFlat, self.updateCellCosts()), recompute)
+
+    def __changeLocal(self, addedFlat, clearedFlat):
+        '''
+        Add and clear cells of the local layer given as sorted unique
+        flat indices, a cell in both is added. The grid is changed in
+        place, only at those cells.
+        '''
+        numCells = self.numCells
+        oldFlat = self.localCells[:,0]*numCells + self.localCells[:,1]
+
+        clearedFlat = np.intersect1d(oldFlat, np.setdiff1d(clearedFlat, addedFlat))
+        localFlat = np.union1d(np.setdiff1d(oldFlat, clearedFlat), addedFlat)
+        self.localCells = np.column_stack((localFlat // numCells, localFlat % numCells)).astype(np.intp)
+
+        grid = self.grid.flat
+        grid[clearedFlat] = self.baseGrid.flat[clearedFlat]
+        grid[addedFlat] = -1
+
+    def __touchesPath(self, flat):
+        '''
+        True if any of the cells given as flat indices is on the path
+        '''
+        pathDict = self.__pathDict
+        if len(pathDict) > 0:
+            for index in flat.tolist():
+                if pathDict.get(divmod(index, self.numCells),False):
+                    return True
+        return False
+
+    def __checkAdded(self, changedFlat, recompute):
+        '''
+        Replan if any of the added cells, or the cells whose
+        cost changed, is on the path
+        '''
+        # if there is no path then
+        # might as well try and recompute
+        conflict = len(self.path) == 0 or self.__touchesPath(changedFlat)
+
+        if conflict and recompute:
+            self.computePath()
+            return True
+        else:
+            return False
+
+    def updateLayers(self, localPoints=None, wallPoints=None, recompute=True):
+        '''
+        Layered version of updateClosedList.
+
+        wallPoints are the static walls. They are only rasterized
+        into the base grid when they are given, which should only
+        happen when the walls change. localPoints are the current
+        sensor obstacles. When only they change, just the difference
+        to the last local layer is applied to the grid, the same way
+        updateObstacles does it. Either can be
+        None to keep the saved layer.
+
+        This method will return True if a new path was computed
+        and false otherwise
+        '''
+        numCells = self.numCells
+        if wallPoints is None and localPoints is not None:
+            (indices, valid) = self.transformMapToGridBatch(localPoints)
+            indices = indices[valid]
+            newFlat = np.unique(indices[:,0]*numCells + indices[:,1])
+            oldFlat = self.localCells[:,0]*numCells + self.localCells[:,1]
+            addedFlat = np.setdiff1d(newFlat, oldFlat)
+            self.__changeLocal(addedFlat, np.setdiff1d(oldFlat, newFlat))
+            return self.__checkAdded(np.union1d(addedFlat, self.updateCellCosts()), recompute)
+
+        if wallPoints is not None:
+            baseGrid = self.createGrid()
+            (indices, valid) = self.transformMapToGridBatch(wallPoints)
+            indices = indices[valid]
+            baseGrid[indices[:,0],indices[:,1]] = -1
+            self.baseGrid = baseGrid
+
+        if localPoints is not None:
+            (indices, valid) = self.transformMapToGridBatch(localPoints)
+            indices = indices[valid]
+            localFlat = np.unique(indices[:,0]*numCells + indices[:,1])
+            self.localCells = np.column_stack((localFlat // numCells, localFlat % numCells)).astype(np.intp)
+
+        # combine the layers
+        grid = self.baseGrid.copy()
+        grid[self.localCells[:,0],self.localCells[:,1]] = -1
+        self.grid = grid
+        costChanged = self.updateCellCosts()
+
+        if(len(self.path) == 0):
+            # if there is no path then
+            # might as well try and recompute
+            conflict = True
+        else:
+            # look up the path cells in the new grid, this only
+            # depends on the length of the path
+            pathCells = np.array([point for point,onPath in self.__pathDict.iteritems() if onPath],
+                                 dtype=np.intp).reshape(-1,2)
+            conflict = (bool((grid[pathCells[:,0],pathCells[:,1]] == -1).any()) or
+                        self.__touchesPath(costChanged))
+
+        if conflict and recompute:
+            self.computePath()
+            return True
+        else:
+            return False
+
+    def setCostRadius(self, radius):
+        '''
+        Make the cells within radius king moves of an obstacle more
+        expensive to enter, so the path keeps away from the inflated
+        obstacles where there is room. The extra cost is largest
+        next to an obstacle and gets smaller further away (see
+        cost_model.proximityCosts). 0 turns the extra costs off.
+        '''
+        self.costRadius = radius
+        if radius > 0:
+            self.updateCellCosts()
+        else:
+            self.cellCosts = None
+            self.costModel.setCellCosts(None)
+
+    def updateCellCosts(self):
+        '''
+        Build the cell costs from the grid and hand them to the
+        cost model if they changed. The cost model only gets a new
+        list when they did, so the incremental planners can tell.
+
+        Returns the flat indices of the cells whose cost changed
+        '''
+        if self.costRadius <= 0:
+            return np.zeros(0, dtype=np.intp)
+
+        cellCosts = proximityCosts(self.grid == -1, self.costRadius)
+        if self.cellCosts is None:
+            changed = np.arange(self.numCells*self.numCells)
+        else:
+            changed = np.flatnonzero(cellCosts != self.cellCosts)
+        if len(changed) > 0:
+            self.cellCosts = cellCosts
+            self.costModel.setCellCosts(cellCosts.tolist())
+        return changed
+
     def populateGrid(self, closedList):
         '''
         Given a list of closed points this function will
@@ -87,6 +316,8 @@ class Astar():
         to be calculated then the populated grid
         will be used in the calculations. Otherwise the populated
         grid will be discarded
+
+        closedList can be a list of (x,y) tuples or an (N,2) array
         '''
         newGrid = self.createGrid()
 
@@ -99,31 +330,30 @@ class Astar():
             # only want to recompute if something
             # is in the way of our current path
             conflict = False
-        # fill in the squares in the grid that are included in the current path
-        for point in closedList:
-            try:
-                # see if the point has a corresponding point in the grid
-                gridPoint = self.transformMapToGrid(point)
-            except Exception:
-                # if the point isn't in the grid then it doesn't matter
-                continue
 
-            if(self.__pathDict.get(gridPoint,False)):
-                conflict = True
+        # transform all of the points at once. Points that
+        # aren't in the grid don't matter
+        (indices, valid) = self.transformMapToGridBatch(closedList)
+        indices = indices[valid]
 
-            newGrid[gridPoint[0]][gridPoint[1]] = -1
+        # see if any of the closed cells are on the current path
+        if not conflict and len(self.__pathDict) > 0:
+            numCells = self.numCells
+            pathCells = set([x*numCells + y for (x,y),onPath in self.__pathDict.iteritems() if onPath])
+            closedCells = indices[:,0]*numCells + indices[:,1]
+            conflict = not pathCells.isdisjoint(closedCells.tolist())
+
+        # fill in the closed squares in the grid
+        newGrid[indices[:,0],indices[:,1]] = -1
 
         return (conflict, newGrid)
 
     def transformMapToGrid(self, point):
         from math import floor
-        # width and height of grid cells
-        xStep = float(abs(self.c1[0] - self.c2[0]))/self.numCells
-        yStep = float(abs(self.c1[1] - self.c2[1]))/self.numCells
 
         # translate the goal point to the grid space
-        xIndex = int(floor((point[0]-min(self.c1[0],self.c2[0]))/xStep))
-        yIndex = int(floor((point[1]-min(self.c1[1],self.c2[1]))/yStep))
+        xIndex = int(floor((point[0]-self.xMin)/self.xStep))
+        yIndex = int(floor((point[1]-self.yMin)/self.yStep))
 
         # make sure the indices of the goal are within the 
         # specified grid
@@ -134,18 +364,37 @@ class Astar():
 
         return (xIndex,yIndex)
 
+    def transformMapToGridBatch(self, points):
+        '''
+        Vectorized version of transformMapToGrid.
+
+        points is an (N,2) array (or a list of (x,y) tuples) in
+        the map frame.
+
+        Returns a tuple (indices, valid) where indices is an (N,2)
+        integer array of grid coordinates and valid is a boolean
+        mask that is False for every point outside of the grid.
+        Instead of raising an IndexError the indices of invalid
+        points are left as whatever the transform produced.
+        '''
+        points = np.asarray(points, dtype=np.float64).reshape(-1,2)
+
+        indices = np.empty(points.shape, dtype=np.intp)
+        indices[:,0] = np.floor((points[:,0]-self.xMin)/self.xStep)
+        indices[:,1] = np.floor((points[:,1]-self.yMin)/self.yStep)
+
+        valid = ((indices >= 0) & (indices < self.numCells)).all(axis=1)
+
+        return (indices, valid)
+
     def transformGridToMap(self, point):        
         if(point[0] < 0 or point[0] >= self.numCells):
             raise IndexError
         if(point[1] < 0 or point[1] >= self.numCells):
             raise IndexError
-        
-        # width and height of grid cells
-        xStep = abs(self.c1[0] - self.c2[0])/float(self.numCells)
-        yStep = abs(self.c1[1] - self.c2[1])/float(self.numCells)
 
-        x = xStep*point[0] + min(self.c1[0],self.c2[0])
-        y = yStep*point[1] + min(self.c1[1],self.c2[1])
+        x = self.xStep*point[0] + self.xMin
+        y = self.yStep*point[1] + self.yMin
 
         return (x,y)
     
@@ -156,10 +405,8 @@ class Astar():
 
         start is a tuple of the form (x,y) where x and y are coordinates
         '''
-        from priority_dict import priority_dict as PriorityDict
-        from space import Space
-
-        print "Computing path..."
+        if self.debug:
+            print "Computing path..."
 
         # see if there is a start point
         # if there isn't then just return
@@ -167,8 +414,7 @@ class Astar():
         if start is None:
             if(self.start is None):
                 # clear the path and quit
-                self.path = []
-                self.__pathDict = dict()
+                self.clearPath()
                 return
             else:
                 start = self.start
@@ -182,104 +428,189 @@ class Astar():
         if goal is None:
             if(self.goal is None):
                 # clear the path and quit
-                self.path = []
-                self.__pathDict = dict()
+                self.clearPath()
                 return
             else:
                 goal = self.goal
         else:
             self.goal = goal
 
-        # copy the saved closedList
-        # probably a more efficient way of doing this
-        closedList = list()
-        for i,row in enumerate(self.grid):
-            closedList.append(list())
-            for j,cell in enumerate(self.grid[i]):
-                closedList[i].append(cell)
+        # the obstacles as a flat list, indexing a python list is
+        # much faster than indexing a numpy array one element at a
+        # time in the search loop. Only the cells that changed since
+        # the last search are copied
+        numCells = self.numCells
+        blocked = self.workspace.syncGrid(self.grid)
+
+        stats = None
+        if self.collectStats:
+            stats = self.stats
+            stats.reset()
+            stats.searches += 1
+            startTime = time.time()
 
         try:
             goal = self.transformMapToGrid(self.goal)
             start = self.transformMapToGrid(start)
         except Exception:
             # clear the path and quit
-            self.path = []
-            self.__pathDict = dict()
+            self.clearPath()
+            if stats is not None:
+                self.__finishStats(startTime, 0)
             return
 
-        # starting node in the search tree
-        root = Space((start[0],start[1]),(goal[0],goal[1]))
-
-        # create the openList
-        openList = PriorityDict()
-
-        # This will be filled with the goal state when
-        # the goal state is expanded
+        if stats is not None:
+            stats.transformTime += time.time() - startTime
+
+        costModel = self.costModel
+        cost = costModel.cost
+        heuristic = costModel.heuristic
+
+        # the search state is indexed by x*numCells+y
+        workspace = self.workspace
+        generation = workspace.reset()
+        gValues = workspace.gValues
+        parents = workspace.parents
+        seen = workspace.seen
+        closed = workspace.closed
+        openList = workspace.openList
+
+        # the open list and neighbor lookups used by the loop,
+        # replaced with timed versions when collecting stats
+        smallest = openList.smallest
+        remove = openList.__delitem__
+        push = openList.__setitem__
+        getNeighbors = self.getNeighbors
+        if stats is not None:
+            smallest = stats.timedSmallest(openList)
+            remove = stats.timedRemove(openList)
+            push = stats.timedPush(openList)
+            getNeighbors = stats.timedNeighbors(getNeighbors)
+
+        startIndex = start[0]*numCells + start[1]
+        goalIndex = goal[0]*numCells + goal[1]
+
+        gValues[startIndex] = 0
+        parents[startIndex] = -1
+        seen[startIndex] = generation
+        push(startIndex, (heuristic(start, goal), 0))
+
+        # This will be set when the goal is expanded
         # if the goal is never found then this will remain
-        # None
-        goalSpace = None
-
-        openList[root.point] = root
+        # False
+        found = False
 
+        self.expansions = 0
         while(len(openList) > 0):
-            currSpace = openList.pop_smallest()
-            closedList[currSpace.point[0]][currSpace.point[1]] = -1
+            index = smallest()
+            remove(index)
+            self.expansions += 1
+            closed[index] = generation
 
             # see if this is the goal space
-            if(currSpace.point == goal):
-                # if it is then save the space
-                # and return
-                goalSpace = currSpace
+            if(index == goalIndex):
+                found = True
                 break
 
-            neighbors = self.getNeighbors(currSpace.point)
-            
+            point = (index // numCells, index % numCells)
+            g = gValues[index]
+
             # for each of the potential new points
-            for point in neighbors:
-                # make sure the point isn't already closed
-                if(closedList[point[0]][point[1]] != -1):
-                    if point in openList:
-                        # update the cost if necessary
-                        if(openList[point].g > currSpace.g+1):
-                            tempSpace = openList[point]
-                            tempSpace.g = currSpace.g+1
-                            openList[point] = tempSpace
-                    else:
-                        # add the point to the openlist
-                        openList[point] = Space(point,goal,currSpace)
+            for neighbor in getNeighbors(point):
+                neighborIndex = neighbor[0]*numCells + neighbor[1]
+
+                # make sure the point isn't an obstacle or already closed
+                if(blocked[neighborIndex] or closed[neighborIndex] == generation):
+                    continue
+
+                newG = g + cost(point, neighbor)
+                if(seen[neighborIndex] != generation or newG < gValues[neighborIndex]):
+                    # first time the point is reached or a cheaper
+                    # way to it, update the cost and the parent
+                    gValues[neighborIndex] = newG
+                    parents[neighborIndex] = index
+                    seen[neighborIndex] = generation
+                    # break ties towards the point closer to the goal
+                    # so the search doesn't fan out across equal paths
+                    push(neighborIndex, (newG + heuristic(neighbor, goal), -newG))
         
-        if goalSpace is None:
+        if not found:
             # no path could be found
             # clear the old path
-            self.path = []
-            self.__pathDict = dict()
+            self.clearPath()
+            if stats is not None:
+                self.__finishStats(startTime, self.expansions)
             return
 
         reversePath = list()
         
-        # start by adding the goal to the list
-        reversePath.append(goalSpace.point)
-        
-        currSpace = goalSpace
-        # travel up the tree until the root is reached
-        while currSpace.parent is not None:
-            currSpace = currSpace.parent
-            reversePath.append(currSpace.point)
+        # travel up the tree from the goal until the root is reached
+        index = goalIndex
+        while index != -1:
+            reversePath.append((index // numCells, index % numCells))
+            index = parents[index]
 
         # now flip the path so that it is in the correct order
-        self.path = reversePath[::-1] # for all elements in reversePath in steps of negative 1 from the end
+        if stats is not None:
+            transformStart = time.time()
+        self.setPath(reversePath[::-1]) # for all elements in reversePath in steps of negative 1 from the end
+        if stats is not None:
+            stats.transformTime += time.time() - transformStart
+            self.__finishStats(startTime, self.expansions)
+
+    def __finishStats(self, startTime, expansions):
+        '''
+        Save the results of the search that started at startTime
+        '''
+        stats = self.stats
+        stats.expansions = expansions
+        stats.found = len(self.path) > 0
+        stats.pathLength = len(self.path)
+        stats.totalTime = time.time() - startTime
 
+    def clearPath(self):
+        '''
+        Forget the current path
+        '''
+        self.path = []
+        self.__pathDict = dict()
+        self.gridPath = []
 
+    def setPath(self, gridPath):
+        '''
+        Save a path given as a list of grid space points.
+        The saved path is transformed back into the map frame
+        '''
         # put the path in dictionary form so that the updatedClosedList can take advantage of the path information    
         # there are better more pythonic ways of doing this, but this should work
         self.__pathDict = dict()
-        for point in self.path:
+        for point in gridPath:
             self.__pathDict[point] = True
 
+        self.gridPath = list(gridPath)
+
         # transform all of the points back into the map frame
-        for i,point in enumerate(self.path):
-            self.path[i] = self.transformGridToMap(point)
-                    
+        self.path = list()
+        for point in gridPath:
+            self.path.append(self.transformGridToMap(point))
+
+    def smoothPath(self):
+        '''
+        Returns the saved path in the map frame reduced to the
+        waypoints where it has to turn. The straight lines between
+        the waypoints only cross cells that are free in the grid.
+
+        The line of sight is checked between cell centers, so unlike
+        self.path the waypoints are the centers of their cells
+        '''
+        halfX = self.xStep/2.0
+        halfY = self.yStep/2.0
+
+        path = list()
+        for point in smoothPath(self.grid, self.gridPath):
+            (x,y) = self.transformGridToMap(point)
+            path.append((x+halfX,y+halfY))
+        return path
 
     def getNeighbors(self, point):
         '''
@@ -0,0 +1,101 @@
+from math import sqrt
+
+import numpy as np
+
+SQRT2 = sqrt(2)
+
+def proximityCosts(blocked, radius):
+    '''
+    Cell costs for the cells close to obstacles.
+
+    blocked is a boolean array that is True for the obstacles.
+    A free cell that is d king moves away from the closest
+    obstacle costs (radius+1-d)/radius, so 1 next to an obstacle
+    down to 1/radius at radius moves away, and every other
+    cell costs 0.
+    '''
+    costs = np.zeros(blocked.shape)
+    reached = np.array(blocked, dtype=bool)
+    for distance in range(1, radius+1):
+        # grow the reached cells by one king move,
+        # first along the rows and then along the columns
+        grown = reached.copy()
+        grown[1:] |= reached[:-1]
+        grown[:-1] |= reached[1:]
+        rows = grown.copy()
+        grown[:,1:] |= rows[:,:-1]
+        grown[:,:-1] |= rows[:,1:]
+
+        costs[grown & ~reached] = (radius+1-distance)/float(radius)
+        reached = grown
+    return costs
+
+class OctileCost():
+    '''
+    Straight moves cost 1 and diagonal moves cost sqrt(2).
+
+    The heuristic is the octile distance, which is the exact cost
+    on an empty grid, so it is admissible and consistent.
+
+    cellCosts is an optional numCells x numCells array of extra
+    costs for entering each cell (for example from the inflated
+    costmap). The cost of a move gets multiplied by
+    1 + weight*cellCost, which is never less than the unweighted
+    cost so the heuristic stays admissible.
+    '''
+    def __init__(self, cellCosts=None, weight=1.0):
+        self.weight = weight
+        self.setCellCosts(cellCosts)
+
+    def setCellCosts(self, cellCosts):
+        '''
+        Save the per cell costs as a flat list so they can
+        be looked up quickly in the search loop
+        '''
+        if cellCosts is None:
+            self.cellCosts = None
+            self.numCells = None
+        else:
+            self.numCells = len(cellCosts)
+            self.cellCosts = [float(cost) for row in cellCosts for cost in row]
+
+    def stepCost(self, a, b):
+        '''
+        Cost of a single move between neighboring cells a and b
+        on an empty grid
+        '''
+        if a[0] != b[0] and a[1] != b[1]:
+            return SQRT2
+        return 1
+
+    def cost(self, a, b):
+        '''
+        Cost of moving from cell a into the neighboring cell b
+        '''
+        cost = self.stepCost(a, b)
+        if self.cellCosts is not None:
+            cost *= 1 + self.weight*self.cellCosts[b[0]*self.numCells + b[1]]
+        return cost
+
+    def heuristic(self, a, b):
+        '''
+        Octile distance between a and b
+        '''
+        dx = abs(a[0]-b[0])
+        dy = abs(a[1]-b[1])
+        if dx > dy:
+            return dx + (SQRT2-1)*dy
+        return dy + (SQRT2-1)*dx
+
+class UniformCost(OctileCost):
+    '''
+    Every move costs 1, including diagonals.
+
+    The heuristic is the number of king moves between the cells
+    (Chebyshev distance), the exact cost on an empty grid.
+    '''
+    def stepCost(self, a, b):
+        return 1
+
+    def heuristic(self, a, b):
+        return max(abs(a[0]-b[0]), abs(a[1]-b[1]))
@@ -0,0 +1,342 @@
+from astar import Astar
+from open_list import OpenList
+
+INF = float('inf')
+
+# sums of sqrt(2) steps taken in a different order can differ in
+# the last bits, so values closer than this are treated as equal
+EPSILON = 1e-9
+
+# keys are rounded to this many digits so that ties between
+# equal path costs are real ties on the open list
+KEY_DIGITS = 9
+
+class DStarLite(Astar):
+    '''
+    Incremental version of the Astar planner (D* Lite).
+
+    The search tree is rooted at the goal and kept between calls
+    to computePath. When cells in the grid change, or the start
+    moves as the robot drives, only the part of the tree that
+    is affected gets repaired instead of searching from scratch.
+    A new goal still requires a full search.
+
+    This is the optimized version of Koenig and Likhachev: the
+    lookahead (rhs) values are kept up to date one edge at a time,
+    and a cell only looks at all of its neighbors again when the
+    neighbor it was using got more expensive. Cells with the same
+    first key are expanded with the cells that got more expensive
+    first and then the ones furthest from the goal first, so like
+    Astar the search runs along the cheapest paths to the start
+    instead of flooding all of them.
+
+    Moves are priced by the same cost model as Astar.
+    '''
+    def __init__(self, corner1, corner2, numCells, costModel=None):
+        Astar.__init__(self, corner1, corner2, numCells, costModel)
+
+        self.resetSearch()
+
+    def resetSearch(self):
+        '''
+        Throw away the saved search tree
+        '''
+        size = self.numCells*self.numCells
+
+        # cost to goal estimates and one step lookahead values,
+        # indexed by x*numCells+y
+        self.gValues = [INF]*size
+        self.rhsValues = [INF]*size
+
+        # inconsistent cell indices keyed by calculateKey
+        self.openList = OpenList()
+
+        # heuristic offset that accumulates as the start moves
+        self.km = 0
+
+        # grid space goal the tree is rooted at and its index
+        self.searchGoal = None
+        self.searchGoalIndex = None
+
+        # grid space start of the last search
+        self.searchStart = None
+
+        # cell costs of the cost model the tree was built with
+        self.searchCosts = None
+
+        # number of cells expanded by the last call to computePath
+        self.expansions = 0
+
+    def heuristic(self, a, b):
+        '''
+        Cost between a and b on an empty grid
+        '''
+        return self.costModel.heuristic(a, b)
+
+    def cost(self, u, v):
+        '''
+        Cost of moving from neighboring cell u to cell v
+        '''
+        if self.workspace.blocked[v[0]*self.numCells + v[1]]:
+            return INF
+        return self.costModel.cost(u, v)
+
+    def calculateKey(self, point):
+        index = point[0]*self.numCells + point[1]
+        g = self.gValues[index]
+        rhs = self.rhsValues[index]
+        h = self.costModel.heuristic(self.searchStart, point) + self.km
+        if g < rhs:
+            # got more expensive, clear it before the
+            # cells that could be using its old value
+            return (round(g + h, KEY_DIGITS), 0, g)
+        return (round(rhs + h, KEY_DIGITS), 1, -rhs)
+
+    def updateVertex(self, point):
+        '''
+        Make sure a point is on the open list only if it is
+        inconsistent
+        '''
+        index = point[0]*self.numCells + point[1]
+        if self.gValues[index] != self.rhsValues[index]:
+            self.openList[index] = self.calculateKey(point)
+        elif index in self.openList:
+            del self.openList[index]
+
+    def lookahead(self, point):
+        '''
+        Cheapest way to the goal through the neighbors of point
+        '''
+        numCells = self.numCells
+        gValues = self.gValues
+        blocked = self.workspace.blocked
+        cost = self.costModel.cost
+        rhs = INF
+        for neighbor in self.getNeighbors(point):
+            neighborIndex = neighbor[0]*numCells + neighbor[1]
+            if blocked[neighborIndex]:
+                continue
+            value = cost(point, neighbor) + gValues[neighborIndex]
+            if value < rhs:
+                rhs = value
+        return rhs
+
+    def costRaised(self, point, oldValue):
+        '''
+        Going to the goal through a neighbor of point got more
+        expensive, it used to cost oldValue
+        '''
+        index = point[0]*self.numCells + point[1]
+        if index == self.searchGoalIndex:
+            return
+
+        # only a point that went through that neighbor has
+        # to look at all of its neighbors again
+        if self.rhsValues[index] >= oldValue - EPSILON:
+            self.rhsValues[index] = self.lookahead(point)
+            self.updateVertex(point)
+
+    def costLowered(self, point, target):
+        '''
+        The move from point into the neighboring cell target got
+        cheaper
+        '''
+        numCells = self.numCells
+        index = point[0]*numCells + point[1]
+        if index == self.searchGoalIndex:
+            return
+
+        value = self.cost(point, target) + self.gValues[target[0]*numCells + target[1]]
+        if value < self.rhsValues[index]:
+            self.rhsValues[index] = value
+            self.updateVertex(point)
+
+    def computeShortestPath(self):
+        '''
+        Expand inconsistent cells until the start is consistent
+        and nothing on the open list can improve it
+        '''
+        numCells = self.numCells
+        openList = self.openList
+        gValues = self.gValues
+        rhsValues = self.rhsValues
+        blocked = self.workspace.blocked
+        start = self.searchStart
+        startIndex = start[0]*numCells + start[1]
+        goalIndex = self.searchGoalIndex
+        calculateKey = self.calculateKey
+        getNeighbors = self.getNeighbors
+        cost = self.costModel.cost
+
+        while len(openList) > 0:
+            index = openList.smallest()
+            oldKey = openList[index]
+            if not (oldKey < calculateKey(start) or
+                    rhsValues[startIndex] != gValues[startIndex]):
+                break
+
+            self.expansions += 1
+
+            point = (index // numCells, index % numCells)
+            newKey = calculateKey(point)
+            if oldKey < newKey:
+                # the key is out of date because the start moved
+                openList[index] = newKey
+                continue
+
+            g = gValues[index]
+            rhs = rhsValues[index]
+            if g > rhs:
+                # overconsistent, the cell got cheaper
+                gValues[index] = rhs
+                del openList[index]
+
+                # nothing can move into an obstacle, so its
+                # value doesn't matter to the neighbors
+                if blocked[index]:
+                    continue
+                # the same as costLowered for every neighbor,
+                # written out since this is most of the work
+                for neighbor in getNeighbors(point):
+                    neighborIndex = neighbor[0]*numCells + neighbor[1]
+                    if neighborIndex == goalIndex:
+                        continue
+                    value = cost(neighbor, point) + rhs
+                    if value < rhsValues[neighborIndex]:
+                        rhsValues[neighborIndex] = value
+                        if gValues[neighborIndex] != value:
+                            openList[neighborIndex] = calculateKey(neighbor)
+                        elif neighborIndex in openList:
+                            del openList[neighborIndex]
+            else:
+                # underconsistent, the cell got more expensive
+                gValues[index] = INF
+                if not blocked[index]:
+                    for neighbor in getNeighbors(point):
+                        self.costRaised(neighbor, cost(neighbor, point) + g)
+                if rhsValues[index] == INF:
+                    del openList[index]
+                else:
+                    openList[index] = calculateKey(point)
+
+    def computePath(self, start=None, goal=None):
+        '''
+        This method is responsible for computing an optimum path
+        from the specified start point to the goal point, reusing
+        as much of the last search as possible.
+
+        start is a tuple of the form (x,y) where x and y are coordinates
+        '''
+        if self.debug:
+            print "Computing path incrementally..."
+
+        if start is None:
+            start = self.start
+        else:
+            self.start = start
+
+        if goal is None:
+            goal = self.goal
+        else:
+            self.goal = goal
+
+        # the obstacles that changed since the last search
+        changed = self.workspace.updateGrid(self.grid)
+
+        if start is None or goal is None:
+            # clear the path and quit
+            self.clearPath()
+            return
+
+        try:
+            goal = self.transformMapToGrid(goal)
+            start = self.transformMapToGrid(start)
+        except Exception:
+            # clear the path and quit
+            self.clearPath()
+            return
+
+        self.expansions = 0
+
+        numCells = self.numCells
+        costs = self.costModel.cellCosts
+
+        if goal != self.searchGoal or (costs is None) != (self.searchCosts is None):
+            # the whole tree depends on the goal so start over,
+            # the same when cell costs were turned on or off
+            self.resetSearch()
+            self.searchGoal = goal
+            self.searchGoalIndex = goal[0]*numCells + goal[1]
+            self.searchStart = start
+
+            self.rhsValues[self.searchGoalIndex] = 0
+            self.openList[self.searchGoalIndex] = self.calculateKey(goal)
+        else:
+            # the keys on the open list are relative to the old
+            # start, so offset every future key instead of
+            # rebuilding the open list
+            self.km += self.heuristic(self.searchStart, start)
+            self.searchStart = start
+
+            # cells that cost something different to enter
+            costChanged = set()
+            if costs is not self.searchCosts:
+                costChanged = set([index for index,(old,new) in enumerate(zip(self.searchCosts, costs))
+                                   if old != new])
+
+            # only the moves into a changed cell cost something
+            # different, so only its neighbors need a new lookahead
+            blocked = self.workspace.blocked
+            cost = self.costModel.cost
+            for index in changed:
+                if index in costChanged:
+                    continue
+                target = (index // numCells, index % numCells)
+                g = self.gValues[index]
+                for neighbor in self.getNeighbors(target):
+                    if blocked[index]:
+                        self.costRaised(neighbor, cost(neighbor, target) + g)
+                    else:
+                        self.costLowered(neighbor, target)
+
+            # the old cost of entering these is gone, so
+            # their neighbors look at all of their neighbors
+            for index in costChanged:
+                target = (index // numCells, index % numCells)
+                for neighbor in self.getNeighbors(target):
+                    if neighbor[0]*numCells + neighbor[1] == self.searchGoalIndex:
+                        continue
+                    self.rhsValues[neighbor[0]*numCells + neighbor[1]] = self.lookahead(neighbor)
+                    self.updateVertex(neighbor)
+
+        self.searchCosts = costs
+        self.computeShortestPath()
+
+        gValues = self.gValues
+        if gValues[start[0]*numCells + start[1]] == INF:
+            # no path could be found
+            # clear the old path
+            self.clearPath()
+            return
+
+        # follow the cheapest neighbors down to the goal
+        gridPath = [start]
+        point = start
+        while point != goal and len(gridPath) <= numCells*numCells:
+            best = None
+            bestValue = INF
+            for neighbor in self.getNeighbors(point):
+                value = self.cost(point, neighbor) + gValues[neighbor[0]*numCells + neighbor[1]]
+                if value < bestValue:
+                    best = neighbor
+                    bestValue = value
+            if best is None:
+                break
+            point = best
+            gridPath.append(point)
+
+        if point != goal:
+            self.clearPath()
+            return
+
+        self.setPath(gridPath)
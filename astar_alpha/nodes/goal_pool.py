@@ -0,0 +1,120 @@
+import os
+import tempfile
+from multiprocessing import Pool
+
+import numpy as np
+
+from astar import Astar
+
+INF = float('inf')
+
+# planner of each pool process, created by initWorker
+workerSearcher = None
+
+def initWorker(gridFile, corner1, corner2, numCells, costModel):
+    '''
+    Runs once in every pool process. The grid is mapped read only
+    from the shared file so it is never copied into the process
+    '''
+    global workerSearcher
+    workerSearcher = Astar(corner1, corner2, numCells, costModel)
+    workerSearcher.grid = np.memmap(gridFile, dtype=np.int8, mode='r',
+                                    shape=(numCells,numCells))
+
+def planPair(pair):
+    '''
+    Plan from pair[0] to pair[1] in a pool process
+
+    Returns the cost of the path or INF if there is none
+    '''
+    (start, goal) = pair
+    searcher = workerSearcher
+    searcher.computePath(start, goal)
+    return pathCost(searcher)
+
+def pathCost(searcher):
+    '''
+    Cost of the saved path of searcher or INF if there is none
+    '''
+    if len(searcher.path) == 0:
+        return INF
+
+    gridPath = searcher.gridPath
+    cost = searcher.costModel.cost
+    return sum([cost(a, b) for a,b in zip(gridPath, gridPath[1:])])
+
+class GoalPool():
+    '''
+    Plans to several goals at once on a pool of processes.
+
+    The occupancy grid is written to a temporary file that every
+    process maps read only, so a new grid only has to be written
+    once instead of being sent to every process with every query.
+
+    Use planGoals to get the cost from one start to each candidate
+    goal, planPairs for arbitrary start and goal pairs, or cheapest
+    to pick the cheapest reachable goal. Unreachable goals cost INF.
+    '''
+    def __init__(self, corner1, corner2, numCells, costModel=None, processes=None):
+        self.numCells = numCells
+
+        (handle, self.gridFile) = tempfile.mkstemp(prefix='astar_grid_', suffix='.bin')
+        os.close(handle)
+
+        # writable view of the shared grid for this process
+        self.grid = np.memmap(self.gridFile, dtype=np.int8, mode='w+',
+                              shape=(numCells,numCells))
+        self.grid.flush()
+
+        self.pool = Pool(processes, initWorker,
+                         (self.gridFile, corner1, corner2, numCells, costModel))
+
+    def updateGrid(self, grid):
+        '''
+        Copy grid into the shared file. Only call this
+        while no query is running
+        '''
+        self.grid[:] = grid
+        self.grid.flush()
+
+    def planPairs(self, pairs):
+        '''
+        Plan between every (start, goal) pair in map coordinates
+
+        Returns the list of path costs in the same order
+        '''
+        return self.pool.map(planPair, pairs)
+
+    def planGoals(self, start, goals):
+        '''
+        Plan from start to every goal in goals
+
+        Returns the list of path costs in the same order
+        '''
+        return self.planPairs([(start, goal) for goal in goals])
+
+    def cheapest(self, start, goals):
+        '''
+        Returns a tuple (index, cost) of the cheapest goal to reach
+        from start, or None if none of the goals can be reached
+        '''
+        costs = self.planGoals(start, goals)
+        best = None
+        for index,cost in enumerate(costs):
+            if cost < INF and (best is None or cost < best[1]):
+                best = (index, cost)
+        return best
+
+    def close(self):
+        '''
+        Stop the processes and remove the shared grid
+        '''
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+        if self.grid is not None:
+            del self.grid
+            self.grid = None
+            os.remove(self.gridFile)
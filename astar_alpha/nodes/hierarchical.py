@@ -0,0 +1,442 @@
+import numpy as np
+
+from astar import Astar
+from open_list import OpenList
+
+INF = float('inf')
+
+# offsets of the 8 neighbors of a cell
+DIRECTIONS = [(0,1),(1,1),(1,0),(1,-1),(0,-1),(-1,-1),(-1,0),(-1,1)]
+
+def neighborSlices(shape):
+    '''
+    Returns a list of slice pairs (a,b), one for every direction,
+    where the cells of b in an array of the given shape are the
+    neighbors of the cells of a in that direction
+    '''
+    (width,height) = shape
+    slices = list()
+    for (dx,dy) in DIRECTIONS:
+        a = (slice(max(-dx,0), width - max(dx,0)), slice(max(-dy,0), height - max(dy,0)))
+        b = (slice(max(dx,0), width - max(-dx,0)), slice(max(dy,0), height - max(-dy,0)))
+        slices.append((a,b))
+    return slices
+
+class HierarchicalAstar(Astar):
+    '''
+    Coarse to fine version of the Astar planner (HPA* style).
+
+    The grid is split into blocks of blockSize x blockSize cells
+    and the free cells of each block are split into regions that
+    are connected inside the block. The coarse search runs over
+    these regions, two regions are neighbors when a cell of one
+    touches a cell of the other. Then the full resolution search
+    is only allowed to use cells within corridorWidth blocks of
+    the regions on the coarse route, so the number of cells it
+    can expand grows with the length of the route instead of with
+    the area of the grid.
+
+    The regions are connected inside, so there is a path through
+    the corridor whenever there is one through the grid. The path
+    is the best one inside the corridor, which is usually but not
+    always the optimal path.
+
+    The regions are only recomputed when the grid changes, and
+    then only in the blocks that changed.
+    '''
+    def __init__(self, corner1, corner2, numCells, costModel=None,
+                 blockSize=8, corridorWidth=1):
+        Astar.__init__(self, corner1, corner2, numCells, costModel)
+
+        self.blockSize = blockSize
+        self.corridorWidth = corridorWidth
+
+        # number of blocks along each side of the grid
+        self.numBlocks = (numCells + blockSize - 1)//blockSize
+
+        # the coarse search only prices the moves
+        # between blocks by their length
+        self.coarseCostModel = self.costModel.__class__()
+
+        # copy of the grid the regions were computed for
+        self.regionGrid = None
+
+        # flat list with the region of every cell, regions are
+        # named by their first cell and obstacles are None
+        self.regions = None
+
+        # the regions as an array where the obstacles are
+        # numCells*numCells instead of None
+        self.labels = None
+
+        # region -> set of neighboring regions
+        self.regionNeighbors = None
+
+        # number of region and cell expansions of the last search
+        self.coarseExpansions = 0
+        self.expansions = 0
+
+    def blockOf(self, point):
+        '''
+        Block that a grid space point is in
+        '''
+        return (point[0]//self.blockSize, point[1]//self.blockSize)
+
+    def regionBlock(self, region):
+        '''
+        Block that a region is in
+        '''
+        return self.blockOf((region//self.numCells, region % self.numCells))
+
+    def updateRegions(self):
+        '''
+        Split the free cells of every block into connected regions
+        and find which regions touch.
+
+        Regions never reach outside of their block, so after the
+        first time only the blocks with changed cells are split
+        again and only their regions are connected again
+        '''
+        grid = np.array(self.grid, dtype=np.int8)
+        if self.regionGrid is None:
+            self.regionGrid = grid
+            self.labelGrid()
+            return
+
+        changed = np.flatnonzero(grid != self.regionGrid)
+        if len(changed) == 0:
+            return
+        self.regionGrid = grid
+
+        numCells = self.numCells
+        blockSize = self.blockSize
+        blocks = set(zip((changed // numCells // blockSize).tolist(),
+                         (changed % numCells // blockSize).tolist()))
+        if 2*len(blocks) > self.numBlocks*self.numBlocks:
+            # most of the grid changed
+            self.labelGrid()
+        else:
+            self.labelBlocks(sorted(blocks))
+
+    def spreadLabels(self, labels, free, inside):
+        '''
+        Spread the smallest label through each region of labels,
+        a view of self.labels. inside is a list of (a,b,mask) where
+        the cells of the slice b are the neighbors of the cells of
+        the slice a in one direction, and mask is True where they
+        are connected
+        '''
+        size = self.numCells*self.numCells
+        flat = self.labels.ravel()
+
+        changed = True
+        while changed:
+            old = labels.copy()
+            for (a,b,mask) in inside:
+                view = labels[a]
+                np.minimum(view, np.where(mask, labels[b], size), out=view)
+
+            # jump straight to the label of the label
+            labels[free] = flat[labels[free]]
+            changed = not np.array_equal(old, labels)
+
+    def labelGrid(self):
+        '''
+        Split every block of the region grid into regions
+        '''
+        numCells = self.numCells
+        size = numCells*numCells
+
+        free = self.regionGrid != -1
+        blockIds = np.arange(numCells)//self.blockSize
+        blockIds = blockIds[:,None]*self.numBlocks + blockIds[None,:]
+
+        # every free cell starts out as its own region, obstacles
+        # get a label larger than every cell
+        labels = np.where(free, np.arange(size).reshape(numCells,numCells), size)
+        self.labels = labels
+
+        # the neighbors in the same block and the
+        # ones that cross into the next
+        inside = list()
+        crossing = list()
+        for (a,b) in neighborSlices(free.shape):
+            connected = free[a] & free[b]
+            sameBlock = blockIds[a] == blockIds[b]
+            inside.append((a, b, connected & sameBlock))
+            crossing.append((a, b, connected & ~sameBlock))
+
+        self.spreadLabels(labels, free, inside)
+
+        neighbors = dict()
+        for region in np.unique(labels[free]).tolist():
+            neighbors[region] = set()
+        for (a,b,mask) in crossing:
+            pairs = set(zip(labels[a][mask].tolist(), labels[b][mask].tolist()))
+            for (u,v) in pairs:
+                neighbors[u].add(v)
+
+        self.regions = [None if label == size else label for label in labels.ravel().tolist()]
+        self.regionNeighbors = neighbors
+
+    def labelBlocks(self, blocks):
+        '''
+        Split the given blocks of the region grid into regions again
+        and connect them to the regions around them
+        '''
+        numCells = self.numCells
+        size = numCells*numCells
+        blockSize = self.blockSize
+
+        free = self.regionGrid != -1
+        labels = self.labels
+        regions = self.regions
+        neighbors = self.regionNeighbors
+        indices = np.arange(size).reshape(numCells,numCells)
+
+        windows = list()
+        for (x,y) in blocks:
+            windows.append((slice(x*blockSize, min((x+1)*blockSize, numCells)),
+                            slice(y*blockSize, min((y+1)*blockSize, numCells))))
+
+        # forget the old regions of the blocks
+        for window in windows:
+            for region in np.unique(labels[window]).tolist():
+                for neighbor in neighbors.pop(region, ()):
+                    if neighbor in neighbors:
+                        neighbors[neighbor].discard(region)
+
+        for window in windows:
+            blockFree = free[window]
+            blockLabels = labels[window]
+            blockLabels[...] = np.where(blockFree, indices[window], size)
+
+            inside = list()
+            for (a,b) in neighborSlices(blockFree.shape):
+                inside.append((a, b, blockFree[a] & blockFree[b]))
+            self.spreadLabels(blockLabels, blockFree, inside)
+
+            for region in np.unique(blockLabels[blockFree]).tolist():
+                neighbors[region] = set()
+            for index,label in zip(indices[window].ravel().tolist(), blockLabels.ravel().tolist()):
+                regions[index] = None if label == size else label
+
+        # the block with a border of one cell
+        # to connect it to the blocks around it
+        for (xWindow,yWindow) in windows:
+            outer = (slice(max(xWindow.start-1, 0), min(xWindow.stop+1, numCells)),
+                     slice(max(yWindow.start-1, 0), min(yWindow.stop+1, numCells)))
+            inBlock = np.zeros(free[outer].shape, dtype=bool)
+            inBlock[xWindow.start-outer[0].start:xWindow.stop-outer[0].start,
+                    yWindow.start-outer[1].start:yWindow.stop-outer[1].start] = True
+
+            outerFree = free[outer]
+            outerLabels = labels[outer]
+            for (a,b) in neighborSlices(outerFree.shape):
+                mask = outerFree[a] & outerFree[b] & inBlock[a] & ~inBlock[b]
+                pairs = set(zip(outerLabels[a][mask].tolist(), outerLabels[b][mask].tolist()))
+                for (u,v) in pairs:
+                    neighbors[u].add(v)
+                    neighbors[v].add(u)
+
+    def searchRegions(self, startRegions, goalRegion):
+        '''
+        Astar over the regions from any of the start regions
+
+        Returns the list of regions on the route or None
+        '''
+        cost = self.coarseCostModel.cost
+        heuristic = self.coarseCostModel.heuristic
+        regionBlock = self.regionBlock
+        goalBlock = regionBlock(goalRegion)
+
+        gValues = dict()
+        parents = dict()
+        closed = set()
+        openList = OpenList()
+        for region in startRegions:
+            gValues[region] = 0
+            parents[region] = None
+            openList[region] = (heuristic(regionBlock(region), goalBlock), 0)
+
+        while len(openList) > 0:
+            region = openList.smallest()
+            del openList[region]
+            closed.add(region)
+            self.coarseExpansions += 1
+
+            if region == goalRegion:
+                route = list()
+                while region is not None:
+                    route.append(region)
+                    region = parents[region]
+                route.reverse()
+                return route
+
+            g = gValues[region]
+            block = regionBlock(region)
+            for neighbor in self.regionNeighbors[region]:
+                if neighbor in closed:
+                    continue
+
+                neighborBlock = regionBlock(neighbor)
+                newG = g + cost(block, neighborBlock)
+                if newG < gValues.get(neighbor, INF):
+                    gValues[neighbor] = newG
+                    parents[neighbor] = region
+                    openList[neighbor] = (newG + heuristic(neighborBlock, goalBlock), -newG)
+
+        return None
+
+    def createCorridor(self, blocks, width):
+        '''
+        Returns a flat list over the cells of the grid that is
+        True for every cell within width blocks of the blocks
+        '''
+        numBlocks = self.numBlocks
+        corridor = np.zeros((numBlocks,numBlocks), dtype=bool)
+        for (x,y) in blocks:
+            corridor[max(x-width,0):x+width+1, max(y-width,0):y+width+1] = True
+
+        blockSize = self.blockSize
+        numCells = self.numCells
+        cells = corridor.repeat(blockSize, axis=0).repeat(blockSize, axis=1)
+        return cells[:numCells,:numCells].ravel().tolist()
+
+    def searchCorridor(self, start, goal, allowed):
+        '''
+        Astar over the cells that are True in allowed
+
+        Returns the list of grid points from start to goal or None
+        '''
+        numCells = self.numCells
+        cells = self.regions
+        cost = self.costModel.cost
+        heuristic = self.costModel.heuristic
+
+        gValues = {start: 0}
+        parents = {start: None}
+        closed = set()
+        openList = OpenList()
+        openList[start] = (heuristic(start, goal), 0)
+
+        while len(openList) > 0:
+            point = openList.smallest()
+            del openList[point]
+            closed.add(point)
+            self.expansions += 1
+
+            if point == goal:
+                path = list()
+                while point is not None:
+                    path.append(point)
+                    point = parents[point]
+                path.reverse()
+                return path
+
+            g = gValues[point]
+            for (dx,dy) in DIRECTIONS:
+                x = point[0] + dx
+                y = point[1] + dy
+                if x < 0 or y < 0 or x >= numCells or y >= numCells:
+                    continue
+
+                index = x*numCells + y
+                if cells[index] is None or not allowed[index]:
+                    continue
+
+                neighbor = (x,y)
+                if neighbor in closed:
+                    continue
+
+                newG = g + cost(point, neighbor)
+                if newG < gValues.get(neighbor, INF):
+                    gValues[neighbor] = newG
+                    parents[neighbor] = point
+                    # break ties towards the deeper node
+                    openList[neighbor] = (newG + heuristic(neighbor, goal), -newG)
+
+        return None
+
+    def computePath(self, start=None, goal=None):
+        '''
+        This method is responsible for computing a path from the
+        specified start point to the goal point, first over the
+        regions and then inside the corridor around them.
+
+        start is a tuple of the form (x,y) where x and y are coordinates
+        '''
+        if self.debug:
+            print "Computing path hierarchically..."
+
+        if start is None:
+            start = self.start
+        else:
+            self.start = start
+
+        if goal is None:
+            goal = self.goal
+        else:
+            self.goal = goal
+
+        if start is None or goal is None:
+            # clear the path and quit
+            self.clearPath()
+            return
+
+        try:
+            goal = self.transformMapToGrid(goal)
+            start = self.transformMapToGrid(start)
+        except Exception:
+            # clear the path and quit
+            self.clearPath()
+            return
+
+        self.coarseExpansions = 0
+        self.expansions = 0
+
+        if start == goal:
+            self.setPath([start])
+            return
+
+        self.updateRegions()
+        numCells = self.numCells
+        regions = self.regions
+
+        goalRegion = regions[goal[0]*numCells + goal[1]]
+        if goalRegion is None:
+            # the goal can never be entered
+            self.clearPath()
+            return
+
+        startRegion = regions[start[0]*numCells + start[1]]
+        if startRegion is not None:
+            startRegions = [startRegion]
+        else:
+            # the robot is allowed to leave an obstacle,
+            # so start from the regions around it
+            startRegions = set()
+            for point in self.getNeighbors(start):
+                region = regions[point[0]*numCells + point[1]]
+                if region is not None:
+                    startRegions.add(region)
+
+        route = self.searchRegions(startRegions, goalRegion)
+        if route is None:
+            # no path could be found
+            # clear the old path
+            self.clearPath()
+            return
+
+        blocks = [self.regionBlock(region) for region in route]
+        blocks.append(self.blockOf(start))
+        allowed = self.createCorridor(blocks, self.corridorWidth)
+
+        gridPath = self.searchCorridor(start, goal, allowed)
+        if gridPath is None:
+            # no path could be found
+            # clear the old path
+            self.clearPath()
+            return
+
+        self.setPath(gridPath)
@@ -0,0 +1,252 @@
+from astar import Astar
+from cost_model import OctileCost
+from open_list import OpenList
+
+def sign(value):
+    '''
+    Returns -1, 0 or 1
+    '''
+    return (value > 0) - (value < 0)
+
+class JumpPointSearch(Astar):
+    '''
+    Jump Point Search version of the Astar planner.
+
+    Instead of adding every neighbor to the open list JPS scans
+    along straight and diagonal lines and only stops at cells
+    where an obstacle forces the optimal path to turn (jump
+    points). All of the cells in between are symmetric and are
+    never put on the open list.
+
+    JPS needs diagonal moves to cost sqrt(2) and straight moves
+    to cost 1, so paths are optimal in that (octile) metric. Any
+    other costModel raises a ValueError instead of silently
+    planning with octile costs. Diagonal moves between two
+    obstacles are allowed, the same as getNeighbors.
+    '''
+    def __init__(self, corner1, corner2, numCells, costModel=None):
+        # the cost models are old-style classes, so type() can't
+        # tell them apart and UniformCost is an OctileCost too
+        if costModel is not None and (costModel.__class__ is not OctileCost or
+                                      costModel.cellCosts is not None):
+            raise ValueError('jump point search only works with the octile cost model without cell costs')
+        Astar.__init__(self, corner1, corner2, numCells, costModel)
+
+        # number of jump points expanded by the last search
+        self.expansions = 0
+
+        # octile length of the saved path in cells
+        self.pathCost = None
+
+    def setCostRadius(self, radius):
+        '''
+        Cell costs break the symmetry that JPS skips over,
+        so only 0 is allowed
+        '''
+        if radius > 0:
+            raise ValueError('jump point search only works with the octile cost model without cell costs')
+        Astar.setCostRadius(self, radius)
+
+    def isOpen(self, x, y):
+        '''
+        True if (x,y) is in the grid and not an obstacle
+        '''
+        numCells = self.numCells
+        return (x >= 0 and x < numCells and y >= 0 and y < numCells and
+                not self.blocked[x*numCells + y])
+
+    def getDirections(self, point, parent):
+        '''
+        Directions worth searching from point when it was
+        reached from parent. Neighbors that can be reached at
+        least as cheaply without going through point are pruned
+        unless an obstacle forces them.
+        '''
+        isOpen = self.isOpen
+        (x,y) = point
+
+        if parent is None:
+            return [(dx,dy) for dx in (-1,0,1) for dy in (-1,0,1) if dx != 0 or dy != 0]
+
+        dx = sign(x - parent[0])
+        dy = sign(y - parent[1])
+
+        directions = list()
+        if dx != 0 and dy != 0:
+            # diagonal move, the natural neighbors
+            directions.append((dx,0))
+            directions.append((0,dy))
+            directions.append((dx,dy))
+            # forced neighbors
+            if not isOpen(x-dx,y) and isOpen(x-dx,y+dy):
+                directions.append((-dx,dy))
+            if not isOpen(x,y-dy) and isOpen(x+dx,y-dy):
+                directions.append((dx,-dy))
+        elif dx != 0:
+            # horizontal move
+            directions.append((dx,0))
+            if not isOpen(x,y+1) and isOpen(x+dx,y+1):
+                directions.append((dx,1))
+            if not isOpen(x,y-1) and isOpen(x+dx,y-1):
+                directions.append((dx,-1))
+        else:
+            # vertical move
+            directions.append((0,dy))
+            if not isOpen(x+1,y) and isOpen(x+1,y+dy):
+                directions.append((1,dy))
+            if not isOpen(x-1,y) and isOpen(x-1,y+dy):
+                directions.append((-1,dy))
+
+        return directions
+
+    def jumpStraight(self, x, y, dx, dy, goal):
+        '''
+        Scan from (x,y) in the horizontal or vertical direction
+        (dx,dy) and return the first jump point or None
+        '''
+        isOpen = self.isOpen
+        while True:
+            x += dx
+            y += dy
+            if not isOpen(x,y):
+                return None
+            if (x,y) == goal:
+                return (x,y)
+
+            if dx != 0:
+                if ((not isOpen(x,y+1) and isOpen(x+dx,y+1)) or
+                    (not isOpen(x,y-1) and isOpen(x+dx,y-1))):
+                    return (x,y)
+            else:
+                if ((not isOpen(x+1,y) and isOpen(x+1,y+dy)) or
+                    (not isOpen(x-1,y) and isOpen(x-1,y+dy))):
+                    return (x,y)
+
+    def jump(self, x, y, dx, dy, goal):
+        '''
+        Scan from (x,y) in the direction (dx,dy) and return the
+        first jump point or None
+        '''
+        if dx == 0 or dy == 0:
+            return self.jumpStraight(x, y, dx, dy, goal)
+
+        isOpen = self.isOpen
+        while True:
+            x += dx
+            y += dy
+            if not isOpen(x,y):
+                return None
+            if (x,y) == goal:
+                return (x,y)
+
+            # forced neighbors
+            if ((not isOpen(x-dx,y) and isOpen(x-dx,y+dy)) or
+                (not isOpen(x,y-dy) and isOpen(x+dx,y-dy))):
+                return (x,y)
+
+            # a diagonal cell is a jump point if either of
+            # the straight scans leaving it finds one
+            if (self.jumpStraight(x, y, dx, 0, goal) is not None or
+                self.jumpStraight(x, y, 0, dy, goal) is not None):
+                return (x,y)
+
+    def computePath(self, start=None, goal=None):
+        '''
+        This method is responsible for computing an optimum path
+        from the specified start point to the goal point.
+
+        start is a tuple of the form (x,y) where x and y are coordinates
+        '''
+        if self.debug:
+            print "Computing path with jump point search..."
+
+        if start is None:
+            start = self.start
+        else:
+            self.start = start
+
+        if goal is None:
+            goal = self.goal
+        else:
+            self.goal = goal
+
+        self.pathCost = None
+
+        if start is None or goal is None:
+            # clear the path and quit
+            self.clearPath()
+            return
+
+        try:
+            goal = self.transformMapToGrid(goal)
+            start = self.transformMapToGrid(start)
+        except Exception:
+            # clear the path and quit
+            self.clearPath()
+            return
+
+        self.expansions = 0
+
+        # flat list of the obstacles, see Astar.computePath
+        self.blocked = self.workspace.syncGrid(self.grid)
+
+        gValues = {start: 0}
+        parents = {start: None}
+        closed = set()
+
+        # between two cells on a straight or diagonal
+        # line this is also the cost of the move
+        heuristic = self.costModel.heuristic
+
+        openList = OpenList()
+        openList[start] = (heuristic(start, goal), 0)
+
+        found = False
+        while len(openList) > 0:
+            point = openList.smallest()
+            del openList[point]
+            closed.add(point)
+
+            if point == goal:
+                found = True
+                break
+
+            self.expansions += 1
+
+            for dx,dy in self.getDirections(point, parents[point]):
+                jumpPoint = self.jump(point[0], point[1], dx, dy, goal)
+                if jumpPoint is None or jumpPoint in closed:
+                    continue
+
+                g = gValues[point] + heuristic(point, jumpPoint)
+                if g < gValues.get(jumpPoint, float('inf')):
+                    gValues[jumpPoint] = g
+                    parents[jumpPoint] = point
+                    h = heuristic(jumpPoint, goal)
+                    # prefer deeper nodes when f ties
+                    openList[jumpPoint] = (g + h, h)
+
+        if not found:
+            # no path could be found
+            # clear the old path
+            self.clearPath()
+            return
+
+        # walk back through the jump points
+        jumpPoints = [goal]
+        while parents[jumpPoints[-1]] is not None:
+            jumpPoints.append(parents[jumpPoints[-1]])
+        jumpPoints.reverse()
+
+        # fill in the cells between the jump points. Each
+        # segment is either straight or diagonal
+        gridPath = [start]
+        for point in jumpPoints[1:]:
+            (x,y) = gridPath[-1]
+            while (x,y) != point:
+                x += sign(point[0] - x)
+                y += sign(point[1] - y)
+                gridPath.append((x,y))
+
+        self.setPath(gridPath)
+        self.pathCost = gValues[goal]
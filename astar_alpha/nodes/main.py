@@ -9,96 +9,112 @@ from geometry_msgs.msg._Point import Point as PointMsg
 from geometry_msgs.msg._PoseStamped import PoseStamped as PoseStampedMsg
 from msg_alpha.msg._PointList import PointList as PointListMsg
 from msg_alpha.msg._Goal import Goal as GoalMsg
+from diagnostic_msgs.msg import DiagnosticArray as DiagnosticArrayMsg
+from diagnostic_msgs.msg import DiagnosticStatus as DiagnosticStatusMsg
+from diagnostic_msgs.msg import KeyValue as KeyValueMsg
 
 import re
 
+from anytime import AnytimeAstar
 from astar import Astar
+from cost_model import OctileCost, UniformCost
+from dstar_lite import DStarLite
+from hierarchical import HierarchicalAstar
+from jps import JumpPointSearch
+from path_publisher import PathPublisher
+from planner_worker import PlannerWorker
 
 from math import ceil, floor, sqrt
 
 RATE = 20
 
-position = None
-
 corner1 = None
 corner2 = None
 numCells = None
 
 searcher = None
 
-newPath = True
+# runs the searcher on its own thread
+worker = None
 
-wallPoints = []
+# 0 only prints the setup, 1 also prints every new path
+# and obstacle message, 2 also prints every cycle and search
+debug = 0
 
 # regex
 localPattern = re.compile('costmap_local')
 globalPattern = re.compile('costmap_global')
 
 def goalCallback(data):
-    global searcher, newPath
-    
-    # if there is no goal or the goal has changed and
-    # the stay put flag is not set
-
-    new = False
-
-    if((searcher.goal is None or (searcher.goal[0] != data.goal.x or searcher.goal[1] != data.goal.y)) and not data.none):
-        if(searcher is None or position is None):
-            return
-        searcher.start = (position.x,position.y)
-        new = searcher.updateGoal((data.goal.x,data.goal.y))
-    elif(data.none):
-        # otherwise stay put so set goal to none
-        searcher.goal = None
-        if(len(searcher.path) > 0):
-            # only need to run computePath if
-            # there is an existing path
-            searcher.computePath()
-            new = True
-
-    print "updated goal recomputed a path: %s" % new
-
-    newPath = newPath or new
+    '''
+    Hands the goal to the planner worker, if the stay put
+    flag is set the goal is None
+    '''
+    if(data.none):
+        worker.putGoal(None)
+    else:
+        worker.putGoal((data.goal.x,data.goal.y))
 
 def inflatedObstaclesCallback(data):
-    global searcher, newPath, wallPoints
-    
+    '''
+    Hands the obstacles to the planner worker. All of the messages
+    that arrive during one search are applied as a single update
+    '''
     if re.search(globalPattern,str(data._connection_header)):
-        print "Walls!"
-        wallPoints = list()
-        for point in data.cells:
-            wallPoints.append((point.x,point.y))
+        if debug >= 1:
+            print "Walls!"
+        worker.putWalls(worker.obstacles.cellsToArray(data.cells))
     elif re.search(localPattern,str(data._connection_header)):
-        print "Sensors"
-        if(searcher is None or position is None):
-            return
-
-        # converting to the tuple format is really inefficient
-        # should change the astar method to expect to be able to
-        # access the coorindates with .x and .y
-        closedPoints = list()
-        for point in data.cells:
-            searcher.start = (position.x,position.y)
-            closedPoints.append((point.x,point.y))
-            
-            closedPoints = closedPoints + wallPoints
-            
-            new = searcher.updateClosedList(closedPoints)
-
-            print "inflated obstacles recomputed a path: %s" % new
-
-            newPath = newPath or new
+        if debug >= 1:
+            print "Sensors"
+        worker.putLocal(worker.obstacles.cellsToArray(data.cells))
 
 def poseCallback(pose):
     '''
     Updates the robot's best estimate on position and orientation
     '''
-    global position
-    position = pose.pose.position
+    worker.putPose((pose.pose.position.x,pose.pose.position.y))
+
+def pathToPointList(path):
+    '''
+    Builds the PointList message for a path
+    '''
+    pointList = PointListMsg()
+    for point in path:
+        pathPoint = PointMsg()
+        pathPoint.x = point[0]
+        pathPoint.y = point[1]
+        pointList.points.append(pathPoint)
+    return pointList
+
+def statsToDiagnostics(stats, planner):
+    '''
+    Builds the DiagnosticArray message for the stats of a search
+    '''
+    status = DiagnosticStatusMsg()
+    status.name = 'astar_alpha: %s search' % planner
+    status.hardware_id = 'astar_alpha'
+    if stats['found']:
+        status.level = DiagnosticStatusMsg.OK
+        status.message = 'path found'
+    else:
+        status.level = DiagnosticStatusMsg.WARN
+        status.message = 'no path'
+
+    for key in sorted(stats):
+        value = KeyValueMsg()
+        value.key = key
+        value.value = str(stats[key])
+        status.values.append(value)
+
+    diagnostics = DiagnosticArrayMsg()
+    diagnostics.header.stamp = rospy.Time.now()
+    diagnostics.status.append(status)
+    return diagnostics
 
 def main():
     global corner1, corner2, numCells
-    global searcher, newPath
+    global searcher, worker, debug
 
     rospy.init_node('astar_alpha_main')
 
@@ -141,6 +157,29 @@ def main():
     else:
         numCells = 100
 
+    # planner selects the search algorithm
+    # astar searches from scratch every time
+    # dstarlite replans by repairing the last search tree
+    # jps uses jump point search, it only works with the octile costModel
+    # anytime finds a rough path quickly and improves it every cycle
+    # hierarchical searches blocks of cells first, then refines
+    if rospy.has_param('planner'):
+        planner = rospy.get_param('planner')
+    else:
+        planner = 'astar'
+
+    # seconds the anytime planner may search for in one cycle
+    if rospy.has_param('planningTime'):
+        planningTime = rospy.get_param('planningTime')
+    else:
+        planningTime = 0.6/RATE
+
+    # cells along each side of a block for the hierarchical planner
+    if rospy.has_param('blockSize'):
+        blockSize = rospy.get_param('blockSize')
+    else:
+        blockSize = 8
+
     # topic that the node looks for the closed points on
     if rospy.has_param('inflatedTopic'):
         inflatedTopic = rospy.get_param('inflatedTopic')
@@ -153,8 +192,75 @@ def main():
     else:
         goalTopic = 'goal_point'
 
+    # smoothPath publishes only the waypoints where the path
+    # turns, at the cell centers, instead of every cell on the path
+    if rospy.has_param('smoothPath'):
+        smoothPath = rospy.get_param('smoothPath')
+    else:
+        smoothPath = True
+
+    # rate in Hz that an unchanged path is sent again,
+    # 0 only sends the path when it changes
+    if rospy.has_param('heartbeatRate'):
+        heartbeatRate = rospy.get_param('heartbeatRate')
+    else:
+        heartbeatRate = 1.0
+
+    # amount of output, see debug at the top
+    if rospy.has_param('debug'):
+        debug = rospy.get_param('debug')
+
+    # diagnostics counts and times every search and publishes
+    # the results on /diagnostics, this slows the search down
+    if rospy.has_param('diagnostics'):
+        diagnostics = rospy.get_param('diagnostics')
+    else:
+        diagnostics = False
+
+    # costModel selects how moves are priced
+    # octile charges sqrt(2) for diagonal moves
+    # uniform charges 1 for every move
+    if rospy.has_param('costModel'):
+        costModelName = rospy.get_param('costModel')
+    else:
+        costModelName = 'octile'
+
+    # costRadius makes the cells within that many cells of an
+    # inflated obstacle more expensive to enter so the path keeps
+    # its distance where there is room, 0 turns it off. jps only
+    # works with 0. A move next to an obstacle costs 1+costWeight
+    # times as much as on open ground
+    if rospy.has_param('costRadius'):
+        costRadius = rospy.get_param('costRadius')
+    else:
+        costRadius = 0
+
+    if rospy.has_param('costWeight'):
+        costWeight = rospy.get_param('costWeight')
+    else:
+        costWeight = 1.0
+
+    if costModelName == 'uniform':
+        costModel = UniformCost(weight=costWeight)
+    else:
+        costModel = OctileCost(weight=costWeight)
+
     # initialize an instance of the Astar class
-    searcher = Astar(corner1,corner2,numCells)
+    if planner == 'dstarlite':
+        searcher = DStarLite(corner1,corner2,numCells,costModel)
+    elif planner == 'jps':
+        searcher = JumpPointSearch(corner1,corner2,numCells,costModel)
+    elif planner == 'hierarchical':
+        searcher = HierarchicalAstar(corner1,corner2,numCells,costModel,blockSize)
+    elif planner == 'anytime':
+        searcher = AnytimeAstar(corner1,corner2,numCells,costModel,planningTime)
+    else:
+        searcher = Astar(corner1,corner2,numCells,costModel)
+    # the cell costs are built again from the inflated
+    # obstacles every time they change
+    searcher.setCostRadius(costRadius)
+    searcher.collectStats = diagnostics
+    searcher.debug = debug >= 2
     naptime = rospy.Rate(RATE)
     
     print "corner1: "
@@ -165,47 +271,82 @@ def main():
     print ""
     print "numCells: %i" % numCells
     print ""
+    print "planner: %s" % planner
+    print ""
+    print "costModel: %s" % costModelName
+    print ""
+    print "costRadius: %i" % costRadius
+    print ""
+    print "costWeight: %f" % costWeight
+    print ""
+    print "smoothPath: %s" % smoothPath
+    print ""
+    print "heartbeatRate: %s" % heartbeatRate
+    print ""
+    print "debug: %i" % debug
+    print ""
+    print "diagnostics: %s" % diagnostics
+    print ""
     print "goal topics: %s" % goalTopic
     print ""
     print "inflatedTopic: %s" % inflatedTopic
 
+    worker = PlannerWorker(searcher, smooth=smoothPath)
+
     rospy.Subscriber(goalTopic,GoalMsg,goalCallback)
     rospy.Subscriber(inflatedTopic,GridCellsMsg,inflatedObstaclesCallback)
     rospy.Subscriber('map_pos', PoseStampedMsg, poseCallback)
 
     pathPointPub = rospy.Publisher('point_list', PointListMsg)
 
-    first_run = True
-    pointList = PointListMsg()
+    if heartbeatRate > 0:
+        heartbeat = 1.0/heartbeatRate
+    else:
+        heartbeat = None
+    publisher = PathPublisher(pathPointPub.publish, pathToPointList, heartbeat)
+
+    if diagnostics:
+        diagnosticsPub = rospy.Publisher('/diagnostics', DiagnosticArrayMsg)
+    # number of searches the last diagnostics were sent for
+    searches = 0
+    # coalesced obstacle updates at the last print
+    coalesced = 0
+
+    worker.start()
+
     while not rospy.is_shutdown():
-        pointList.new = newPath
-        
-        print "searcher.start"
-        print searcher.start
-        print ""
-        print "searcher.goal"
-        print searcher.goal
-        print ""
-        print "newPath"
-        print newPath
-        print ""
-        print "searcher.path"
-        print searcher.path
-        print ""
-
-        pointList.points = []
-        for point in searcher.path:
-            pathPoint = PointMsg()
-            pathPoint.x = point[0]
-            pathPoint.y = point[1]
-            pointList.points.append(pathPoint)
-
-        pathPointPub.publish(pointList)
-
-        if newPath:
-            newPath = False            
+        # the worker replaces the snapshot as a whole so
+        # this is always a complete path
+        (version, path) = worker.latest()
+        new = version != publisher.version
+
+        publisher.update(version, path, rospy.get_time())
+
+        stats = worker.stats
+        if diagnostics and stats is not None and stats['searches'] != searches:
+            searches = stats['searches']
+            diagnosticsPub.publish(statsToDiagnostics(stats, planner))
+
+        if new and debug >= 1:
+            print "path version %i with %i points" % (version, len(path))
+
+        if debug >= 1:
+            counts = worker.obstacleCounts()
+            if counts['coalesced'] != coalesced:
+                coalesced = counts['coalesced']
+                print "obstacle updates coalesced: %i" % coalesced
+
+        if debug >= 2:
+            print "path version"
+            print version
+            print ""
+            print "path"
+            print path
+            print ""
 
         naptime.sleep()
 
+    worker.stop()
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,99 @@
+from threading import Lock
+
+import numpy as np
+
+class ObstacleBuffer():
+    '''
+    Collects obstacle messages from the subscriber callbacks so the
+    main loop can apply them as a single grid update per cycle.
+
+    Every GridCells message is a complete snapshot of its costmap,
+    so only the newest local and wall snapshots are kept. Messages
+    that arrive before the previous ones were applied are merged
+    into one update and counted in coalesced.
+
+    The walls and the local obstacles are tracked separately so
+    the static walls only have to be rasterized when they change.
+    '''
+    def __init__(self):
+        self.lock = Lock()
+
+        # latest snapshots as (N,2) arrays in the map frame
+        self.localPoints = np.zeros((0,2))
+        self.wallPoints = np.zeros((0,2))
+
+        # True when there is a snapshot that hasn't been taken
+        self.pending = False
+        self.localChanged = False
+        self.wallsChanged = False
+
+        # number of messages given to the buffer
+        self.received = 0
+        # number of messages merged into another update
+        self.coalesced = 0
+        # number of updates taken by the main loop
+        self.applied = 0
+
+    def cellsToArray(self, cells):
+        '''
+        Convert a list of geometry_msgs Points into an (N,2) array
+        '''
+        points = np.array([(point.x,point.y) for point in cells], dtype=np.float64)
+        return points.reshape(-1,2)
+
+    def putLocal(self, points):
+        '''
+        Save the latest snapshot of the local obstacles
+        '''
+        with self.lock:
+            self.localPoints = points
+            self.localChanged = True
+            self.__markPending()
+
+    def putWalls(self, points):
+        '''
+        Save the latest snapshot of the static walls
+        '''
+        with self.lock:
+            self.wallPoints = points
+            self.wallsChanged = True
+            self.__markPending()
+
+    def __markPending(self):
+        self.received += 1
+        if self.pending:
+            self.coalesced += 1
+        self.pending = True
+
+    def counts(self):
+        '''
+        Returns a dict with the received, coalesced and applied counts
+        '''
+        with self.lock:
+            return {'received': self.received,
+                    'coalesced': self.coalesced,
+                    'applied': self.applied}
+
+    def take(self):
+        '''
+        Returns a tuple (localPoints, wallPoints) with the newest
+        snapshots if anything changed since the last call,
+        otherwise returns None. A snapshot that didn't change
+        since the last call is None in the tuple.
+        '''
+        with self.lock:
+            if not self.pending:
+                return None
+
+            localPoints = None
+            if self.localChanged:
+                localPoints = self.localPoints
+            wallPoints = None
+            if self.wallsChanged:
+                wallPoints = self.wallPoints
+
+            self.pending = False
+            self.localChanged = False
+            self.wallsChanged = False
+            self.applied += 1
+            return (localPoints, wallPoints)
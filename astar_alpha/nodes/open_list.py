@@ -0,0 +1,181 @@
+class OpenList(dict):
+    """Dictionary that can be used as a priority queue.
+
+    Keys of the dictionary are items to be put into the queue, and
+    values are their respective priorities. Values only need to support the < operator.
+
+    Internally this is an indexed binary heap. Every key remembers
+    its position in the heap so push, pop and changing the priority
+    of a key already in the queue (decrease-key) are all O(log n),
+    and the heap never holds stale entries.
+
+    The 'smallest' method can be used to return the object with lowest
+    priority, and 'pop_smallest' also removes it.
+
+    The 'sorted_iter' method provides a destructive sorted iterator.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(OpenList, self).__init__(*args, **kwargs)
+        self._rebuild_heap()
+
+    def _rebuild_heap(self):
+        # heap of keys, ordered by their values in the dictionary
+        self._heap = self.keys()
+        # position of every key in the heap
+        self._index = dict()
+        for i,key in enumerate(self._heap):
+            self._index[key] = i
+
+        for i in reversed(range(len(self._heap)//2)):
+            self._siftDown(i)
+
+    def _swap(self, i, j):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._index[heap[i]] = i
+        self._index[heap[j]] = j
+
+    def _siftUp(self, i):
+        '''
+        Move the key at position i towards the root until
+        its parent has a smaller priority
+        '''
+        heap = self._heap
+        index = self._index
+        get = dict.__getitem__
+
+        key = heap[i]
+        val = get(self, key)
+        while i > 0:
+            parent = (i - 1) >> 1
+            parentKey = heap[parent]
+            if not val < get(self, parentKey):
+                break
+            heap[i] = parentKey
+            index[parentKey] = i
+            i = parent
+        heap[i] = key
+        index[key] = i
+
+    def _siftDown(self, i):
+        '''
+        Move the key at position i towards the leaves until
+        both of its children have a larger priority
+        '''
+        heap = self._heap
+        index = self._index
+        get = dict.__getitem__
+        size = len(heap)
+
+        key = heap[i]
+        val = get(self, key)
+        child = 2*i + 1
+        while child < size:
+            # pick the smaller of the two children
+            right = child + 1
+            if right < size and get(self, heap[right]) < get(self, heap[child]):
+                child = right
+            childKey = heap[child]
+            if not get(self, childKey) < val:
+                break
+            heap[i] = childKey
+            index[childKey] = i
+            i = child
+            child = 2*i + 1
+        heap[i] = key
+        index[key] = i
+
+    def _removeAt(self, i):
+        '''
+        Remove the key at heap position i and return it
+        '''
+        heap = self._heap
+        last = len(heap) - 1
+        if i != last:
+            self._swap(i, last)
+        key = heap.pop()
+        del self._index[key]
+
+        if i < len(heap):
+            # the key moved into the hole may belong
+            # either above or below its new position
+            self._siftUp(i)
+            self._siftDown(self._index[heap[i]])
+
+        return key
+
+    def smallest(self):
+        """Return the item with the lowest priority.
+
+        Raises IndexError if the object is empty.
+        """
+
+        return self._heap[0]
+
+    def pop_smallest(self):
+        """Return the item with the lowest priority and remove it.
+
+        Raises IndexError if the object is empty.
+        """
+
+        key = self._removeAt(0)
+        return super(OpenList, self).pop(key)
+
+    def __setitem__(self, key, val):
+        index = self._index
+
+        super(OpenList, self).__setitem__(key, val)
+
+        if key in index:
+            # the priority changed, so the key may have
+            # to move in either direction
+            i = index[key]
+            self._siftUp(i)
+            self._siftDown(index[key])
+        else:
+            self._heap.append(key)
+            self._siftUp(len(self._heap) - 1)
+
+    def __delitem__(self, key):
+        self._removeAt(self._index[key])
+        super(OpenList, self).__delitem__(key)
+
+    def pop(self, key, *args):
+        if key in self:
+            self._removeAt(self._index[key])
+        return super(OpenList, self).pop(key, *args)
+
+    def popitem(self):
+        if not self._heap:
+            raise KeyError('popitem(): dictionary is empty')
+        key = self._heap[-1]
+        return (key, self.pop(key))
+
+    def clear(self):
+        super(OpenList, self).clear()
+        self._heap = []
+        self._index = dict()
+
+    def setdefault(self, key, val):
+        if key not in self:
+            self[key] = val
+            return val
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        # Reimplementing dict.update is tricky -- see e.g.
+        # http://mail.python.org/pipermail/python-ideas/2007-May/000744.html
+        # We just rebuild the heap from scratch after passing to super.
+
+        super(OpenList, self).update(*args, **kwargs)
+        self._rebuild_heap()
+
+    def sorted_iter(self):
+        """Sorted iterator of the priority dictionary items.
+
+        Beware: this will destroy elements as they are returned.
+        """
+
+        while self:
+            yield self.pop_smallest()
@@ -0,0 +1,54 @@
+class PathPublisher():
+    '''
+    Decides when the path has to be published.
+
+    The message for a path is only built once per path version
+    and sent right away with new set. After that the same message
+    is only sent again every heartbeat seconds with new cleared,
+    so late subscribers still get the path without the node
+    publishing it on every cycle.
+
+    publish is called with the message to send, for example the
+    publish method of a rospy Publisher. makeMessage turns a path
+    into a message that has a new field.
+    '''
+    def __init__(self, publish, makeMessage, heartbeat=1.0):
+        self.publish = publish
+        self.makeMessage = makeMessage
+
+        # seconds between sending an unchanged path,
+        # None to only send changes
+        self.heartbeat = heartbeat
+
+        # version and message of the last path sent
+        self.version = None
+        self.message = None
+
+        # time the last message was sent
+        self.lastTime = None
+
+        # number of messages sent and cycles that sent nothing
+        self.published = 0
+        self.skipped = 0
+
+    def update(self, version, path, now):
+        '''
+        Send the path if it is a new version or the heartbeat is
+        due. now is the current time in seconds.
+
+        Returns True if a message was sent
+        '''
+        if version != self.version:
+            self.version = version
+            self.message = self.makeMessage(path)
+            self.message.new = True
+        elif self.heartbeat is None or now - self.lastTime < self.heartbeat:
+            self.skipped += 1
+            return False
+        else:
+            self.message.new = False
+
+        self.publish(self.message)
+        self.lastTime = now
+        self.published += 1
+        return True
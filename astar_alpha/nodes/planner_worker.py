@@ -0,0 +1,229 @@
+from threading import Condition, Thread
+
+from obstacle_buffer import ObstacleBuffer
+
+class PlannerWorker():
+    '''
+    Runs the planner on its own thread so the subscriber callbacks
+    never have to wait for a search.
+
+    The callbacks only drop the newest goal, pose and obstacles
+    into the mailbox with putGoal, putPose, putLocal and putWalls.
+    Values that are replaced before the worker gets to them are
+    never planned for. The worker applies everything that is
+    waiting with at most one search and then publishes the path.
+
+    Finished paths are published as a (version, path) snapshot
+    where path is a tuple. The snapshot is replaced as a whole, so
+    the publish loop gets a complete path from latest() without
+    locking and can tell from the version if it is new. With
+    smooth set the published path is only the waypoints from
+    searcher.smoothPath().
+    '''
+    def __init__(self, searcher, obstacles=None, smooth=False):
+        self.searcher = searcher
+
+        # publish only the waypoints where the path turns
+        self.smooth = smooth
+
+        if obstacles is None:
+            obstacles = ObstacleBuffer()
+        self.obstacles = obstacles
+
+        # guards the mailbox and wakes up the worker
+        self.condition = Condition()
+
+        # latest goal, None means stay put
+        self.goal = None
+        self.goalChanged = False
+
+        # latest position of the robot as (x,y)
+        self.position = None
+
+        # True when something was put in the mailbox
+        # that the worker hasn't looked at yet
+        self.pending = False
+
+        # newest path and how many times a path was published
+        self.snapshot = (0, ())
+
+        # copy of the searcher's stats after the last step with
+        # the obstacle counts added as obstaclesReceived,
+        # obstaclesCoalesced and obstaclesApplied. Only set
+        # when the searcher collects stats
+        self.stats = None
+
+        # seconds the worker sleeps while there is nothing to do
+        self.period = 0.05
+
+        self.running = False
+        self.thread = None
+
+    def putGoal(self, goal):
+        '''
+        Save the latest goal as (x,y) or None to stay put
+        '''
+        with self.condition:
+            self.goal = goal
+            self.goalChanged = True
+            self.pending = True
+            self.condition.notify()
+
+    def putPose(self, position):
+        '''
+        Save the latest position of the robot as (x,y)
+        '''
+        with self.condition:
+            self.position = position
+
+    def putLocal(self, points):
+        '''
+        Save the latest snapshot of the local obstacles
+        '''
+        self.obstacles.putLocal(points)
+        self.wake()
+
+    def putWalls(self, points):
+        '''
+        Save the latest snapshot of the static walls
+        '''
+        self.obstacles.putWalls(points)
+        self.wake()
+
+    def wake(self):
+        with self.condition:
+            self.pending = True
+            self.condition.notify()
+
+    def obstacleCounts(self):
+        '''
+        Returns a dict with the number of obstacle messages that were
+        received, coalesced into another update and applied
+        '''
+        return self.obstacles.counts()
+
+    def latest(self):
+        '''
+        Returns the newest (version, path) snapshot
+        '''
+        return self.snapshot
+
+    def publish(self, path):
+        version = self.snapshot[0] + 1
+        self.snapshot = (version, tuple(path))
+
+    def currentPath(self):
+        '''
+        The path of the searcher as it should be published
+        '''
+        if self.smooth:
+            return self.searcher.smoothPath()
+        return self.searcher.path
+
+    def improving(self):
+        '''
+        True if the planner can still make its path better
+        by searching again, like the anytime planner
+        '''
+        searcher = self.searcher
+        return (getattr(searcher, 'converged', True) is False and
+                searcher.goal is not None and searcher.start is not None)
+
+    def step(self):
+        '''
+        Apply everything in the mailbox and replan if needed.
+
+        Returns True if a new path was published
+        '''
+        with self.condition:
+            position = self.position
+            if position is None:
+                # nothing can be planned until the robot
+                # knows where it is, keep the mailbox
+                self.pending = False
+                return False
+
+            goalChanged = self.goalChanged
+            goal = self.goal
+            self.goalChanged = False
+            self.pending = False
+
+        searcher = self.searcher
+        searcher.start = position
+        new = False
+
+        if goalChanged and goal is not None and goal != searcher.goal:
+            # the new goal needs a search anyway so only
+            # update the grid and search once
+            update = self.obstacles.take()
+            if update is not None:
+                searcher.updateLayers(update[0], update[1], recompute=False)
+            new = searcher.updateGoal(goal)
+        else:
+            update = self.obstacles.take()
+            if update is not None:
+                new = searcher.updateLayers(update[0], update[1])
+
+            if goalChanged and goal is None and searcher.goal is not None:
+                # stay put
+                searcher.goal = None
+                if len(searcher.path) > 0:
+                    # only need to run computePath if
+                    # there is an existing path
+                    searcher.computePath()
+                    new = True
+
+        if not new and self.improving():
+            # give the planner another time slice
+            oldPath = searcher.path
+            searcher.computePath()
+            new = searcher.path != oldPath
+
+        if new:
+            self.publish(self.currentPath())
+        elif self.smooth and update is not None:
+            # new obstacles can block a shortcut between waypoints
+            # without touching a cell of the path
+            path = tuple(self.currentPath())
+            if path != self.snapshot[1]:
+                self.publish(path)
+                new = True
+
+        if getattr(searcher, 'collectStats', False):
+            # a copy so the publish loop never sees
+            # the stats of a search that is running
+            stats = searcher.stats.asDict()
+            for key,value in self.obstacles.counts().iteritems():
+                stats['obstacles' + key.capitalize()] = value
+            self.stats = stats
+
+        return new
+
+    def run(self):
+        while self.running:
+            with self.condition:
+                if not self.pending and not self.improving():
+                    self.condition.wait(self.period)
+                if not self.running:
+                    break
+            self.step()
+
+    def start(self):
+        '''
+        Start planning on a daemon thread
+        '''
+        self.running = True
+        self.thread = Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        '''
+        Stop the thread and wait for the search it is on
+        '''
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
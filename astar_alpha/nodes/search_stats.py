@@ -0,0 +1,93 @@
+import time
+
+class SearchStats():
+    '''
+    Statistics of the last search of an Astar planner.
+
+    Counting and timing every heap operation and neighbor lookup
+    slows the search down, so the planner only does it when its
+    collectStats flag is set. Instead of checking the flag in the
+    search loop the planner wraps the functions the loop calls
+    with timed versions from this class, so a disabled planner
+    runs exactly the same loop as before.
+
+    The times are in seconds and include the overhead of the
+    timer itself, so they are best compared with each other.
+    '''
+    def __init__(self):
+        # number of searches the stats were collected for
+        self.searches = 0
+        self.reset()
+
+    def reset(self):
+        '''
+        Clear the stats for a new search
+        '''
+        self.expansions = 0
+        self.maxOpenSize = 0
+        self.pushes = 0
+        self.pops = 0
+
+        self.found = False
+        self.pathLength = 0
+
+        # time spent transforming points between the map and
+        # the grid, finding neighbors and on the open list
+        self.transformTime = 0.0
+        self.neighborTime = 0.0
+        self.heapTime = 0.0
+        self.totalTime = 0.0
+
+    def asDict(self):
+        '''
+        Copy of the stats as a dictionary
+        '''
+        return {'searches': self.searches,
+                'expansions': self.expansions,
+                'maxOpenSize': self.maxOpenSize,
+                'pushes': self.pushes,
+                'pops': self.pops,
+                'found': self.found,
+                'pathLength': self.pathLength,
+                'transformTime': self.transformTime,
+                'neighborTime': self.neighborTime,
+                'heapTime': self.heapTime,
+                'totalTime': self.totalTime}
+
+    def timedNeighbors(self, getNeighbors):
+        def neighbors(point):
+            start = time.time()
+            result = getNeighbors(point)
+            self.neighborTime += time.time() - start
+            return result
+        return neighbors
+
+    def timedPush(self, openList):
+        push = openList.__setitem__
+        def timedPush(key, value):
+            start = time.time()
+            push(key, value)
+            self.heapTime += time.time() - start
+            self.pushes += 1
+            size = len(openList)
+            if size > self.maxOpenSize:
+                self.maxOpenSize = size
+        return timedPush
+
+    def timedSmallest(self, openList):
+        smallest = openList.smallest
+        def timedSmallest():
+            start = time.time()
+            key = smallest()
+            self.heapTime += time.time() - start
+            return key
+        return timedSmallest
+
+    def timedRemove(self, openList):
+        remove = openList.__delitem__
+        def timedRemove(key):
+            start = time.time()
+            remove(key)
+            self.heapTime += time.time() - start
+            self.pops += 1
+        return timedRemove
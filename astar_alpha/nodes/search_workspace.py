@@ -0,0 +1,81 @@
+import numpy as np
+
+from open_list import OpenList
+
+class SearchWorkspace():
+    '''
+    Memory for the search that is kept between calls to computePath.
+
+    The g values, parents and closed flags live in flat lists with
+    one entry per cell (index x*numCells+y). Instead of clearing
+    them before every search each entry is stamped with the
+    generation it was written in, and an entry from an older
+    generation counts as empty. Starting a new search is just
+    incrementing the generation and emptying the open list.
+
+    The obstacles of the grid are kept in the flat list blocked,
+    which syncGrid only updates at the cells that changed since
+    the last search.
+    '''
+    def __init__(self, size):
+        self.size = size
+
+        # the current search, stamps from older searches are stale
+        self.generation = 0
+
+        # cost from the start and the index of the parent cell,
+        # only valid where seen is the current generation
+        self.gValues = [0.0]*size
+        self.parents = [-1]*size
+        self.seen = [0]*size
+
+        # generation that each cell was last expanded in
+        self.closed = [0]*size
+
+        # open cell indices keyed by (f, -g)
+        self.openList = OpenList()
+
+        # True for the obstacles of the grid from the last call to
+        # syncGrid, a flat copy of that grid and a buffer for
+        # finding the cells that changed
+        self.blocked = [False]*size
+        self.grid = np.zeros(size, dtype=np.int8)
+        self.changed = np.zeros(size, dtype=bool)
+
+    def reset(self):
+        '''
+        Forget the last search
+        '''
+        self.generation += 1
+        self.openList.clear()
+        return self.generation
+
+    def syncGrid(self, grid):
+        '''
+        Update blocked to the obstacles of grid and return it
+        '''
+        self.updateGrid(grid)
+        return self.blocked
+
+    def updateGrid(self, grid):
+        '''
+        Update blocked to the obstacles of grid and return the
+        indices of the cells that became or stopped being obstacles
+        '''
+        grid = np.asarray(grid, dtype=np.int8).reshape(-1)
+        changed = self.changed
+        np.not_equal(grid, self.grid, out=changed)
+        if not changed.any():
+            return []
+
+        indices = np.flatnonzero(changed)
+        values = grid[indices]
+        self.grid[indices] = values
+
+        flipped = list()
+        blocked = self.blocked
+        for index,value in zip(indices.tolist(), (values == -1).tolist()):
+            if blocked[index] != value:
+                blocked[index] = value
+                flipped.append(index)
+        return flipped
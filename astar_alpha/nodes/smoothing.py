@@ -0,0 +1,91 @@
+def sign(value):
+    '''
+    Returns -1, 0 or 1
+    '''
+    return (value > 0) - (value < 0)
+
+def removeCollinear(gridPath):
+    '''
+    Drop the points that are on the straight line between
+    the points before and after them
+    '''
+    if len(gridPath) < 3:
+        return list(gridPath)
+
+    points = [gridPath[0]]
+    for i in range(1, len(gridPath)-1):
+        a = points[-1]
+        b = gridPath[i]
+        c = gridPath[i+1]
+        cross = (b[0]-a[0])*(c[1]-b[1]) - (b[1]-a[1])*(c[0]-b[0])
+        dot = (b[0]-a[0])*(c[0]-b[0]) + (b[1]-a[1])*(c[1]-b[1])
+        if cross != 0 or dot <= 0:
+            points.append(b)
+    points.append(gridPath[-1])
+    return points
+
+def lineOfSight(cells, numCells, a, b):
+    '''
+    True if the straight line between the centers of cells a and
+    b only crosses free cells. cells is the grid as a flat list.
+
+    Every cell the line touches is checked, when it passes exactly
+    through a corner both cells beside the corner have to be free.
+    The first cell isn't checked so a path can leave an obstacle
+    '''
+    dx = abs(b[0]-a[0])
+    dy = abs(b[1]-a[1])
+    sx = sign(b[0]-a[0])
+    sy = sign(b[1]-a[1])
+
+    x = a[0]
+    y = a[1]
+    ix = 0
+    iy = 0
+    while ix < dx or iy < dy:
+        # which cell border the line crosses next
+        decision = (1 + 2*ix)*dy - (1 + 2*iy)*dx
+        if decision == 0:
+            if cells[(x+sx)*numCells + y] == -1 or cells[x*numCells + y+sy] == -1:
+                return False
+            x += sx
+            y += sy
+            ix += 1
+            iy += 1
+        elif decision < 0:
+            x += sx
+            ix += 1
+        else:
+            y += sy
+            iy += 1
+
+        if cells[x*numCells + y] == -1:
+            return False
+
+    return True
+
+def shortcut(cells, numCells, gridPath):
+    '''
+    Keep a waypoint only when the next one can't be
+    reached in a straight line from the last one kept
+    '''
+    if len(gridPath) < 3:
+        return list(gridPath)
+
+    points = [gridPath[0]]
+    for i in range(1, len(gridPath)-1):
+        if not lineOfSight(cells, numCells, points[-1], gridPath[i+1]):
+            points.append(gridPath[i])
+    points.append(gridPath[-1])
+    return points
+
+def smoothPath(grid, gridPath):
+    '''
+    Smallest set of waypoints along gridPath that can be
+    followed with straight lines through the free cells of grid
+    '''
+    numCells = len(grid)
+    cells = grid.ravel().tolist()
+    points = removeCollinear(gridPath)
+    points = shortcut(cells, numCells, points)
+    return removeCollinear(points)
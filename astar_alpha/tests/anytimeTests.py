@@ -0,0 +1,238 @@
+'''
+Created on Oct 17, 2026
+
+@author: agent
+'''
+import unittest
+import random
+
+import numpy as np
+
+from astar import Astar
+from anytime import AnytimeAstar
+from cost_model import OctileCost, UniformCost
+from plannerFixtures import pathCost, center, randomGrid, randomQueries, assertValidPath
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.planner = AnytimeAstar((0,0),(10,10),10,timeBudget=None)
+
+    def test_computePath(self):
+        planner = self.planner
+
+        planner.computePath((0,0),(1.5,1))
+        self.assertEqual(planner.path,[(0,0),(1,1)])
+        self.assertTrue(planner.converged)
+        self.assertEqual(planner.epsilonBound,1.0)
+
+        planner.computePath((0,0),(0.5,0.5))
+        self.assertEqual(planner.path,[(0,0)])
+
+        planner.computePath((0,0),(9.5,9.5))
+        self.assertEqual(len(planner.path),10)
+        assertValidPath(self, planner, (0,0), (9,9))
+
+        planner.computePath((0,0),(15,15))
+        self.assertEqual(planner.path,[])
+        self.assertEqual(planner.epsilonBound,None)
+
+    def test_walls(self):
+        planner = self.planner
+
+        grid = planner.createGrid()
+        grid[:,1] = -1
+        planner.grid = grid
+        planner.computePath((0,0),(0,2.5))
+        self.assertEqual(planner.path,[])
+        self.assertTrue(planner.converged)
+
+        grid = grid.copy()
+        grid[9][1] = 0
+        planner.grid = grid
+        planner.computePath((0,0),(0.1,2.5))
+        self.assertEqual(len(planner.path),19)
+        assertValidPath(self, planner, (0,0), (0,2))
+
+        # the goal can't be entered
+        planner.computePath((0,0),(5.5,1.5))
+        self.assertEqual(planner.path,[])
+
+    def test_timeBudget(self):
+        random.seed(12)
+
+        # a budget that has always run out
+        planner = AnytimeAstar((0,0),(60,60),60,timeBudget=-1)
+        planner.checkInterval = 1
+        searcher = Astar((0,0),(60,60),60)
+        grid = randomGrid(planner, 0.25)
+        grid[0][0] = 0
+        grid[59][59] = 0
+        planner.grid = grid
+        searcher.grid = grid
+
+        searcher.computePath((0.5,0.5),(59.5,59.5))
+        self.assertTrue(len(searcher.path) > 0)
+        optimal = pathCost(searcher)
+
+        # every call only gets to expand one cell
+        planner.computePath((0.5,0.5),(59.5,59.5))
+        self.assertEqual(planner.path,[])
+        self.assertEqual(planner.expansions,1)
+
+        bounds = []
+        calls = 1
+        while not planner.converged:
+            planner.computePath()
+            calls += 1
+            self.assertTrue(calls < 60*60*10)
+            if planner.epsilonBound is not None:
+                assertValidPath(self, planner, (0,0), (59,59))
+                self.assertTrue(pathCost(planner) <= planner.epsilonBound*optimal + 1e-9)
+                bounds.append(planner.epsilonBound)
+
+        self.assertEqual(bounds, sorted(bounds, reverse=True))
+        self.assertTrue(1.0 < bounds[0] <= planner.initialEpsilon)
+        self.assertEqual(planner.epsilonBound, 1.0)
+        self.assertAlmostEqual(pathCost(planner), optimal)
+
+    def test_moveStart(self):
+        random.seed(5)
+
+        planner = AnytimeAstar((0,0),(40,40),40,timeBudget=None)
+        searcher = Astar((0,0),(40,40),40)
+        grid = randomGrid(planner, 0.2)
+        grid[39][39] = 0
+        planner.grid = grid
+        searcher.grid = grid
+
+        planner.computePath((0.5,0.5),(39.5,39.5))
+        gValues = planner.gValues
+
+        for i in range(10):
+            start = (random.randint(0,39), random.randint(0,39))
+            planner.computePath((start[0]+.5,start[1]+.5))
+            searcher.computePath((start[0]+.5,start[1]+.5),(39.5,39.5))
+
+            # the search is kept
+            self.assertTrue(planner.gValues is gValues)
+            self.assertEqual(len(planner.path) > 0, len(searcher.path) > 0)
+            if len(planner.path) > 0:
+                assertValidPath(self, planner, start, (39,39))
+                self.assertAlmostEqual(pathCost(planner), pathCost(searcher))
+
+        # changing the grid repairs the search
+        grid = grid.copy()
+        grid[20][20] = -1 - grid[20][20]
+        planner.grid = grid
+        planner.computePath()
+        self.assertTrue(planner.gValues is gValues)
+        self.assertEqual(planner.epsilonBound, 1.0)
+
+    def test_repair(self):
+        random.seed(7)
+
+        # a budget that has always run out
+        planner = AnytimeAstar((0,0),(40,40),40,timeBudget=-1)
+        planner.checkInterval = 1
+        planner.computePath((0.5,0.5),(39.5,20.5))
+        while not planner.converged:
+            planner.computePath()
+        path = planner.path
+        self.assertTrue(len(path) > 0)
+
+        # an obstacle away from the path keeps it until
+        # the repaired search has a new one
+        grid = planner.grid.copy()
+        grid[5][35] = -1
+        planner.grid = grid
+        planner.computePath()
+        self.assertEqual(planner.path, path)
+        self.assertEqual(planner.epsilon, 1.0)
+        self.assertTrue(planner.expansions <= 1)
+
+        # an obstacle on the path drops it
+        (x,y) = planner.gridPath[10]
+        grid = grid.copy()
+        grid[x][y] = -1
+        planner.grid = grid
+        planner.computePath()
+        self.assertEqual(planner.path, [])
+        while not planner.converged:
+            planner.computePath()
+        assertValidPath(self, planner, (0,0), (39,20))
+
+        # the repaired search finds the same costs as starting over
+        for costModel in (OctileCost(), UniformCost()):
+            planner = AnytimeAstar((0,0),(30,30),30,costModel,timeBudget=None)
+            searcher = Astar((0,0),(30,30),30,costModel)
+            grid = randomGrid(planner, 0.2)
+            grid[29][29] = 0
+            for i in range(20):
+                grid = grid.copy()
+                for j in range(random.randint(1,20)):
+                    (x,y) = (random.randint(0,28), random.randint(0,28))
+                    grid[x][y] = -1 - grid[x][y]
+                planner.grid = grid
+                searcher.grid = grid
+
+                start = (random.randint(0,29), random.randint(0,29))
+                planner.computePath((start[0]+.5,start[1]+.5),(29.5,29.5))
+                searcher.computePath((start[0]+.5,start[1]+.5),(29.5,29.5))
+
+                self.assertEqual(len(planner.path) > 0, len(searcher.path) > 0)
+                if len(planner.path) > 0:
+                    assertValidPath(self, planner, start, (29,29))
+                    self.assertAlmostEqual(pathCost(planner), pathCost(searcher))
+
+    def test_cellCosts(self):
+        random = np.random.RandomState(10)
+
+        # the cell costs change with the obstacles, the repaired
+        # search gives the same path cost as starting over
+        for costModel in (OctileCost, UniformCost):
+            planner = AnytimeAstar((0,0),(30,30),30,costModel(),timeBudget=None)
+            searcher = Astar((0,0),(30,30),30,costModel())
+            walls = random.randint(0,30,(120,2)) + 0.5
+            local = random.randint(0,30,(20,2)) + 0.5
+            for each in (planner,searcher):
+                each.setCostRadius(3)
+                each.updateLayers(local, walls, recompute=False)
+            start = (1.5,1.5)
+            goal = (28.5,27.5)
+
+            for i in range(30):
+                local = np.vstack((local[random.randint(4):],
+                                   random.randint(0,30,(random.randint(4),2)) + 0.5))
+                if random.randint(4) == 0 and len(planner.gridPath) > 3:
+                    start = planner.path[2]
+                for each in (planner,searcher):
+                    each.updateLayers(local, recompute=False)
+                    each.computePath(start, goal)
+                self.assertEqual(len(planner.path) > 0, len(searcher.path) > 0)
+                if len(planner.path) > 0:
+                    self.assertAlmostEqual(pathCost(planner), pathCost(searcher))
+
+    def test_random(self):
+        random.seed(412)
+
+        for costModel in (OctileCost(), UniformCost()):
+            for density in (0.1, 0.2, 0.3):
+                planner = AnytimeAstar((0,0),(40,40),40,costModel,timeBudget=None)
+                searcher = Astar((0,0),(40,40),40,costModel)
+                for grid,start,goal in randomQueries(planner, density):
+                    planner.grid = grid
+                    searcher.grid = grid
+
+                    planner.computePath(center(start),center(goal))
+                    searcher.computePath(center(start),center(goal))
+
+                    self.assertEqual(len(planner.path) > 0, len(searcher.path) > 0)
+                    if len(planner.path) > 0:
+                        self.assertAlmostEqual(pathCost(planner), pathCost(searcher))
+                        assertValidPath(self, planner, start, goal)
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
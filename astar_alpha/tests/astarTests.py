@@ -4,8 +4,12 @@ Created on May 1, 2012
 @author: Devin Schwab
 '''
 import unittest
+import random
+
+import numpy as np
 
 from astar import Astar
+from cost_model import OctileCost, UniformCost, proximityCosts
 
 class Test(unittest.TestCase):
 
@@ -74,6 +78,10 @@ class Test(unittest.TestCase):
         grid = searcher.createGrid()
         for row in grid:
             self.assertEqual(len(row), 100)
+
+        self.assertEqual(grid.dtype, np.int8)
+        self.assertEqual(grid.size, 100*100)
+        self.assertFalse(grid.any())
         
     def test_transformMapToGrid(self):
         searcher = self.searcher1
@@ -209,6 +217,26 @@ class Test(unittest.TestCase):
             pass
             
     
+    def test_transformMapToGridBatch(self):
+        points = [(-5,-5),(0,0),(5,5),(9.5,9.5),(10,10),(15,15),(0,.1),(4.9,4)]
+
+        for searcher in (self.searcher1, self.searcher2, self.searcher3):
+            (indices, valid) = searcher.transformMapToGridBatch(points)
+            self.assertEqual(indices.shape, (len(points),2))
+            self.assertEqual(valid.shape, (len(points),))
+
+            for i,point in enumerate(points):
+                try:
+                    expected = searcher.transformMapToGrid(point)
+                    self.assertTrue(valid[i])
+                    self.assertEqual(tuple(indices[i]), expected)
+                except IndexError:
+                    self.assertFalse(valid[i])
+
+        (indices, valid) = self.searcher1.transformMapToGridBatch([])
+        self.assertEqual(len(indices), 0)
+        self.assertEqual(len(valid), 0)
+            
     def test_transformGridToMap(self):
         searcher = self.searcher1
         
@@ -459,6 +487,94 @@ class Test(unittest.TestCase):
         
         
     
+    def test_updateObstacles(self):
+        searcher = self.searcher1
+        
+        searcher.computePath((0,0),(0.1,2.5))
+        self.assertEqual(len(searcher.path),3)
+        
+        # obstacles off of the path don't cause a replan
+        result = searcher.updateObstacles([(5,5),(6.5,6.5),(15,15)])
+        self.assertFalse(result)
+        self.assertEqual(searcher.grid[5][5], -1)
+        self.assertEqual(searcher.grid[6][6], -1)
+        self.assertEqual((searcher.grid == -1).sum(), 2)
+        
+        # block the path
+        result = searcher.updateObstacles([(0.5,1.5)], recompute=False)
+        self.assertFalse(result)
+        result = searcher.updateObstacles([(0.5,1.5),(1.5,1.5)])
+        self.assertTrue(result)
+        self.assertEqual(len(searcher.path),5)
+        self.assertFalse((0,1) in searcher.path)
+        self.assertFalse((1,1) in searcher.path)
+        
+        # clearing cells never conflicts with the path
+        result = searcher.updateObstacles(cleared=[(0.5,1.5),(5,5)])
+        self.assertFalse(result)
+        self.assertEqual(searcher.grid[0][1], 0)
+        self.assertEqual(searcher.grid[5][5], 0)
+        self.assertEqual((searcher.grid == -1).sum(), 2)
+        self.assertEqual(sorted(searcher.localCells.tolist()), [[1,1],[6,6]])
+        
+        # cleared cells go back to the walls
+        searcher.updateLayers(wallPoints=[(6.5,6.5),(7.5,7.5)], recompute=False)
+        result = searcher.updateObstacles(cleared=[(6.5,6.5),(1.5,1.5)])
+        self.assertFalse(result)
+        self.assertEqual(searcher.grid[6][6], -1)
+        self.assertEqual(searcher.grid[1][1], 0)
+        self.assertEqual((searcher.grid == -1).sum(), 2)
+        
+        # the changes are part of the local layer
+        searcher.updateObstacles([(2.5,2.5)])
+        searcher.updateLayers(wallPoints=[], recompute=False)
+        self.assertEqual(searcher.grid[2][2], -1)
+        self.assertEqual((searcher.grid == -1).sum(), 1)
+        
+    def test_updateLayers(self):
+        searcher = self.searcher1
+        
+        walls = [(x+.5,1.5) for x in range(1,9)]
+        
+        result = searcher.updateLayers(wallPoints=walls, recompute=False)
+        self.assertFalse(result)
+        self.assertEqual((searcher.baseGrid == -1).sum(), 8)
+        self.assertEqual((searcher.grid == -1).sum(), 8)
+        
+        searcher.computePath((0,0),(0.1,2.5))
+        self.assertEqual(len(searcher.path),3)
+        
+        # local obstacles are drawn over the walls
+        result = searcher.updateLayers(localPoints=[(5,5),(1.5,1.5),(2.5,0.5)])
+        self.assertFalse(result)
+        self.assertEqual((searcher.baseGrid == -1).sum(), 8)
+        self.assertEqual((searcher.grid == -1).sum(), 10)
+        self.assertEqual(searcher.grid[5][5], -1)
+        
+        # a new local layer replaces the old one
+        result = searcher.updateLayers(localPoints=[(0.5,1.5)])
+        self.assertTrue(result)
+        self.assertEqual(searcher.grid[5][5], 0)
+        self.assertEqual(searcher.grid[0][1], -1)
+        self.assertEqual((searcher.grid == -1).sum(), 9)
+        self.assertEqual(len(searcher.path),19)
+        
+        # only the difference to the last local layer is applied
+        grid = searcher.grid
+        result = searcher.updateLayers(localPoints=[(0.5,1.5),(0.6,1.6),(3.5,3.5),(15,15)])
+        self.assertFalse(result)
+        self.assertTrue(searcher.grid is grid)
+        self.assertEqual((searcher.grid == -1).sum(), 10)
+        result = searcher.updateLayers(localPoints=[(3.5,3.5)])
+        self.assertFalse(result)
+        self.assertEqual(searcher.grid[0][1], 0)
+        self.assertEqual((searcher.grid == -1).sum(), 9)
+        
+        # new walls keep the local layer
+        result = searcher.updateLayers(wallPoints=[])
+        self.assertFalse(result)
+        self.assertEqual((searcher.grid == -1).sum(), 1)
+        
     def test_updateGoal(self):
         searcher = self.searcher1
         
@@ -501,7 +617,7 @@ class Test(unittest.TestCase):
                       [ 0,-1, 0, 0, 0, 0, 0, 0, 0, 0],
                       [ 0,-1, 0, 0, 0, 0, 0, 0, 0, 0]]
         
-        searcher.grid = closedGrid
+        searcher.grid = np.array(closedGrid, dtype=np.int8)
         searcher.computePath((0,0),(0,2.5))
         self.assertEqual(searcher.path,[])
         
@@ -517,7 +633,7 @@ class Test(unittest.TestCase):
                       [ 0,-1, 0, 0, 0, 0, 0, 0, 0, 0],
                       [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]]
         
-        searcher.grid = closedGrid
+        searcher.grid = np.array(closedGrid, dtype=np.int8)
         searcher.computePath((0,0),(0.1,2.5))
         self.assertEqual(len(searcher.path),19)
         self.assertTrue((0,0) in searcher.path)
@@ -539,9 +655,209 @@ class Test(unittest.TestCase):
         self.assertTrue((2,2) in searcher.path)
         self.assertTrue((1,2) in searcher.path)
         self.assertTrue((0,2) in searcher.path)
-        
 
+    def test_costModel(self):
+        from math import sqrt
         
+        # diagonal moves cost more than straight ones so the
+        # path shouldn't zig-zag
+        searcher = Astar((0,0),(10,10),10,OctileCost())
+        searcher.computePath((0,0),(9.5,2.5))
+        self.assertEqual(len(searcher.path),10)
+        self.assertEqual(searcher.path[-1],(9,2))
+        
+        gridPath = [(int(x),int(y)) for (x,y) in searcher.path]
+        cost = sum([searcher.costModel.cost(a,b) for a,b in zip(gridPath,gridPath[1:])])
+        self.assertAlmostEqual(cost, 7+2*sqrt(2), delta=.0001)
+        
+        # expensive cells get avoided when there is a cheap detour
+        cellCosts = np.zeros((10,10))
+        cellCosts[5,0:3] = 10
+        searcher = Astar((0,0),(10,10),10,OctileCost(cellCosts))
+        searcher.computePath((0,0),(9.5,0.5))
+        self.assertFalse((5,0) in searcher.path)
+        self.assertFalse((5,1) in searcher.path)
+        self.assertFalse((5,2) in searcher.path)
+        self.assertTrue((5,3) in searcher.path)
+    
+    def test_costRadius(self):
+        # costs fall off with the king moves to the closest obstacle
+        blocked = np.zeros((7,7), dtype=bool)
+        blocked[3][3] = True
+        costs = proximityCosts(blocked, 2)
+        self.assertEqual(costs[3][3], 0)
+        self.assertEqual(costs[2][4], 1)
+        self.assertEqual(costs[1][5], 0.5)
+        self.assertEqual(costs[3][1], 0.5)
+        self.assertEqual(costs[0][0], 0)
+
+        # without cell costs the path runs right past the obstacle
+        searcher = Astar((0,0),(10,10),10)
+        searcher.updateObstacles([(5.5,4.5)], recompute=False)
+        searcher.computePath((0.5,5.5),(9.5,5.5))
+        self.assertTrue((5,5) in searcher.gridPath)
+
+        # with them it keeps its distance
+        searcher.setCostRadius(2)
+        self.assertEqual(searcher.costModel.cellCosts[5*10 + 5], 1)
+        searcher.computePath()
+        for x,y in searcher.gridPath:
+            self.assertTrue(max(abs(x-5),abs(y-4)) > 1)
+
+        # an obstacle that only makes the path more expensive
+        # is a reason to replan
+        (x,y) = searcher.gridPath[3]
+        self.assertTrue(searcher.updateObstacles([(x+.5,y+1.5)]))
+        self.assertFalse((x,y+1) in searcher.gridPath)
+        self.assertFalse(searcher.updateObstacles([(0.5,0.5)]))
+
+        searcher.setCostRadius(0)
+        self.assertEqual(searcher.costModel.cellCosts, None)
+        self.assertEqual(searcher.updateCellCosts().tolist(), [])
+
+    def test_expansions(self):
+        gapGrid = np.zeros((10,10), dtype=np.int8)
+        gapGrid[:,1] = -1
+        gapGrid[9][1] = 0
+        
+        queries = [((0,0),(1.5,1),None),
+                   ((0,0),(9.5,9.5),None),
+                   ((0,0),(9.5,2.5),None),
+                   ((0,9.5),(9.5,0),None),
+                   ((0,0),(0.1,2.5),gapGrid)]
+        
+        # with a consistent heuristic and ties broken towards the
+        # goal only the cells on the path should get expanded
+        for costModel in (OctileCost(), UniformCost()):
+            for start,goal,grid in queries:
+                searcher = Astar((0,0),(10,10),10,costModel)
+                if grid is not None:
+                    searcher.grid = grid.copy()
+                searcher.computePath(start,goal)
+                self.assertEqual(searcher.expansions, len(searcher.path))
+
+    def test_workspace(self):
+        random.seed(18)
+
+        searcher = Astar((0,0),(20,20),20)
+        workspace = searcher.workspace
+        self.assertEqual(workspace.size, 400)
+        self.assertEqual(workspace.generation, 0)
+
+        # back to back searches reuse the same workspace and
+        # get the same paths as a new planner every time
+        for i in range(30):
+            grid = searcher.createGrid()
+            for j in range(int(0.3*20*20)):
+                grid[random.randint(0,19)][random.randint(0,19)] = -1
+            start = (random.randint(0,19)+.5, random.randint(0,19)+.5)
+            goal = (random.randint(0,19)+.5, random.randint(0,19)+.5)
+
+            searcher.grid = grid
+            searcher.computePath(start, goal)
+
+            fresh = Astar((0,0),(20,20),20)
+            fresh.grid = grid
+            fresh.computePath(start, goal)
+
+            self.assertTrue(searcher.workspace is workspace)
+            self.assertEqual(workspace.generation, i+1)
+            self.assertEqual(searcher.path, fresh.path)
+            self.assertEqual(searcher.expansions, fresh.expansions)
+            self.assertEqual(workspace.blocked, (grid == -1).ravel().tolist())
+
+        # changes made to the grid in place are seen too
+        blocked = workspace.blocked
+        grid[:,10] = -1
+        grid[0][0] = 0
+        searcher.computePath((0.5,0.5),(0.5,19.5))
+        self.assertEqual(searcher.path, [])
+        self.assertTrue(workspace.blocked is blocked)
+        self.assertEqual(workspace.blocked, (grid == -1).ravel().tolist())
+
+        # updateGrid only reports the cells that became or stopped
+        # being obstacles, other changes of value don't count
+        grid[0][0] = -1
+        grid[5][5] = -1
+        grid[5][10] = 0
+        grid[6][6] = 3
+        self.assertEqual(workspace.updateGrid(grid), [0, 5*20+5, 5*20+10])
+        self.assertEqual(workspace.updateGrid(grid), [])
+        self.assertEqual(workspace.blocked, (grid == -1).ravel().tolist())
+
+    def test_stats(self):
+        random.seed(20)
+
+        searcher = Astar((0,0),(20,20),20)
+        stats = searcher.stats
+        self.assertFalse(searcher.collectStats)
+
+        # nothing is collected by default
+        searcher.computePath((0,0),(19.5,19.5))
+        self.assertEqual(stats.searches, 0)
+        self.assertEqual(stats.expansions, 0)
+
+        searcher.collectStats = True
+        for i in range(10):
+            grid = searcher.createGrid()
+            for j in range(int(0.3*20*20)):
+                grid[random.randint(0,19)][random.randint(0,19)] = -1
+            start = (random.randint(0,19)+.5, random.randint(0,19)+.5)
+            goal = (random.randint(0,19)+.5, random.randint(0,19)+.5)
+
+            searcher.grid = grid
+            searcher.computePath(start, goal)
+
+            # collecting stats doesn't change the search
+            plain = Astar((0,0),(20,20),20)
+            plain.grid = grid
+            plain.computePath(start, goal)
+            self.assertEqual(searcher.path, plain.path)
+
+            self.assertEqual(stats.searches, i+1)
+            self.assertEqual(stats.expansions, plain.expansions)
+            self.assertEqual(stats.found, len(plain.path) > 0)
+            self.assertEqual(stats.pathLength, len(plain.path))
+
+            # every expansion pops a cell and every cell that
+            # is popped was pushed first
+            self.assertEqual(stats.pops, stats.expansions)
+            self.assertTrue(stats.pushes >= stats.pops)
+            self.assertTrue(stats.maxOpenSize >= 1)
+            self.assertTrue(stats.totalTime >= stats.heapTime + stats.neighborTime)
+
+        self.assertEqual(stats.asDict()['searches'], 10)
+
+        # a start outside of the grid still counts as a search
+        searcher.computePath((-5,-5),(19.5,19.5))
+        self.assertEqual(stats.searches, 11)
+        self.assertFalse(stats.found)
+        self.assertEqual(stats.expansions, 0)
+        self.assertEqual(stats.pushes, 0)
+
+    def test_smoothPath(self):
+        searcher = Astar((0,0),(10,10),10)
+        self.assertEqual(searcher.gridPath, [])
+        self.assertEqual(searcher.smoothPath(), [])
+
+        searcher.computePath((0,0),(9.5,4.5))
+        self.assertEqual(len(searcher.gridPath), len(searcher.path))
+        self.assertEqual(searcher.smoothPath(), [(0.5,0.5),(9.5,4.5)])
+
+        # go around the end of a wall
+        grid = searcher.createGrid()
+        grid[5,0:8] = -1
+        searcher.grid = grid
+        searcher.computePath((0,0),(9.5,0.5))
+        path = searcher.smoothPath()
+        self.assertEqual(path[0], (0.5,0.5))
+        self.assertEqual(path[-1], (9.5,0.5))
+        self.assertTrue(2 < len(path) < len(searcher.path))
+
+        searcher.clearPath()
+        self.assertEqual(searcher.gridPath, [])
+        self.assertEqual(searcher.smoothPath(), [])
+
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
-    unittest.main()
\ No newline at end of file
+    unittest.main()
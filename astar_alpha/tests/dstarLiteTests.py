@@ -0,0 +1,203 @@
+'''
+Created on Oct 17, 2026
+
+@author: agent
+'''
+import unittest
+
+import numpy as np
+
+from astar import Astar
+from cost_model import OctileCost, UniformCost
+from dstar_lite import DStarLite
+from plannerFixtures import pathCost
+
+wallGrid = [[ 0,-1, 0, 0, 0, 0, 0, 0, 0, 0],
+            [ 0,-1, 0, 0, 0, 0, 0, 0, 0, 0],
+            [ 0,-1, 0, 0, 0, 0, 0, 0, 0, 0],
+            [ 0,-1, 0, 0, 0, 0, 0, 0, 0, 0],
+            [ 0,-1, 0, 0, 0, 0, 0, 0, 0, 0],
+            [ 0,-1, 0, 0, 0, 0, 0, 0, 0, 0],
+            [ 0,-1, 0, 0, 0, 0, 0, 0, 0, 0],
+            [ 0,-1, 0, 0, 0, 0, 0, 0, 0, 0],
+            [ 0,-1, 0, 0, 0, 0, 0, 0, 0, 0],
+            [ 0,-1, 0, 0, 0, 0, 0, 0, 0, 0]]
+
+gapGrid = [row[:] for row in wallGrid]
+gapGrid[9][1] = 0
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.searcher = Astar((0,0),(10,10),10)
+        self.planner = DStarLite((0,0),(10,10),10)
+
+    def assertSameCost(self, start, goal, grid=None):
+        searcher = self.searcher
+        planner = self.planner
+        if grid is not None:
+            searcher.grid = np.array(grid, dtype=np.int8)
+            planner.grid = np.array(grid, dtype=np.int8)
+
+        searcher.computePath(start, goal)
+        planner.computePath(start, goal)
+
+        self.assertEqual(len(planner.path) > 0, len(searcher.path) > 0)
+        self.assertAlmostEqual(pathCost(planner), pathCost(searcher))
+        if len(planner.path) > 0:
+            self.assertEqual(planner.path[0], searcher.path[0])
+            self.assertEqual(planner.path[-1], searcher.path[-1])
+
+        # every step has to be to a neighboring open cell
+        for a,b in zip(planner.path, planner.path[1:]):
+            a = planner.transformMapToGrid(a)
+            b = planner.transformMapToGrid(b)
+            self.assertTrue(b in planner.getNeighbors(a))
+            self.assertNotEqual(planner.grid[b[0]][b[1]], -1)
+
+    def test_computePath(self):
+        self.assertSameCost((0,0),(1.5,1))
+        self.assertSameCost((0,0),(9.5,9.5))
+        self.assertSameCost((0,0),(0,2.5),wallGrid)
+        self.assertEqual(self.planner.path, [])
+        self.assertSameCost((0,0),(0.1,2.5),gapGrid)
+        self.assertEqual(len(self.planner.path), 19)
+
+    def test_noStart(self):
+        planner = self.planner
+
+        planner.computePath()
+        self.assertEqual(planner.path, [])
+
+        planner.computePath((0,0),(15,15))
+        self.assertEqual(planner.path, [])
+
+    def test_obstacleChange(self):
+        planner = self.planner
+
+        self.assertSameCost((0,0),(0.1,2.5))
+        self.assertAlmostEqual(pathCost(planner), 2)
+
+        # close off the short way and force a repair
+        self.assertSameCost((0,0),(0.1,2.5),gapGrid)
+        self.assertAlmostEqual(pathCost(planner), 16 + 2*np.sqrt(2))
+
+        # open it back up
+        self.assertSameCost((0,0),(0.1,2.5),planner.createGrid())
+        self.assertAlmostEqual(pathCost(planner), 2)
+
+    def test_startMoves(self):
+        planner = self.planner
+
+        self.assertSameCost((0,0),(0.1,2.5),gapGrid)
+        self.assertEqual(planner.searchStart, (0,0))
+
+        # drive along the path
+        self.assertSameCost((5.1,0.1),(0.1,2.5))
+        self.assertEqual(planner.searchStart, (5,0))
+        self.assertEqual(planner.path[0], (5.0,0.0))
+
+    def test_incremental(self):
+        random = np.random.RandomState(4)
+
+        planner = DStarLite((0,0),(50,50),50)
+        searcher = Astar((0,0),(50,50),50)
+        grid = planner.createGrid()
+        grid[random.random_sample((50,50)) < 0.15] = -1
+        grid[2][2] = 0
+        grid[47][47] = 0
+        grid[45][3] = -1
+
+        planner.grid = grid.copy()
+        planner.computePath((2.5,2.5),(47.5,47.5))
+
+        for i in range(5):
+            # block a cell on the current path, every cell that
+            # went to the goal through it has to be repaired
+            (x,y) = planner.gridPath[len(planner.gridPath)//2]
+            grid[x][y] = -1
+            planner.grid = grid.copy()
+            planner.computePath()
+
+            searcher.grid = grid.copy()
+            searcher.computePath((2.5,2.5),(47.5,47.5))
+            self.assertAlmostEqual(pathCost(planner), pathCost(searcher))
+
+            fresh = DStarLite((0,0),(50,50),50)
+            fresh.grid = grid.copy()
+            fresh.computePath((2.5,2.5),(47.5,47.5))
+            self.assertTrue(planner.expansions < fresh.expansions)
+
+        # a change next to the robot only repairs a few cells
+        (x,y) = planner.gridPath[2]
+        grid[x][y] = -1
+        planner.grid = grid.copy()
+        planner.computePath()
+        self.assertTrue(planner.expansions < fresh.expansions//10)
+
+        # freeing a cell away from the path doesn't change anything
+        grid[45][3] = 0
+        planner.grid = grid.copy()
+        planner.computePath()
+        self.assertTrue(planner.expansions <= 1)
+
+    def test_repairs(self):
+        random = np.random.RandomState(41)
+
+        # random changes and moves of the start give the same
+        # path cost as searching from scratch
+        for costModel in (None, UniformCost()):
+            planner = DStarLite((0,0),(30,30),30,costModel)
+            searcher = Astar((0,0),(30,30),30,costModel)
+            grid = planner.createGrid()
+            grid[random.random_sample((30,30)) < 0.2] = -1
+            start = (1.5,1.5)
+            goal = (28.5,27.5)
+            grid[28][27] = 0
+
+            for i in range(40):
+                cells = random.randint(0,30,(random.randint(1,6),2))
+                if random.randint(2) == 0:
+                    grid[cells[:,0],cells[:,1]] = -1
+                else:
+                    grid[cells[:,0],cells[:,1]] = 0
+                if random.randint(4) == 0 and len(planner.gridPath) > 3:
+                    start = planner.path[2]
+
+                planner.grid = grid.copy()
+                searcher.grid = grid.copy()
+                planner.computePath(start, goal)
+                searcher.computePath(start, goal)
+                self.assertEqual(len(planner.path) > 0, len(searcher.path) > 0)
+                self.assertAlmostEqual(pathCost(planner), pathCost(searcher))
+
+    def test_cellCosts(self):
+        random = np.random.RandomState(9)
+
+        # the cell costs change with the obstacles, repairing the
+        # tree gives the same path cost as searching from scratch
+        for costModel in (OctileCost, UniformCost):
+            planner = DStarLite((0,0),(30,30),30,costModel())
+            searcher = Astar((0,0),(30,30),30,costModel())
+            walls = random.randint(0,30,(120,2)) + 0.5
+            local = random.randint(0,30,(20,2)) + 0.5
+            for each in (planner,searcher):
+                each.setCostRadius(3)
+                each.updateLayers(local, walls, recompute=False)
+            start = (1.5,1.5)
+            goal = (28.5,27.5)
+
+            for i in range(30):
+                local = np.vstack((local[random.randint(4):],
+                                   random.randint(0,30,(random.randint(4),2)) + 0.5))
+                if random.randint(4) == 0 and len(planner.gridPath) > 3:
+                    start = planner.path[2]
+                for each in (planner,searcher):
+                    each.updateLayers(local, recompute=False)
+                    each.computePath(start, goal)
+                self.assertEqual(len(planner.path) > 0, len(searcher.path) > 0)
+                self.assertAlmostEqual(pathCost(planner), pathCost(searcher))
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
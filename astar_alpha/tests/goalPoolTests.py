@@ -0,0 +1,108 @@
+'''
+Created on Oct 17, 2026
+
+@author: agent
+'''
+import unittest
+import os
+import random
+
+import numpy as np
+
+from astar import Astar
+from cost_model import UniformCost
+from goal_pool import GoalPool, pathCost, INF
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = GoalPool((0,0),(10,10),10,processes=2)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_GoalPool(self):
+        pool = self.pool
+
+        self.assertTrue(os.path.exists(pool.gridFile))
+        self.assertEqual(pool.grid.shape, (10,10))
+        self.assertEqual((pool.grid != 0).sum(), 0)
+
+    def test_planGoals(self):
+        pool = self.pool
+
+        costs = pool.planGoals((0.5,0.5),[(3.5,0.5),(0.5,0.5),(2.5,2.5),(15,15)])
+        self.assertEqual(len(costs), 4)
+        self.assertAlmostEqual(costs[0], 3)
+        self.assertAlmostEqual(costs[1], 0)
+        self.assertAlmostEqual(costs[2], 2*np.sqrt(2))
+        self.assertEqual(costs[3], INF)
+
+        costs = pool.planPairs([((0.5,0.5),(3.5,0.5)),((3.5,0.5),(3.5,3.5))])
+        self.assertAlmostEqual(costs[0], 3)
+        self.assertAlmostEqual(costs[1], 3)
+
+    def test_updateGrid(self):
+        pool = self.pool
+
+        grid = np.zeros((10,10), dtype=np.int8)
+        grid[:,1] = -1
+        pool.updateGrid(grid)
+
+        costs = pool.planGoals((0.5,0.5),[(0.5,2.5),(5.5,0.5)])
+        self.assertEqual(costs[0], INF)
+        self.assertAlmostEqual(costs[1], 5)
+
+        grid[9][1] = 0
+        pool.updateGrid(grid)
+        costs = pool.planGoals((0.5,0.5),[(0.5,2.5)])
+        self.assertAlmostEqual(costs[0], 16 + 2*np.sqrt(2))
+
+    def test_cheapest(self):
+        pool = self.pool
+
+        grid = np.zeros((10,10), dtype=np.int8)
+        grid[:,1] = -1
+        pool.updateGrid(grid)
+
+        self.assertEqual(pool.cheapest((0.5,0.5),[(0.5,2.5),(7.5,0.5),(5.5,0.5)]), (2, 5))
+        self.assertEqual(pool.cheapest((0.5,0.5),[(0.5,2.5),(0.5,1.5)]), None)
+
+    def test_corners(self):
+        # cells that are 0.22 wide and 0.2 high
+        pool = GoalPool((-6.25,8.2),(15.75,28.2),100,processes=2)
+        try:
+            center = lambda x,y: (-6.25 + (x+.5)*0.22, 8.2 + (y+.5)*0.2)
+            costs = pool.planGoals(center(0,0),[center(60,0),center(0,80),center(99,99)])
+            self.assertAlmostEqual(costs[0], 60)
+            self.assertAlmostEqual(costs[1], 80)
+            self.assertAlmostEqual(costs[2], 99*np.sqrt(2))
+        finally:
+            pool.close()
+
+    def test_random(self):
+        random.seed(15)
+
+        pool = GoalPool((0,0),(30,30),30,UniformCost(),processes=3)
+        try:
+            searcher = Astar((0,0),(30,30),30,UniformCost())
+            grid = searcher.createGrid()
+            for i in range(int(0.25*30*30)):
+                grid[random.randint(0,29)][random.randint(0,29)] = -1
+            searcher.grid = grid
+            pool.updateGrid(grid)
+
+            start = (random.randint(0,29)+.5, random.randint(0,29)+.5)
+            goals = [(random.randint(0,29)+.5, random.randint(0,29)+.5) for i in range(20)]
+            costs = pool.planGoals(start, goals)
+
+            for goal,cost in zip(goals, costs):
+                searcher.computePath(start, goal)
+                self.assertAlmostEqual(cost, pathCost(searcher))
+        finally:
+            pool.close()
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,173 @@
+'''
+Created on Oct 17, 2026
+
+@author: agent
+'''
+import unittest
+import random
+
+import numpy as np
+
+from astar import Astar
+from hierarchical import HierarchicalAstar
+from cost_model import OctileCost, UniformCost
+from plannerFixtures import pathCost, center, randomGrid, randomQueries, assertValidPath
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.planner = HierarchicalAstar((0,0),(10,10),10,blockSize=4)
+
+    def test_updateRegions(self):
+        planner = self.planner
+        self.assertEqual(planner.numBlocks, 3)
+
+        grid = planner.createGrid()
+        # fill the first block
+        grid[0:4,0:4] = -1
+        # split the block next to it in two
+        grid[6,4:8] = -1
+        planner.grid = grid
+        planner.updateRegions()
+
+        regions = np.array(planner.regions).reshape(10,10)
+        self.assertEqual(regions[0][0], None)
+        self.assertEqual(regions[6][5], None)
+        self.assertEqual(len(set(regions[4:6,4:8].ravel().tolist())), 1)
+        self.assertEqual(len(set(regions[7:8,4:8].ravel().tolist())), 1)
+        self.assertNotEqual(regions[4][4], regions[7][4])
+        self.assertEqual(regions[9][9], 8*10 + 8)
+
+        # the first block has no regions, the split one
+        # has two and the other 7 have one
+        self.assertEqual(len(planner.regionNeighbors), 9)
+
+        top = regions[4][4]
+        bottom = regions[7][4]
+        self.assertTrue(bottom not in planner.regionNeighbors[top])
+        self.assertTrue(regions[3][4] in planner.regionNeighbors[top])
+        self.assertTrue(regions[3][4] not in planner.regionNeighbors[bottom])
+        self.assertTrue(regions[8][4] in planner.regionNeighbors[bottom])
+        self.assertTrue(top in planner.regionNeighbors[regions[4][0]])
+
+        # nothing changed so the regions are kept
+        regionList = planner.regions
+        planner.updateRegions()
+        self.assertTrue(planner.regions is regionList)
+
+    def test_changeBlocks(self):
+        random.seed(134)
+
+        # only the changed blocks are split again, the regions
+        # are the same as splitting the whole grid
+        planner = HierarchicalAstar((0,0),(30,30),30,blockSize=8)
+        grid = randomGrid(planner, 0.3)
+        planner.grid = grid
+        planner.updateRegions()
+        for i in range(50):
+            grid = grid.copy()
+            for j in range(random.randint(1,5)):
+                (x,y) = (random.randint(0,29), random.randint(0,29))
+                grid[x][y] = -1 - grid[x][y]
+            planner.grid = grid
+            labels = planner.labels
+            planner.updateRegions()
+            self.assertTrue(planner.labels is labels)
+
+            fresh = HierarchicalAstar((0,0),(30,30),30,blockSize=8)
+            fresh.grid = grid
+            fresh.updateRegions()
+            self.assertEqual(planner.regions, fresh.regions)
+            self.assertEqual(planner.regionNeighbors, fresh.regionNeighbors)
+
+        # a lot of changes split the whole grid again
+        planner.grid = randomGrid(planner, 0.3)
+        planner.updateRegions()
+        self.assertTrue(planner.labels is not labels)
+
+    def test_createCorridor(self):
+        planner = self.planner
+
+        corridor = np.array(planner.createCorridor([(0,0)], 0)).reshape(10,10)
+        self.assertEqual(corridor.sum(), 16)
+        self.assertTrue(corridor[0:4,0:4].all())
+
+        corridor = np.array(planner.createCorridor([(0,0)], 1)).reshape(10,10)
+        self.assertEqual(corridor.sum(), 64)
+
+        corridor = np.array(planner.createCorridor([(2,2)], 0)).reshape(10,10)
+        self.assertEqual(corridor.sum(), 4)
+
+    def test_computePath(self):
+        planner = self.planner
+
+        planner.computePath((0,0),(1.5,1))
+        self.assertEqual(planner.path,[(0,0),(1,1)])
+
+        planner.computePath((0,0),(0.5,0.5))
+        self.assertEqual(planner.path,[(0,0)])
+
+        planner.computePath((0,0),(9.5,9.5))
+        self.assertEqual(len(planner.path),10)
+        assertValidPath(self, planner, (0,0), (9,9))
+
+        planner.computePath((0,0),(15,15))
+        self.assertEqual(planner.path,[])
+
+    def test_walls(self):
+        planner = self.planner
+
+        grid = planner.createGrid()
+        grid[:,1] = -1
+        planner.grid = grid
+        planner.computePath((0,0),(0,2.5))
+        self.assertEqual(planner.path,[])
+
+        grid[9][1] = 0
+        planner.computePath((0,0),(0.1,2.5))
+        self.assertEqual(len(planner.path),19)
+        assertValidPath(self, planner, (0,0), (0,2))
+
+        # the goal can't be entered
+        planner.computePath((0,0),(5.5,1.5))
+        self.assertEqual(planner.path,[])
+
+    def test_splitBlocks(self):
+        planner = HierarchicalAstar((0,0),(16,16),16,blockSize=4,corridorWidth=0)
+
+        # the wall at y=2 splits the blocks in row 0
+        # and only has a gap at the far end
+        grid = planner.createGrid()
+        grid[:,2] = -1
+        grid[15][2] = 0
+        planner.grid = grid
+
+        planner.computePath((0.5,0.5),(0.5,3.5))
+        assertValidPath(self, planner, (0,0), (0,3))
+        self.assertEqual(len(planner.path), 31)
+
+    def test_random(self):
+        random.seed(133)
+
+        for costModel in (OctileCost(), UniformCost()):
+            for density in (0.1, 0.2, 0.3):
+                planner = HierarchicalAstar((0,0),(40,40),40,costModel,blockSize=8)
+                searcher = Astar((0,0),(40,40),40,costModel)
+                for grid,start,goal in randomQueries(planner, density):
+                    planner.grid = grid
+                    searcher.grid = grid
+
+                    planner.computePath(center(start),center(goal))
+                    searcher.computePath(center(start),center(goal))
+
+                    self.assertEqual(len(planner.path) > 0, len(searcher.path) > 0)
+                    if len(planner.path) > 0:
+                        assertValidPath(self, planner, start, goal)
+                        # the corridor can cut off the best path
+                        # but not by much
+                        self.assertTrue(pathCost(planner) <= 1.25*pathCost(searcher) + 1e-9)
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,137 @@
+'''
+Created on Oct 17, 2026
+
+@author: agent
+'''
+import unittest
+import random
+from heapq import heappush, heappop
+from math import sqrt
+
+import numpy as np
+
+from astar import Astar
+from cost_model import OctileCost, UniformCost
+from jps import JumpPointSearch
+from plannerFixtures import pathCost, randomGrid
+
+def octileDijkstra(grid, start, goal):
+    '''
+    Reference octile path cost from start to goal
+    '''
+    numCells = len(grid)
+    costs = {start: 0}
+    heap = [(0, start)]
+    while heap:
+        (cost, point) = heappop(heap)
+        if point == goal:
+            return cost
+        if cost > costs[point]:
+            continue
+        for dx in (-1,0,1):
+            for dy in (-1,0,1):
+                x = point[0] + dx
+                y = point[1] + dy
+                if (dx == 0 and dy == 0) or x < 0 or y < 0 or x >= numCells or y >= numCells:
+                    continue
+                if grid[x][y] == -1:
+                    continue
+                newCost = cost + (sqrt(2) if dx != 0 and dy != 0 else 1)
+                if newCost < costs.get((x,y), float('inf')):
+                    costs[(x,y)] = newCost
+                    heappush(heap, (newCost, (x,y)))
+    return None
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.planner = JumpPointSearch((0,0),(10,10),10)
+
+    def assertValidPath(self, planner):
+        path = [planner.transformMapToGrid(point) for point in planner.path]
+        for a,b in zip(path, path[1:]):
+            self.assertTrue(b in planner.getNeighbors(a))
+            self.assertNotEqual(planner.grid[b[0]][b[1]], -1)
+
+    def test_computePath(self):
+        planner = self.planner
+
+        planner.computePath((0,0),(1.5,1))
+        self.assertEqual(planner.path,[(0,0),(1,1)])
+
+        planner.computePath((0,0),(9.5,9.5))
+        self.assertEqual(len(planner.path),10)
+        self.assertAlmostEqual(planner.pathCost, 9*sqrt(2))
+        self.assertTrue(planner.expansions <= 2)
+
+        planner.computePath((0,0),(0.5,0.5))
+        self.assertEqual(planner.path,[(0,0)])
+
+    def test_walls(self):
+        planner = self.planner
+
+        grid = planner.createGrid()
+        grid[:,1] = -1
+        planner.grid = grid
+        planner.computePath((0,0),(0,2.5))
+        self.assertEqual(planner.path,[])
+        self.assertEqual(planner.pathCost,None)
+
+        grid[9][1] = 0
+        planner.computePath((0,0),(0.1,2.5))
+        self.assertEqual(planner.path[0],(0,0))
+        self.assertEqual(planner.path[-1],(0,2))
+        self.assertTrue((9,1) in planner.path)
+        self.assertAlmostEqual(planner.pathCost, 16+2*sqrt(2))
+        self.assertValidPath(planner)
+
+    def test_random(self):
+        random.seed(376)
+
+        for density in (0.1, 0.2, 0.3):
+            planner = JumpPointSearch((0,0),(40,40),40)
+            grid = randomGrid(planner, density)
+
+            for i in range(10):
+                start = (random.randint(0,39), random.randint(0,39))
+                goal = (random.randint(0,39), random.randint(0,39))
+                grid[start[0]][start[1]] = 0
+                grid[goal[0]][goal[1]] = 0
+                planner.grid = grid
+
+                searcher = Astar((0,0),(40,40),40)
+                searcher.grid = grid
+
+                expected = octileDijkstra(grid.tolist(), start, goal)
+                planner.computePath((start[0]+.5,start[1]+.5),(goal[0]+.5,goal[1]+.5))
+                searcher.computePath((start[0]+.5,start[1]+.5),(goal[0]+.5,goal[1]+.5))
+
+                if expected is None:
+                    self.assertEqual(planner.path, [])
+                    self.assertEqual(searcher.path, [])
+                else:
+                    self.assertAlmostEqual(planner.pathCost, expected)
+                    self.assertAlmostEqual(planner.pathCost, pathCost(searcher))
+                    self.assertEqual(planner.path[0], start)
+                    self.assertEqual(planner.path[-1], goal)
+                    self.assertValidPath(planner)
+
+
+    def test_costModel(self):
+        # jump points only give octile costs
+        self.assertRaises(ValueError, JumpPointSearch, (0,0), (10,10), 10, UniformCost())
+        self.assertRaises(ValueError, JumpPointSearch, (0,0), (10,10), 10,
+                          OctileCost(np.ones((10,10))))
+
+        planner = JumpPointSearch((0,0),(10,10),10,OctileCost())
+        planner.computePath((0,0),(9.5,2))
+        self.assertAlmostEqual(planner.pathCost, 7 + 2*sqrt(2))
+
+        # and no cell costs later on either
+        self.assertRaises(ValueError, planner.setCostRadius, 2)
+        planner.setCostRadius(0)
+        self.assertEqual(planner.costModel.cellCosts, None)
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
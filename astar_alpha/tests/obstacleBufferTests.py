@@ -0,0 +1,84 @@
+'''
+Created on Oct 17, 2026
+
+@author: agent
+'''
+import unittest
+
+import numpy as np
+
+from obstacle_buffer import ObstacleBuffer
+
+class Point():
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.buffer = ObstacleBuffer()
+
+    def test_ObstacleBuffer(self):
+        buffer = self.buffer
+
+        self.assertEqual(buffer.take(), None)
+        self.assertEqual(buffer.received, 0)
+        self.assertEqual(buffer.coalesced, 0)
+        self.assertEqual(buffer.applied, 0)
+
+    def test_cellsToArray(self):
+        buffer = self.buffer
+
+        points = buffer.cellsToArray([Point(1,2), Point(3.5,4)])
+        self.assertEqual(points.shape, (2,2))
+        self.assertEqual(points.tolist(), [[1,2],[3.5,4]])
+
+        points = buffer.cellsToArray([])
+        self.assertEqual(points.shape, (0,2))
+
+    def test_take(self):
+        buffer = self.buffer
+
+        walls = np.array([[0,0],[1,1]])
+        local = np.array([[2,2]])
+
+        buffer.putWalls(walls)
+        buffer.putLocal(local)
+
+        (localPoints, wallPoints) = buffer.take()
+        self.assertTrue(localPoints is local)
+        self.assertTrue(wallPoints is walls)
+        self.assertEqual(buffer.take(), None)
+
+        # unchanged walls don't have to be redrawn
+        local = np.array([[3,3]])
+        buffer.putLocal(local)
+        (localPoints, wallPoints) = buffer.take()
+        self.assertTrue(localPoints is local)
+        self.assertEqual(wallPoints, None)
+
+        self.assertEqual(buffer.received, 3)
+        self.assertEqual(buffer.coalesced, 1)
+        self.assertEqual(buffer.applied, 2)
+
+    def test_coalesce(self):
+        buffer = self.buffer
+
+        for i in range(10):
+            buffer.putLocal(np.array([[i,i]]))
+
+        (localPoints, wallPoints) = buffer.take()
+        self.assertEqual(localPoints.tolist(), [[9,9]])
+        self.assertEqual(wallPoints, None)
+        self.assertEqual(buffer.take(), None)
+
+        self.assertEqual(buffer.received, 10)
+        self.assertEqual(buffer.coalesced, 9)
+        self.assertEqual(buffer.applied, 1)
+        self.assertEqual(buffer.counts(), {'received': 10, 'coalesced': 9, 'applied': 1})
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,99 @@
+'''
+Created on Oct 17, 2026
+
+@author: agent
+'''
+import unittest
+import random
+
+from open_list import OpenList
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.openList = OpenList()
+
+    def test_OpenList(self):
+        openList = OpenList({'a':3, 'b':1, 'c':2})
+
+        self.assertEqual(len(openList), 3)
+        self.assertEqual(openList.smallest(), 'b')
+        self.assertEqual(openList['a'], 3)
+
+    def test_pop_smallest(self):
+        openList = self.openList
+
+        openList['a'] = 5
+        openList['b'] = 2
+        openList['c'] = 7
+        openList['d'] = 1
+
+        self.assertEqual(openList.pop_smallest(), 1)
+        self.assertEqual(openList.pop_smallest(), 2)
+        self.assertEqual(openList.pop_smallest(), 5)
+        self.assertEqual(openList.pop_smallest(), 7)
+        self.assertEqual(len(openList), 0)
+
+        try:
+            openList.pop_smallest()
+            self.fail("Expected an exception")
+        except IndexError:
+            pass
+
+    def test_decreaseKey(self):
+        openList = self.openList
+
+        openList['a'] = 5
+        openList['b'] = 2
+        openList['c'] = 7
+
+        openList['c'] = 1
+        self.assertEqual(openList.smallest(), 'c')
+        self.assertEqual(len(openList._heap), 3)
+
+        openList['c'] = 9
+        self.assertEqual(openList.smallest(), 'b')
+        self.assertEqual(len(openList._heap), 3)
+
+        self.assertEqual(list(openList.sorted_iter()), [2,5,9])
+
+    def test_delitem(self):
+        openList = self.openList
+
+        for i,key in enumerate('abcdef'):
+            openList[key] = i
+
+        del openList['a']
+        self.assertEqual(openList.pop('d'), 3)
+        self.assertFalse('a' in openList)
+        self.assertFalse('d' in openList)
+
+        self.assertEqual(list(openList.sorted_iter()), [1,2,4,5])
+
+    def test_random(self):
+        random.seed(376)
+
+        openList = self.openList
+        reference = dict()
+        for i in range(2000):
+            key = random.randint(0,200)
+            val = random.random()
+            openList[key] = val
+            reference[key] = val
+
+            if i % 7 == 0:
+                smallest = min(reference.values())
+                self.assertEqual(openList.pop_smallest(), smallest)
+                for k,v in reference.items():
+                    if v == smallest:
+                        del reference[k]
+                        break
+
+        self.assertEqual(len(openList), len(reference))
+        self.assertEqual(len(openList._heap), len(reference))
+        self.assertEqual(list(openList.sorted_iter()), sorted(reference.values()))
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,73 @@
+'''
+Created on Oct 17, 2026
+
+@author: agent
+'''
+import unittest
+
+from path_publisher import PathPublisher
+
+class Message():
+    def __init__(self, points):
+        self.points = list(points)
+        self.new = False
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.sent = list()
+        self.built = list()
+        self.publisher = PathPublisher(self.publish, self.makeMessage, 1.0)
+
+    def publish(self, message):
+        self.sent.append((message.new, message.points))
+
+    def makeMessage(self, path):
+        self.built.append(path)
+        return Message(path)
+
+    def test_PathPublisher(self):
+        publisher = self.publisher
+
+        self.assertEqual(publisher.version, None)
+        self.assertEqual(publisher.published, 0)
+        self.assertEqual(publisher.skipped, 0)
+
+    def test_update(self):
+        publisher = self.publisher
+
+        # the first path is always new
+        self.assertTrue(publisher.update(0, (), 10.0))
+        self.assertEqual(self.sent, [(True, [])])
+
+        # nothing changed and no heartbeat yet
+        for i in range(19):
+            self.assertFalse(publisher.update(0, (), 10.0 + 0.05*i))
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(publisher.skipped, 19)
+
+        # a new version goes out right away
+        self.assertTrue(publisher.update(1, ((0,0),(1,1)), 10.5))
+        self.assertEqual(self.sent[-1], (True, [(0,0),(1,1)]))
+
+        # the heartbeat resends the same path
+        self.assertFalse(publisher.update(1, ((0,0),(1,1)), 11.4))
+        self.assertTrue(publisher.update(1, ((0,0),(1,1)), 11.5))
+        self.assertEqual(self.sent[-1], (False, [(0,0),(1,1)]))
+
+        # the message is only built once per version
+        self.assertEqual(self.built, [(), ((0,0),(1,1))])
+        self.assertEqual(publisher.published, 3)
+
+    def test_noHeartbeat(self):
+        publisher = PathPublisher(self.publish, self.makeMessage, None)
+
+        self.assertTrue(publisher.update(3, ((0,0),), 0.0))
+        self.assertFalse(publisher.update(3, ((0,0),), 1000.0))
+        self.assertTrue(publisher.update(4, (), 1000.0))
+        self.assertEqual(self.sent, [(True, [(0,0)]), (True, [])])
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,60 @@
+'''
+Created on Oct 17, 2026
+
+@author: agent
+
+Helpers shared by the planner tests
+'''
+import random
+
+def pathCost(searcher):
+    '''
+    Cost of the saved path of searcher, summed over the grid path
+    so it doesn't depend on where the map points of the cells are
+    '''
+    gridPath = searcher.gridPath
+    cost = searcher.costModel.cost
+    return sum([cost(a,b) for a,b in zip(gridPath, gridPath[1:])])
+
+def center(cell):
+    '''
+    Map point in the middle of cell on a grid
+    from (0,0) with cells 1 wide
+    '''
+    return (cell[0]+.5, cell[1]+.5)
+
+def randomGrid(searcher, density):
+    '''
+    New grid for searcher with about density of the cells blocked
+    '''
+    numCells = searcher.numCells
+    grid = searcher.createGrid()
+    for i in range(int(density*numCells*numCells)):
+        grid[random.randint(0,numCells-1)][random.randint(0,numCells-1)] = -1
+    return grid
+
+def randomQueries(searcher, density, trials=10):
+    '''
+    Yields trials tuples of (grid, start, goal) on one random grid
+    where start and goal are random cells and the goal is free.
+    The grid is the same array every time
+    '''
+    numCells = searcher.numCells
+    grid = randomGrid(searcher, density)
+    for i in range(trials):
+        start = (random.randint(0,numCells-1), random.randint(0,numCells-1))
+        goal = (random.randint(0,numCells-1), random.randint(0,numCells-1))
+        grid[goal[0]][goal[1]] = 0
+        yield (grid, start, goal)
+
+def assertValidPath(test, planner, start, goal):
+    '''
+    Fails test unless the grid path of planner runs from start to
+    goal through neighboring cells that aren't obstacles
+    '''
+    path = planner.gridPath
+    test.assertEqual(path[0], start)
+    test.assertEqual(path[-1], goal)
+    for a,b in zip(path, path[1:]):
+        test.assertTrue(b in planner.getNeighbors(a))
+        test.assertNotEqual(planner.grid[b[0]][b[1]], -1)
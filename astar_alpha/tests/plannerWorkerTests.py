@@ -0,0 +1,190 @@
+'''
+Created on Oct 17, 2026
+
+@author: agent
+'''
+import unittest
+import time
+
+import numpy as np
+
+from astar import Astar
+from anytime import AnytimeAstar
+from planner_worker import PlannerWorker
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.searcher = Astar((0,0),(10,10),10)
+        self.worker = PlannerWorker(self.searcher)
+
+    def tearDown(self):
+        self.worker.stop()
+
+    def test_PlannerWorker(self):
+        worker = self.worker
+
+        self.assertEqual(worker.latest(), (0, ()))
+        self.assertFalse(worker.step())
+
+    def test_goal(self):
+        worker = self.worker
+
+        # the goal waits until there is a position
+        worker.putGoal((3.5,0.5))
+        self.assertFalse(worker.step())
+        self.assertEqual(self.searcher.goal, None)
+
+        worker.putPose((0.5,0.5))
+        self.assertTrue(worker.step())
+        (version, path) = worker.latest()
+        self.assertEqual(version, 1)
+        self.assertEqual(path, ((0,0),(1,0),(2,0),(3,0)))
+
+        # nothing changed
+        self.assertFalse(worker.step())
+        self.assertEqual(worker.latest()[0], 1)
+
+        # the same goal again doesn't replan
+        worker.putGoal((3.5,0.5))
+        self.assertFalse(worker.step())
+
+        # the newest goal wins
+        worker.putGoal((0.5,3.5))
+        worker.putGoal((0.5,2.5))
+        self.assertTrue(worker.step())
+        self.assertEqual(worker.latest(), (2, ((0,0),(0,1),(0,2))))
+
+        # stay put
+        worker.putGoal(None)
+        self.assertTrue(worker.step())
+        self.assertEqual(worker.latest(), (3, ()))
+        self.assertEqual(self.searcher.goal, None)
+
+    def test_obstacles(self):
+        worker = self.worker
+        searcher = self.searcher
+
+        worker.putPose((0.5,0.5))
+        worker.putGoal((3.5,0.5))
+        worker.step()
+        self.assertEqual(searcher.expansions, 4)
+
+        # obstacles off the path don't replan
+        worker.putLocal(np.array([[5.5,5.5]]))
+        self.assertFalse(worker.step())
+        self.assertEqual(searcher.grid[5][5], -1)
+
+        # obstacles on the path do
+        worker.putWalls(np.array([[1.5,0.5]]))
+        worker.putLocal(np.array([[2.5,0.5]]))
+        self.assertTrue(worker.step())
+        (version, path) = worker.latest()
+        self.assertEqual(version, 2)
+        self.assertEqual(len(path), 4)
+        self.assertTrue((1,0) not in path)
+        self.assertTrue((2,0) not in path)
+
+        # a new goal and obstacles in the same step only search once
+        worker.putLocal(np.zeros((0,2)))
+        worker.putGoal((6.5,0.5))
+        self.assertTrue(worker.step())
+        self.assertEqual(worker.latest()[0], 3)
+        self.assertEqual(searcher.grid[2][0], 0)
+        self.assertEqual(searcher.grid[1][0], -1)
+
+    def test_smooth(self):
+        worker = self.worker
+        worker.smooth = True
+
+        worker.putPose((0.5,0.5))
+        worker.putGoal((9.5,4.5))
+        self.assertTrue(worker.step())
+        self.assertEqual(worker.latest(), (1, ((0.5,0.5),(9.5,4.5))))
+
+        # the obstacle blocks the straight line but not
+        # any cell of the path, so only the waypoints change
+        self.assertTrue((4,2) not in self.searcher.gridPath)
+        worker.putLocal(np.array([[4.5,2.5]]))
+        self.assertTrue(worker.step())
+        (version, path) = worker.latest()
+        self.assertEqual(version, 2)
+        self.assertTrue(len(path) > 2)
+        self.assertEqual(self.searcher.expansions, 10)
+
+    def test_stats(self):
+        worker = self.worker
+        self.assertEqual(worker.stats, None)
+
+        worker.putPose((0.5,0.5))
+        worker.putGoal((9.5,4.5))
+        self.assertTrue(worker.step())
+        self.assertEqual(worker.stats, None)
+
+        self.searcher.collectStats = True
+        worker.putGoal((9.5,9.5))
+        self.assertTrue(worker.step())
+        stats = worker.stats
+        self.assertEqual(stats['searches'], 1)
+        self.assertEqual(stats['expansions'], self.searcher.expansions)
+        self.assertTrue(stats['found'])
+        self.assertEqual(stats['obstaclesCoalesced'], 0)
+
+        # the obstacle counts come with the stats
+        worker.putLocal(np.array([[5.5,0.5]]))
+        worker.putLocal(np.array([[6.5,0.5]]))
+        worker.step()
+        self.assertEqual(worker.obstacleCounts(), {'received': 2, 'coalesced': 1, 'applied': 1})
+        self.assertEqual(worker.stats['obstaclesReceived'], 2)
+        self.assertEqual(worker.stats['obstaclesCoalesced'], 1)
+        self.assertEqual(worker.stats['obstaclesApplied'], 1)
+        stats = worker.stats
+
+        # the snapshot is a copy that later searches don't change
+        worker.putGoal((0.5,9.5))
+        self.assertTrue(worker.step())
+        self.assertEqual(stats['searches'], 1)
+        self.assertEqual(worker.stats['searches'], 2)
+
+    def test_improving(self):
+        searcher = AnytimeAstar((0,0),(40,40),40,timeBudget=-1)
+        searcher.checkInterval = 1
+        worker = PlannerWorker(searcher)
+
+        worker.putPose((0.5,0.5))
+        worker.putGoal((39.5,39.5))
+
+        steps = 0
+        while worker.improving() or steps == 0:
+            worker.step()
+            steps += 1
+            self.assertTrue(steps < 40*40*10)
+
+        self.assertTrue(searcher.converged)
+        (version, path) = worker.latest()
+        self.assertTrue(version >= 1)
+        self.assertEqual(len(path), 40)
+
+    def test_thread(self):
+        worker = self.worker
+        worker.period = 0.01
+        worker.start()
+
+        worker.putPose((0.5,0.5))
+        worker.putGoal((9.5,9.5))
+
+        deadline = time.time() + 5
+        while worker.latest()[0] == 0 and time.time() < deadline:
+            time.sleep(0.001)
+
+        (version, path) = worker.latest()
+        self.assertEqual(version, 1)
+        self.assertEqual(len(path), 10)
+
+        worker.stop()
+        self.assertEqual(worker.thread, None)
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,161 @@
+'''
+Created on Oct 17, 2026
+
+@author: agent
+'''
+import unittest
+import random
+
+import numpy as np
+
+from astar import Astar
+from smoothing import lineOfSight, removeCollinear, shortcut, smoothPath
+
+def crossesObstacle(grid, a, b):
+    '''
+    Checks the line between the centers of a and b by sampling it
+    '''
+    for i in range(1001):
+        t = i/1000.0
+        x = a[0] + .5 + t*(b[0]-a[0])
+        y = a[1] + .5 + t*(b[1]-a[1])
+        cell = (int(np.floor(x)), int(np.floor(y)))
+        if cell != a and grid[cell[0]][cell[1]] == -1:
+            return True
+    return False
+
+def crossesObstacleMap(searcher, p, q):
+    '''
+    Checks the line between the map points p and q by sampling it,
+    skipping the cell of p
+    '''
+    first = searcher.transformMapToGrid(p)
+    for i in range(1001):
+        t = i/1000.0
+        cell = searcher.transformMapToGrid((p[0] + t*(q[0]-p[0]), p[1] + t*(q[1]-p[1])))
+        if cell != first and searcher.grid[cell[0]][cell[1]] == -1:
+            return True
+    return False
+
+def followsPath(gridPath, a, b):
+    '''
+    True if the path goes from a to b in a straight line
+    '''
+    part = gridPath[gridPath.index(a):gridPath.index(b)+1]
+    return removeCollinear(part) == [a,b]
+
+class Test(unittest.TestCase):
+
+    def test_removeCollinear(self):
+        self.assertEqual(removeCollinear([]), [])
+        self.assertEqual(removeCollinear([(0,0)]), [(0,0)])
+        self.assertEqual(removeCollinear([(0,0),(1,0)]), [(0,0),(1,0)])
+
+        path = [(0,0),(1,0),(2,0),(3,1),(4,2),(4,3),(4,4)]
+        self.assertEqual(removeCollinear(path), [(0,0),(2,0),(4,2),(4,4)])
+
+        # turning back isn't a straight line
+        path = [(0,0),(1,0),(0,0)]
+        self.assertEqual(removeCollinear(path), path)
+
+    def test_lineOfSight(self):
+        grid = np.zeros((10,10), dtype=np.int8)
+        cells = grid.ravel().tolist()
+        self.assertTrue(lineOfSight(cells, 10, (0,0), (9,9)))
+        self.assertTrue(lineOfSight(cells, 10, (9,0), (0,3)))
+        self.assertTrue(lineOfSight(cells, 10, (4,4), (4,4)))
+
+        grid[2][1] = -1
+        cells = grid.ravel().tolist()
+        self.assertFalse(lineOfSight(cells, 10, (0,0), (5,3)))
+        self.assertFalse(lineOfSight(cells, 10, (5,3), (0,0)))
+        self.assertTrue(lineOfSight(cells, 10, (0,0), (5,0)))
+        self.assertTrue(lineOfSight(cells, 10, (0,1), (3,4)))
+
+        # the line from (1,1) to (3,3) passes through the
+        # corners of (2,1) and (1,2)
+        self.assertFalse(lineOfSight(cells, 10, (1,1), (3,3)))
+        self.assertFalse(lineOfSight(cells, 10, (1,2), (3,0)))
+
+        # the first cell can be an obstacle
+        self.assertTrue(lineOfSight(cells, 10, (2,1), (2,5)))
+
+    def test_shortcut(self):
+        grid = np.zeros((10,10), dtype=np.int8)
+        grid[3,0:6] = -1
+        cells = grid.ravel().tolist()
+
+        path = [(0,0),(1,1),(2,2),(2,3),(2,4),(2,5),(3,6),(4,5),(5,4),(6,3),(7,2),(8,1),(9,0)]
+        points = shortcut(cells, 10, path)
+        self.assertEqual(points[0], (0,0))
+        self.assertEqual(points[-1], (9,0))
+        self.assertTrue(len(points) < len(path))
+        for a,b in zip(points, points[1:]):
+            # the path cuts the corner of (3,5) itself
+            self.assertTrue(lineOfSight(cells, 10, a, b) or followsPath(path, a, b))
+
+    def test_random(self):
+        random.seed(16)
+
+        for density in (0.1, 0.2, 0.3):
+            searcher = Astar((0,0),(30,30),30)
+            grid = searcher.createGrid()
+            for i in range(int(density*30*30)):
+                grid[random.randint(0,29)][random.randint(0,29)] = -1
+            searcher.grid = grid
+
+            for i in range(20):
+                start = (random.randint(0,29), random.randint(0,29))
+                goal = (random.randint(0,29), random.randint(0,29))
+                searcher.computePath((start[0]+.5,start[1]+.5),(goal[0]+.5,goal[1]+.5))
+                gridPath = searcher.gridPath
+                if len(gridPath) == 0:
+                    continue
+
+                points = smoothPath(grid, gridPath)
+                self.assertEqual(points[0], gridPath[0])
+                self.assertEqual(points[-1], gridPath[-1])
+                self.assertTrue(len(points) <= len(gridPath))
+
+                # the waypoints are cells of the path in the same order
+                indices = [gridPath.index(point) for point in points]
+                self.assertEqual(indices, sorted(indices))
+
+                # a shortcut never crosses an obstacle, the rest
+                # of the lines are straight runs of the path
+                for a,b in zip(points, points[1:]):
+                    if not followsPath(gridPath, a, b):
+                        self.assertFalse(crossesObstacle(grid, a, b))
+
+    def test_published(self):
+        random.seed(17)
+
+        # the lines between the published waypoints stay out of
+        # the obstacles in the map frame too
+        searcher = Astar((-6.25,8.2),(15.75,28.2),100)
+        for i in range(200):
+            grid = searcher.createGrid()
+            for j in range(int(0.2*100*100)):
+                grid[random.randint(0,99)][random.randint(0,99)] = -1
+            start = (random.randint(0,99), random.randint(0,99))
+            goal = (random.randint(0,99), random.randint(0,99))
+            grid[start[0]][start[1]] = 0
+            grid[goal[0]][goal[1]] = 0
+            searcher.grid = grid
+
+            searcher.computePath(searcher.transformGridToMap(start), searcher.transformGridToMap(goal))
+            gridPath = searcher.gridPath
+            if len(gridPath) == 0:
+                continue
+
+            path = searcher.smoothPath()
+            points = smoothPath(grid, gridPath)
+            self.assertEqual([searcher.transformMapToGrid(point) for point in path], points)
+            for (a,b),(p,q) in zip(zip(points, points[1:]), zip(path, path[1:])):
+                if not followsPath(gridPath, a, b):
+                    self.assertFalse(crossesObstacleMap(searcher, p, q))
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -1,52 +1,224 @@
+from math import floor, hypot
+
+import numpy as np
+
+from distance_transform import euclideanDistance
+from dynamic_distance import DynamicDistanceMap
+
 class BrushFire():
     import math
-    def __init__(self, c1, c2, numCells, size=10, goal=None):
+    def __init__(self, c1, c2, numCells, size=10, goal=None, backend='wavefront', pathMode='greedy'):
         self.globalc1 = c1
         self.globalc2 = c2
         self.numCells = numCells
 
-        self.globalMap = self.createGrid(numCells)
+        # the grid geometry never changes so precompute it
+        # once instead of for every transformed point
+        self.xMin = min(c1[0],c2[0])
+        self.yMin = min(c1[1],c2[1])
+
+        # width and height of grid cells
+        self.xStep = float(abs(c1[0] - c2[0]))/numCells
+        self.yStep = float(abs(c1[1] - c2[1]))/numCells
 
         self.localMap = None
         self.localx = None
         self.localy = None
         self.size = size
+
+        # the global map is stored with a border of obstacles
+        # as wide as the local map around it, so the local map
+        # is always a slice of the padded map that doesn't have
+        # to be copied or checked against the edges of the grid
+        pad = size+1
+        self.pad = pad
+        self.paddedMap = np.ones((numCells+2*pad,numCells+2*pad), dtype=np.int8)
+        self.globalMap = self.paddedMap[pad:pad+numCells,pad:pad+numCells]
+        self.globalMap[...] = self.createGrid(numCells)
+
+        # slices of the padded map that the local map covers
+        self.window = None
+
+        # the wavefront runs on buffers that are allocated once
+        # and reused on every cycle. They have a border of one
+        # cell that never burns, so the neighbors of every cell
+        # of the local map are slices of them
+        height = 2*size+1
+        self.fireBuffer = -np.ones((height+2,height+2), dtype=np.int32)
+        self.burning = np.zeros((height+2,height+2), dtype=bool)
+        self.reached = np.zeros((height,height), dtype=bool)
+        self.unburnt = np.zeros((height,height), dtype=bool)
+
+        # result of the last brushfire over the local map, the
+        # local map itself is never written to
+        self.fireMap = None
         
         self.goal = goal
         self.robotPos = None
 
+        # greedy hops to the neighbor with the most clearance,
+        # gradient follows the gradient of a potential field that
+        # combines the clearance and the distance to the goal
+        if pathMode not in ('greedy', 'gradient'):
+            raise ValueError('unknown path mode %s' % pathMode)
+        self.pathMode = pathMode
+
+        # the potential is the distance to the goal in meters
+        # subtracted from a clearance term that is 0 at influence
+        # meters from the closest obstacle and falls to
+        # -clearanceWeight*influence at the obstacle
+        self.clearanceWeight = 2.0
+        self.influence = 1.0
+
+        # distance in meters from the center of every cell of the
+        # padded map to the goal it was computed for
+        self.goalField = None
+        self.fieldGoal = None
+
+        # counts the changes to the global map, the local map is
+        # only built again when this or the robot's cell changes
+        self.version = 0
+        self.localKey = None
+
+        # wavefront counts the 8 connected steps to the closest
+        # obstacle in the local map, euclidean uses the exact
+        # distance in meters to the closest obstacle in the
+        # global map, dynamic keeps the distances in meters up
+        # to date as obstacles are added and removed, now and
+        # then a little too far (see DynamicDistanceMap)
+        if backend not in ('wavefront', 'euclidean', 'dynamic'):
+            raise ValueError('unknown backend %s' % backend)
+        self.backend = backend
+
+        # distance from every cell of the global map to the
+        # closest obstacle, None until the euclidean backend
+        # needs it and after the global map changes. It is a
+        # slice of paddedDistances which is padded like paddedMap
+        self.distanceMap = None
+        self.paddedDistances = None
+
+        # distances for the dynamic backend, laid out like
+        # paddedMap so cell (x,y) of the global map is cell
+        # (x+pad,y+pad) of the dynamic map
+        self.dynamicMap = None
+        if backend == 'dynamic':
+            padded = numCells+2*pad
+            dynamicMap = DynamicDistanceMap(padded, padded, self.xStep, self.yStep)
+            for x,y in np.argwhere(self.paddedMap == 1).tolist():
+                dynamicMap.setObstacle(x,y)
+            self.dynamicMap = dynamicMap
+            self.distanceBuffer = np.zeros((height,height))
+
     def createGrid(self,numCells=50):
         '''
         This method uses the specified corners and the numCells to create a 2d array that will store the values used in the brushfire algorithm
         '''
-        # empty list
-        globalMap = list()
-        
-        for i in range(numCells):
-            globalMap.append(list())
-            for j in range(numCells):
-                globalMap[i].append(0) # 0 is blank
-
-        return globalMap
+        return np.zeros((numCells,numCells), dtype=np.int8) # 0 is blank
         
     def updateGlobalGrid(self, obstacles):
         '''
         This method is responsible for taking in new obstacles
         and adding them to the global obstacle list
+
+        obstacles can be a list of (x,y) tuples or an (N,2) array
+        '''
+        # transform all of the points at once and
+        # ignore the ones that aren't in the grid
+        (indices, valid) = self.transformMapToGridBatch(obstacles)
+
+        (xs,ys) = indices[valid].T
+        self.setCells(xs, ys)
+
+    def removeObstacles(self, obstacles):
+        '''
+        Clears the cells of the given obstacles in the global map
+
+        obstacles can be a list of (x,y) tuples or an (N,2) array
+        '''
+        (indices, valid) = self.transformMapToGridBatch(obstacles)
+
+        (xs,ys) = indices[valid].T
+        self.clearCells(xs, ys)
+
+    def replaceObstacles(self, obstacles):
+        '''
+        Makes the given obstacles the only ones in the global map.
+        The cells that aren't in obstacles anymore are cleared and
+        the new ones are set, so the dynamic backend only repairs
+        the distances around the cells that changed
+
+        obstacles can be a list of (x,y) tuples or an (N,2) array
+        '''
+        (indices, valid) = self.transformMapToGridBatch(obstacles)
+        indices = indices[valid]
+
+        keep = np.zeros(self.globalMap.shape, dtype=bool)
+        keep[indices[:,0],indices[:,1]] = True
+
+        (xs,ys) = np.nonzero((self.globalMap == 1) & ~keep)
+        self.clearCells(xs, ys)
+        self.setCells(indices[:,0], indices[:,1])
+
+    def setCells(self, xs, ys):
+        '''
+        Makes the cells (xs[i],ys[i]) of the global map obstacles
+        '''
+        globalMap = self.globalMap
+
+        # only the cells that aren't obstacles yet
+        new = globalMap[xs,ys] != 1
+        if not new.any():
+            return
+        (xs,ys) = (xs[new],ys[new])
+        globalMap[xs,ys] = 1
+
+        dynamicMap = self.dynamicMap
+        if dynamicMap is not None:
+            pad = self.pad
+            for x,y in zip(xs.tolist(),ys.tolist()):
+                dynamicMap.setObstacle(x+pad,y+pad)
+
+        self.distanceMap = None
+        self.version += 1
+
+    def clearCells(self, xs, ys):
+        '''
+        Makes the cells (xs[i],ys[i]) of the global map free
         '''
         globalMap = self.globalMap
-        numCells = self.numCells
 
-        for point in obstacles:
-            try:
-                # see if the point has a corresponding point in the grid
-                gridPoint = self.transformMapToGrid(point)
-                globalMap[gridPoint[0]][gridPoint[1]] = 1
-            except IndexError:
-                # if the point isn't in the grid then ignore it
-                pass
+        # only the cells that are obstacles
+        old = globalMap[xs,ys] == 1
+        if not old.any():
+            return
+        (xs,ys) = (xs[old],ys[old])
+        globalMap[xs,ys] = 0
 
-        self.globalMap = globalMap
+        dynamicMap = self.dynamicMap
+        if dynamicMap is not None:
+            pad = self.pad
+            for x,y in zip(xs.tolist(),ys.tolist()):
+                dynamicMap.removeObstacle(x+pad,y+pad)
+
+        self.distanceMap = None
+        self.version += 1
+
+    def updateLocal(self, x, y):
+        '''
+        Extracts the local map around the robot at (x,y) and runs
+        brushfire on it, unless the robot is still in the same cell
+        and the global map didn't change since the last time.
+
+        Returns True if the local map was updated
+        '''
+        key = (self.transformMapToGrid((x,y)), self.version)
+        if key == self.localKey:
+            return False
+
+        self.extractLocal(x,y)
+        self.brushfire()
+        self.localKey = key
+        return True
 
     def extractLocal(self, x, y):
         '''
@@ -55,56 +227,43 @@ class BrushFire():
         size wide and size high.
         
         This local map will be used by the brushfire algorithm.
+        It is a view of the padded global map, so the cells
+        outside of the grid are 1 and nothing is copied.
         '''
 
         # Get the robot's current position in the global grid
         self.robot = self.transformMapToGrid((x,y))
+        self.robotPos = (x,y)
 
         self.localx = (self.robot[0]-self.size-1,self.robot[0]+self.size)
         self.localy = (self.robot[1]-self.size-1,self.robot[1]+self.size)
-        
-        # will store the local map
-        localMap = list()
-
-        for i in range(self.localx[0],self.localx[1]):
-            localMap.append(list())
-            for j in range(self.localy[0],self.localy[1]):
-                if(i >= 0 and i < self.numCells and j >= 0 and j < self.numCells):
-                    localMap[-1].append(self.globalMap[i][j])
-                else:
-                    localMap[-1].append(1)
 
-        self.localMap = localMap
+        pad = self.pad
+        self.window = (slice(self.localx[0]+pad,self.localx[1]+pad),
+                       slice(self.localy[0]+pad,self.localy[1]+pad))
+        self.localMap = self.paddedMap[self.window]
 
     def transformGridToMap(self, point):
-        c1 = self.globalc1
-        c2 = self.globalc2
         numCells = self.numCells
         if(point[0] < 0 or point[0] >= numCells):
             raise IndexError
         if(point[1] < 0 or point[1] >= numCells):
             raise IndexError
 
-        # width and height of grid cells
-        xStep = abs(c1[0] - c2[0])/float(numCells)
-        yStep = abs(c1[1] - c2[1])/float(numCells)
-
-        x = xStep*point[0] + min(c1[0],c2[0])
-        y = yStep*point[1] + min(c1[1],c2[1])
+        x = self.xStep*point[0] + self.xMin
+        y = self.yStep*point[1] + self.yMin
 
         return (x,y)
 
     def transformMapToGrid(self, point):
-        c1 = self.globalc1
-        c2 = self.globalc2
+        from math import floor
         numCells = self.numCells
-        # width and height of grid cells
-        xStep = float(abs(c1[0] - c2[0]))/numCells
-        yStep = float(abs(c1[1] - c2[1]))/numCells
 
         # translate the goal point to grid space
-        xIndex = int((point[0]-min(c1[0],c2[0]))/xStep)
-        yIndex = int((point[1]-min(c1[1],c2[1]))/yStep)
+        # floor so that points just below the lower corner
+        # don't get truncated into the first cell
+        xIndex = int(floor((point[0]-self.xMin)/self.xStep))
+        yIndex = int(floor((point[1]-self.yMin)/self.yStep))
 
         # make sure the indices of the point are within
         # the specified grid dimensions
@@ -115,6 +274,27 @@ class BrushFire():
         
         return (xIndex,yIndex)
 
+    def transformMapToGridBatch(self, points):
+        '''
+        Vectorized version of transformMapToGrid.
+
+        points is an (N,2) array (or a list of (x,y) tuples) in
+        the map frame.
+
+        Returns a tuple (indices, valid) where indices is an (N,2)
+        integer array of grid coordinates and valid is a boolean
+        mask that is False for every point outside of the grid.
+        '''
+        points = np.asarray(points, dtype=np.float64).reshape(-1,2)
+
+        indices = np.empty(points.shape, dtype=np.intp)
+        indices[:,0] = np.floor((points[:,0]-self.xMin)/self.xStep)
+        indices[:,1] = np.floor((points[:,1]-self.yMin)/self.yStep)
+
+        valid = ((indices >= 0) & (indices < self.numCells)).all(axis=1)
+
+        return (indices, valid)
+
     def transformLocalToGlobal(self, point):
         '''
         Transform a point in the localMap to the corresponding
@@ -183,33 +363,115 @@ class BrushFire():
 
     def brushfire(self):
         '''
-        Given a square grid of obstacles runs brushfire and returns grid
+        Given a square grid of obstacles runs brushfire and sets
+        fireMap to the result
+
+        Every free cell gets 1 plus the number of 8 connected steps
+        to the closest obstacle. Instead of sweeping the whole grid
+        once for every value the wavefront grows out of all of the
+        obstacles at once, one ring of cells at a time for the whole
+        local map. It runs in fireBuffer, which is reused on every
+        cycle, and the local map is left alone since it is a view
+        of the global map.
+
+        The euclidean and dynamic backends fill fireMap from
+        euclideanBrushfire and dynamicBrushfire instead.
         '''
-        localMap = self.localMap
-        seenZero = True
-        # if there are no zeros seen in a loop, we are done with brushfire
+        if self.backend == 'euclidean':
+            self.euclideanBrushfire()
+            return
+        elif self.backend == 'dynamic':
+            self.dynamicBrushfire()
+            return
+
+        height = 2*self.size+1
+        maxValue = height
+        fireMap = self.fireBuffer[1:-1,1:-1]
+        np.copyto(fireMap, self.localMap)
+
+        # the cells that burnt last, the obstacles are
+        # the start of the wavefront
+        burning = self.burning
+        front = burning[1:-1,1:-1]
+        np.equal(fireMap, 1, out=front)
+
+        reached = self.reached
+        unburnt = self.unburnt
         value = 1
-        while seenZero and value <= 2*self.size+1:
-            seenZero = False
-            for r,row in enumerate(localMap):
-                for c,cell in enumerate(row):
-                    if cell == value:
-                        seenZero = True
-                        neighbors = self.getNeighbors((r,c))
-                        for pr,pc in neighbors:
-                            if localMap[pr][pc] == 0:
-                                localMap[pr][pc] += value + 1
-            value +=1
-        self.localMap = localMap
+        while value <= maxValue and front.any():
+            # the free cells next to the cells that burnt last
+            np.copyto(reached, burning[:height,:height])
+            for (dr,dc) in ((0,1),(0,2),(1,0),(1,2),(2,0),(2,1),(2,2)):
+                np.logical_or(reached, burning[dr:dr+height,dc:dc+height], out=reached)
+            np.equal(fireMap, 0, out=unburnt)
+            np.logical_and(reached, unburnt, out=front)
+
+            value += 1
+            np.copyto(fireMap, value, where=front)
+
+        self.fireMap = fireMap
+
+    def updateDistances(self):
+        '''
+        Computes the distance map of the whole global map
+        if it changed since the last time and returns it
+        '''
+        if self.distanceMap is None:
+            # the padding around the grid is made of obstacles
+            # just like the outside of the grid in extractLocal
+            distances = euclideanDistance(self.paddedMap == 1, self.xStep, self.yStep)
+
+            pad = self.pad
+            numCells = self.numCells
+            self.paddedDistances = distances
+            self.distanceMap = distances[pad:pad+numCells,pad:pad+numCells]
+        return self.distanceMap
+
+    def euclideanBrushfire(self):
+        '''
+        Sets fireMap to the distance in meters from every cell of
+        the local map to the closest obstacle, cells outside of the
+        grid are 0. It is a view of the padded distance map
+        '''
+        self.updateDistances()
+        self.fireMap = self.paddedDistances[self.window]
+
+    def dynamicBrushfire(self):
+        '''
+        Propagates the obstacles that changed since the last time
+        through the dynamic map and fills fireMap with the
+        distance in meters from every cell to the closest obstacle,
+        cells outside of the grid are 0
+        '''
+        dynamicMap = self.dynamicMap
+        dynamicMap.update()
+        squared = dynamicMap.squared
+        height = dynamicMap.height
+
+        # the dynamic map is padded like the global map
+        # so the rows of the window are slices of it
+        distanceBuffer = self.distanceBuffer
+        (xWindow,yWindow) = self.window
+        width = yWindow.stop - yWindow.start
+        for i,x in enumerate(range(xWindow.start,xWindow.stop)):
+            start = x*height + yWindow.start
+            distanceBuffer[i] = squared[start:start+width]
+        np.sqrt(distanceBuffer, out=distanceBuffer)
+
+        self.fireMap = distanceBuffer
 
     def computePath(self):
         '''
         take grid of points passed through brushfire and returns list of points
         to follow
         '''
+        if self.pathMode == 'gradient':
+            self.computeGradientPath()
+            return
+
         import math
         goal = self.goal
-        localMap = self.localMap
+        localMap = self.fireMap
         gridGoal = self.transformMapToGrid(goal)
         center = len(localMap)//2
         robot = (center,center)
@@ -229,11 +491,11 @@ class BrushFire():
                 if highestPoint is None:
                     minDist = pointDist
                     highestPoint = point
-                elif localMap[point[0]][point[1]] == localMap[highestPoint[0]][highestPoint[1]]:
+                elif localMap[point[0],point[1]] == localMap[highestPoint[0],highestPoint[1]]:
                     if pointDist < minDist:
                         minDist = pointDist
                         highestPoint = point
-                elif localMap[point[0]][point[1]] > localMap[highestPoint[0]][highestPoint[1]]:
+                elif localMap[point[0],point[1]] > localMap[highestPoint[0],highestPoint[1]]:
                     highestPoint = point
                     minDist = pointDist
             if(highestPoint == lastPoint):
@@ -251,20 +513,124 @@ class BrushFire():
         
         self.pathList = pathList
 
+    def computeGradientPath(self):
+        '''
+        Follows the gradient of the potential field from the robot
+        in steps of half a cell until it reaches the goal, leaves
+        the local map or the gradient turns around at a maximum.
+
+        The potential and its gradient are only known at the cell
+        centers, in between they are interpolated so the path can
+        go in any direction. pathList is the resulting polyline in
+        the map frame, starting after the robot's position.
+        '''
+        (xStep,yStep) = (self.xStep,self.yStep)
+        potential = self.potential()
+        (gradientX,gradientY) = np.gradient(potential, xStep, yStep)
+        (width,height) = potential.shape
+
+        # positions in the local map are in cells with the
+        # centers of the cells on whole numbers
+        localStart = (self.localx[0]+0.5,self.localy[0]+0.5)
+        def toLocal(point):
+            return ((point[0]-self.xMin)/xStep - localStart[0],
+                    (point[1]-self.yMin)/yStep - localStart[1])
+        def toMap(point):
+            return (float((point[0]+localStart[0])*xStep + self.xMin),
+                    float((point[1]+localStart[1])*yStep + self.yMin))
+
+        step = 0.5*min(xStep,yStep)
+        goal = self.goal
+        point = toLocal(self.robotPos)
+        direction = None
+
+        pathList = []
+        # a path that doesn't go back on itself can't be longer
+        # than going around the whole local map
+        for i in range(int(8*(width+height)*min(xStep,yStep)/step)):
+            current = toMap(point)
+            if hypot(goal[0]-current[0], goal[1]-current[1]) <= step:
+                pathList.append(goal)
+                break
+
+            gx = interpolate(gradientX, point)
+            gy = interpolate(gradientY, point)
+            length = hypot(gx,gy)
+            if length == 0:
+                break
+
+            # at a maximum of the potential the gradient turns
+            # around and the path would only go back and forth
+            lastDirection = direction
+            direction = (gx/length,gy/length)
+            if (lastDirection is not None and
+                direction[0]*lastDirection[0] + direction[1]*lastDirection[1] < 0):
+                break
+
+            point = (point[0] + step*direction[0]/xStep,
+                     point[1] + step*direction[1]/yStep)
+            if not (0 <= point[0] <= width-1 and 0 <= point[1] <= height-1):
+                break
+            pathList.append(toMap(point))
+
+        self.pathList = pathList
+
+    def potential(self):
+        '''
+        The potential field over the local map, a clearance term from
+        brushfire minus the distance to the goal.
+
+        The clearance term falls with the square of how far a cell
+        is inside of influence meters of an obstacle, so the field
+        stays smooth where the clearance stops counting and the path
+        can slide around obstacles instead of stopping at the edge
+        '''
+        localMap = self.fireMap
+        if self.backend == 'wavefront':
+            # steps to the closest obstacle plus 1, and 0
+            # if there are no obstacles in the local map
+            clearance = (localMap - 1.0)*min(self.xStep,self.yStep)
+            clearance[localMap == 0] = self.influence
+        else:
+            clearance = np.array(localMap, dtype=np.float64)
+        influence = self.influence
+        closeness = np.maximum(influence - clearance, 0)
+        clearanceTerm = -self.clearanceWeight/influence*closeness*closeness
+
+        goalField = self.updateGoalField()
+        return clearanceTerm - goalField[self.window]
+
+    def updateGoalField(self):
+        '''
+        Computes the distance from every cell of the padded
+        map to the goal if the goal changed and returns it
+        '''
+        goal = self.goal
+        if self.goalField is None or self.fieldGoal != goal:
+            pad = self.pad
+            (width,height) = self.paddedMap.shape
+            x = (np.arange(width) - pad + 0.5)*self.xStep + self.xMin
+            y = (np.arange(height) - pad + 0.5)*self.yStep + self.yMin
+            self.goalField = np.hypot(x[:,np.newaxis] - goal[0], y[np.newaxis,:] - goal[1])
+            self.fieldGoal = goal
+        return self.goalField
+
     def updateGoal(self, goal):
         '''
         Will save the given goal point to the class
         '''
         self.goal = goal
+        if self.pathMode == 'gradient':
+            self.updateGoalField()
 
     def __str__(self):
         '''
-        Displays the current local map as ASCII art
+        Displays the result of the last brushfire as ASCII art
         '''
         printSpacedCharacter = self.printSpacedCharacter
         numSpaces = 4
 
-        if(self.localMap is None):
+        if(self.fireMap is None):
             return 'None'
 
         display = ' '*numSpaces
@@ -284,7 +650,7 @@ class BrushFire():
         display = display + '\n'
 
         # print the weights
-        for i,row in enumerate(self.localMap):
+        for i,row in enumerate(self.fireMap):
             for j,cell in enumerate(row):
                 # print row heading
                 if(j == 0):
@@ -302,8 +668,27 @@ class BrushFire():
         Takes in a number of spaces and chars and outputs
         the character with the correct spacing
         '''
-        spacedString = str(char)
+        if isinstance(char, float):
+            spacedString = '%.1f' % char
+        else:
+            spacedString = str(char)
 
         spacedString += (numSpaces - len(spacedString))*' '
         
         return spacedString
+
+def interpolate(field, point):
+    '''
+    Bilinear interpolation of the 2d array field at the point
+    (x,y), which has to be inside of the array
+    '''
+    (width,height) = field.shape
+    x0 = min(int(floor(point[0])), width-2)
+    y0 = min(int(floor(point[1])), height-2)
+    x0 = max(x0, 0)
+    y0 = max(y0, 0)
+    dx = point[0] - x0
+    dy = point[1] - y0
+
+    return ((1-dx)*(1-dy)*field[x0,y0] + dx*(1-dy)*field[x0+1,y0] +
+            (1-dx)*dy*field[x0,y0+1] + dx*dy*field[x0+1,y0+1])
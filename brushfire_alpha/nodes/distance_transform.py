@@ -0,0 +1,125 @@
+import numpy as np
+
+def lowerEnvelope(f, weight=1.0):
+    '''
+    One dimensional squared distance transform along the last axis
+    of f, every row is transformed at the same time.
+
+    Returns d where d[...,q] = min over v of weight*(q-v)**2 + f[...,v]
+    and inf where every f[...,v] of the row is inf
+
+    This is the lower envelope of parabolas from Felzenszwalb and
+    Huttenlocher. Each row keeps its own stack of parabolas in v
+    and z, the loops run over the positions along the row and the
+    rows are handled with numpy. Positions where f is inf are never
+    put on the stack.
+    '''
+    f = np.asarray(f, dtype=np.float64)
+    shape = f.shape
+    n = shape[-1]
+    f = f.reshape(-1, n)
+    numLines = f.shape[0]
+    lines = np.arange(numLines)
+    finite = np.isfinite(f)
+
+    # v holds the positions of the parabolas in the envelope and
+    # parabola k is the lowest between z[k] and z[k+1], k is the
+    # top of the stack and -1 when the stack is empty. v and z are
+    # used through flat indices, which numpy gathers faster
+    v = np.zeros(numLines*n, dtype=np.intp)
+    z = np.empty(numLines*(n+1), dtype=np.float64)
+    k = np.empty(numLines, dtype=np.intp)
+    k.fill(-1)
+
+    # f(v) + weight*v**2 for every position
+    positions = np.arange(n, dtype=np.float64)
+    lifted = (f + weight*positions*positions).ravel()
+    flat = f.ravel()
+
+    # an empty stack makes a garbage intersection
+    # that is thrown away right after
+    errors = np.seterr(divide='ignore', invalid='ignore')
+    try:
+        for q in range(n):
+            active = lines[finite[:,q]]
+            if len(active) == 0:
+                continue
+            vBase = active*n
+            zBase = active*(n+1)
+            liftedQ = lifted[vBase + q]
+            top = k[active]
+            while True:
+                empty = top < 0
+                vk = v[vBase + top]
+                s = (liftedQ - lifted[vBase + vk])/(2*weight*(q - vk))
+                s[empty] = -np.inf
+                # the parabola at q hides the top of the stack
+                hidden = s <= z[zBase + top]
+                hidden &= ~empty
+                if not hidden.any():
+                    break
+                top[hidden] -= 1
+            top += 1
+            v[vBase + top] = q
+            z[zBase + top] = s
+            z[zBase + top + 1] = np.inf
+            k[active] = top
+    finally:
+        np.seterr(**errors)
+
+    d = np.empty((numLines, n), dtype=np.float64)
+    d.fill(np.inf)
+    active = lines[k >= 0]
+    vBase = active*n
+    zBase = active*(n+1) + 1
+    top = np.zeros(len(active), dtype=np.intp)
+    for q in range(n):
+        while True:
+            passed = z[zBase + top] < q
+            if not passed.any():
+                break
+            top[passed] += 1
+        vk = v[vBase + top]
+        d[active,q] = weight*(q - vk)*(q - vk) + flat[vBase + vk]
+
+    return d.reshape(shape)
+
+def lineDistance(obstacles, weight=1.0):
+    '''
+    Squared distance along the last axis of the boolean array
+    obstacles to the closest obstacle in the same row, times weight.
+    inf for rows without obstacles.
+
+    With only obstacles and free cells there are no parabolas to
+    compare, the closest obstacles before and after every cell are
+    found with running maximums and minimums instead.
+    '''
+    n = obstacles.shape[-1]
+    positions = np.arange(n, dtype=np.float64)
+
+    before = np.where(obstacles, positions, -np.inf)
+    before = np.maximum.accumulate(before, axis=-1)
+
+    after = np.where(obstacles, positions, np.inf)
+    after = np.minimum.accumulate(after[...,::-1], axis=-1)[...,::-1]
+
+    distance = np.minimum(positions - before, after - positions)
+    return weight*distance*distance
+
+def euclideanDistance(obstacles, xStep=1.0, yStep=1.0):
+    '''
+    Exact Euclidean distance from the center of every cell to the
+    center of the closest obstacle cell.
+
+    obstacles is a 2d boolean array indexed [x][y], xStep and yStep
+    are the width and height of a cell. Cells where obstacles is
+    True have a distance of 0. If there are no obstacles at all
+    every distance is inf.
+    '''
+    obstacles = np.asarray(obstacles, dtype=bool)
+
+    # along y first, then along x on the result
+    f = lineDistance(obstacles, yStep*yStep)
+    f = lowerEnvelope(f.T, xStep*xStep).T
+
+    return np.sqrt(f)
@@ -10,10 +10,12 @@ from geometry_msgs.msg._PoseStamped import PoseStamped as PoseStampedMsg
 from msg_alpha.msg._PointList import PointList as PointListMsg
 from msg_alpha.msg._Goal import Goal as GoalMsg
 
+import numpy as np
+
 from brushfire import BrushFire
 
 from math import ceil, floor, sqrt
-from threading import Timer
+from threading import Lock, Timer
 
 RATE = 20
 
@@ -26,6 +28,11 @@ pointList = PointListMsg()
 
 brush = None
 
+# newest obstacles that the main loop hasn't applied yet,
+# the callback and the main loop swap it under obstaclesLock
+obstacles = None
+obstaclesLock = Lock()
+
 def goalCallback(data):
     global brush
     
@@ -33,19 +40,22 @@ def goalCallback(data):
     if((brush.goal is None or (brush.goal[0] != data.goal.x or brush.goal[1] != data.goal.y)) and not data.none):
         if(brush is None):
             return
-        brush.goal = (data.goal.x,data.goal.y)
+        brush.updateGoal((data.goal.x,data.goal.y))
         print "Updated goal to (%f, %f)" % (data.goal.x,data.goal.y)
 
 def obstaclesCallback(data):
-    global brush
+    '''
+    Saves the obstacles for the main loop, only the newest message
+    is applied so the global map is never changed during a cycle
+    '''
+    global obstacles
 
     if(brush is None or position is None):
         return
-    
-    obstacles = list()
-    for point in data.cells:
-        obstacles.append((point.x,point.y))
-        brush.updateGlobalGrid(obstacles)
+
+    cells = np.array([(point.x,point.y) for point in data.cells], dtype=np.float64)
+    with obstaclesLock:
+        obstacles = cells
 
 def poseCallback(pose):
     global position
@@ -61,6 +71,7 @@ def main():
     global brush
     global position
     global pointList
+    global obstacles
 
     rospy.init_node('brushfire_alpha_main')
 
@@ -68,7 +79,25 @@ def main():
     corner2 = (15.75,28.2)
     numCells = 100
 
-    brush = BrushFire(corner1,corner2,numCells,size=15)
+    # backend selects how the clearance of every cell is found
+    # wavefront counts the steps to the closest obstacle nearby
+    # euclidean uses the exact distance in meters over the whole map
+    # dynamic keeps the distances in meters up to date as obstacles arrive,
+    # now and then a small fraction of a cell too far
+    if rospy.has_param('backend'):
+        backend = rospy.get_param('backend')
+    else:
+        backend = 'wavefront'
+
+    # pathMode selects how the path is taken from the brushfire map
+    # greedy hops to the neighbor with the most clearance
+    # gradient follows a potential field of clearance and goal distance
+    if rospy.has_param('pathMode'):
+        pathMode = rospy.get_param('pathMode')
+    else:
+        pathMode = 'greedy'
+
+    brush = BrushFire(corner1,corner2,numCells,size=15,backend=backend,pathMode=pathMode)
     naptime = rospy.Rate(RATE)
 
     print "corner1: "
@@ -80,6 +109,10 @@ def main():
     print "numCels: "
     print numCells
     print ""
+    print "backend: %s" % backend
+    print ""
+    print "pathMode: %s" % pathMode
+    print ""
 
     rospy.Subscriber('goal_point',GoalMsg,goalCallback)
     rospy.Subscriber('/costmap_alpha/costmap/obstacles', GridCellsMsg,obstaclesCallback)
@@ -91,15 +124,29 @@ def main():
 
     t = Timer(2.0, resetPath)
     t.start()
+
+    # goal the last path was computed for
+    pathGoal = None
     while not rospy.is_shutdown():
+        with obstaclesLock:
+            update = obstacles
+            obstacles = None
+
+        # every message holds all of the obstacles of the costmap,
+        # so the cells that aren't in it anymore were cleared
+        if update is not None:
+            brush.replaceObstacles(update)
+
         if(position is None or brush is None or brush.goal is None):
             naptime.sleep()
             continue
 
+        # only run brushfire and compute the path when the robot
+        # moved to another cell, the map changed or the goal changed
+        if brush.updateLocal(position.x,position.y) or brush.goal != pathGoal:
+            brush.computePath()
+            pathGoal = brush.goal
 
-        brush.extractLocal(position.x,position.y)
-        brush.brushfire()
-        brush.computePath()
         pointList.points = []
         for point in brush.pathList:
             pathPoint = PointMsg()
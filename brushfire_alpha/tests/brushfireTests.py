@@ -0,0 +1,301 @@
+'''
+Created on Oct 17, 2026
+
+@author: agent
+'''
+import unittest
+import random
+
+import numpy as np
+
+from brushfire import BrushFire
+
+def sweepBrushfire(localMap, size):
+    '''
+    The original brushfire that sweeps the whole grid once for
+    every value, kept to check the wavefront against
+    '''
+    localMap = np.array(localMap).tolist()
+    height = 2*size+1
+    seenZero = True
+    value = 1
+    while seenZero and value <= 2*size+1:
+        seenZero = False
+        for r,row in enumerate(localMap):
+            for c,cell in enumerate(row):
+                if cell == value:
+                    seenZero = True
+                    for dr in (-1,0,1):
+                        for dc in (-1,0,1):
+                            pr = r + dr
+                            pc = c + dc
+                            if 0 <= pr < height and 0 <= pc < height and localMap[pr][pc] == 0:
+                                localMap[pr][pc] += value + 1
+        value += 1
+    return localMap
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.brush = BrushFire((0,0),(10,10),20,5)
+
+    def test_brushfire(self):
+        brush = self.brush
+
+        # a single obstacle in the middle of the window
+        brush.localMap = brush.createGrid(11)
+        brush.localMap[5][5] = 1
+        brush.brushfire()
+        for r in range(11):
+            for c in range(11):
+                self.assertEqual(brush.fireMap[r][c], 1 + max(abs(r-5),abs(c-5)))
+
+        # the local map isn't written to
+        self.assertEqual(brush.localMap.sum(), 1)
+
+        # nothing to grow from, the buffers are reused
+        fireMap = brush.fireMap
+        brush.localMap = brush.createGrid(11)
+        brush.brushfire()
+        self.assertEqual(brush.fireMap.tolist(), brush.createGrid(11).tolist())
+        self.assertTrue(brush.fireMap.base is fireMap.base)
+
+    def test_sweep(self):
+        random.seed(21)
+
+        for size in (1,2,5,10):
+            brush = BrushFire((0,0),(10,10),20,size)
+            height = 2*size+1
+            for density in (0.0,0.02,0.1,0.3,0.6):
+                for i in range(5):
+                    localMap = brush.createGrid(height)
+                    for r in range(height):
+                        for c in range(height):
+                            if random.random() < density:
+                                localMap[r][c] = 1
+
+                    expected = sweepBrushfire(localMap, size)
+                    brush.localMap = localMap
+                    brush.brushfire()
+                    self.assertEqual(brush.fireMap.tolist(), expected)
+
+    def test_extractLocal(self):
+        brush = self.brush
+        brush.updateGlobalGrid([(0.25,0.25),(5.25,5.25)])
+        brush.extractLocal(5,5)
+        self.assertEqual(brush.localMap.shape, (11,11))
+        self.assertEqual(brush.localMap[0][0], 0)
+        self.assertEqual(brush.localMap[6][6], 1)
+
+        # the local map is a view of the global map
+        self.assertTrue(brush.localMap.base is brush.paddedMap)
+        brush.updateGlobalGrid([(4.75,4.75)])
+        self.assertEqual(brush.localMap[5][5], 1)
+
+        expected = sweepBrushfire(brush.localMap, 5)
+        brush.brushfire()
+        self.assertEqual(brush.fireMap.tolist(), expected)
+
+        # brushfire doesn't write to the global map
+        # and the local map is still a view of it
+        self.assertEqual(brush.globalMap.sum(), 3)
+        self.assertTrue(brush.localMap.base is brush.paddedMap)
+
+        # the cells outside of the grid are obstacles
+        brush.extractLocal(0.25,9.75)
+        self.assertEqual(brush.localMap[:6].tolist(), [[1]*11]*6)
+        self.assertEqual(brush.localMap[:,7:].tolist(), [[1]*4]*11)
+        self.assertEqual(brush.localMap[6][7], 1)
+        self.assertEqual(brush.localMap[6][6], 0)
+
+    def test_euclidean(self):
+        self.assertRaises(ValueError, BrushFire, (0,0), (10,10), 20, 5, None, 'chessboard')
+
+        brush = BrushFire((0,0),(10,10),20,5,backend='euclidean')
+        brush.updateGlobalGrid([(5.25,5.25)])
+        brush.extractLocal(5,5)
+        brush.brushfire()
+        self.assertTrue(brush.distanceMap is not None)
+
+        # the window starts at cell (4,4) and the obstacle is
+        # in cell (10,10) with cells 0.5 wide
+        fireMap = brush.fireMap
+        self.assertEqual(len(fireMap), 11)
+        self.assertEqual(fireMap[6][6], 0)
+        self.assertAlmostEqual(fireMap[6][9], 1.5)
+        self.assertAlmostEqual(fireMap[3][2], 0.5*5)
+
+        # the distance map is only computed again after a change
+        distanceMap = brush.distanceMap
+        brush.brushfire()
+        self.assertTrue(brush.distanceMap is distanceMap)
+        brush.updateGlobalGrid([(20.5,20.5)])
+        self.assertTrue(brush.distanceMap is distanceMap)
+        brush.updateGlobalGrid([(0.25,9.75)])
+        self.assertEqual(brush.distanceMap, None)
+
+        # the outside of the grid is an obstacle
+        brush.extractLocal(0.25,0.25)
+        brush.brushfire()
+        self.assertEqual(brush.fireMap[5][5], 0)
+        self.assertAlmostEqual(brush.fireMap[6][6], 0.5)
+
+        self.assertTrue('0.5' in str(brush))
+
+    def test_dynamic(self):
+        random.seed(23)
+
+        euclidean = BrushFire((0,0),(10,10),20,5,backend='euclidean')
+        dynamic = BrushFire((0,0),(10,10),20,5,backend='dynamic')
+
+        # the same distances as the exact transform, up to the
+        # small errors of following the closest obstacles
+        for i in range(10):
+            obstacles = [(random.random()*10,random.random()*10) for j in range(10)]
+            removed = obstacles[:3]
+            for brush in (euclidean,dynamic):
+                brush.updateGlobalGrid(obstacles)
+                brush.removeObstacles(removed)
+                brush.extractLocal(5,5)
+                brush.brushfire()
+            self.assertEqual(dynamic.globalMap.tolist(), euclidean.globalMap.tolist())
+            self.assertTrue(np.allclose(dynamic.fireMap, euclidean.fireMap, atol=0.05))
+
+        # the outside of the grid is an obstacle
+        dynamic.extractLocal(0.25,0.25)
+        dynamic.brushfire()
+        self.assertEqual(dynamic.fireMap[5][5], 0)
+        self.assertEqual(dynamic.fireMap[0][0], 0)
+
+    def test_replaceObstacles(self):
+        random.seed(24)
+
+        # centers of different cells, the last ones come in later
+        cells = random.sample(range(20*20), 35)
+        obstacles = [(0.5*(cell//20)+0.25,0.5*(cell%20)+0.25) for cell in cells]
+        later = obstacles[20:]
+        obstacles = obstacles[:20]
+
+        brush = BrushFire((0,0),(10,10),20,5,backend='dynamic')
+        brush.replaceObstacles(obstacles)
+        self.assertEqual(brush.globalMap.sum(), 20)
+        version = brush.version
+
+        # the same obstacles again don't change anything
+        brush.replaceObstacles(obstacles)
+        self.assertEqual(brush.version, version)
+
+        # the missing ones are cleared and the distances follow
+        for i in range(5):
+            obstacles = obstacles[3:] + later[3*i:3*i+3]
+            brush.replaceObstacles(obstacles)
+
+            fresh = BrushFire((0,0),(10,10),20,5,backend='dynamic')
+            fresh.updateGlobalGrid(obstacles)
+            self.assertEqual(brush.globalMap.tolist(), fresh.globalMap.tolist())
+            for backend in (brush,fresh):
+                backend.extractLocal(5,5)
+                backend.brushfire()
+            self.assertEqual(brush.fireMap.tolist(), fresh.fireMap.tolist())
+
+    def test_updateLocal(self):
+        brush = self.brush
+        self.assertEqual(brush.version, 0)
+
+        self.assertTrue(brush.updateLocal(5,5))
+        localMap = brush.localMap
+        self.assertFalse(brush.updateLocal(5.1,5.1))
+        self.assertTrue(brush.localMap is localMap)
+
+        # outside of the grid or already there
+        brush.updateGlobalGrid([(11,11),(-1,0)])
+        self.assertEqual(brush.version, 0)
+        brush.removeObstacles([(5.25,5.25)])
+        self.assertEqual(brush.version, 0)
+
+        brush.updateGlobalGrid([(5.25,5.25)])
+        self.assertEqual(brush.version, 1)
+        self.assertTrue(brush.updateLocal(5.1,5.1))
+        self.assertEqual(brush.localMap[6][6], 1)
+
+        brush.updateGlobalGrid([(5.25,5.25)])
+        self.assertFalse(brush.updateLocal(5.1,5.1))
+
+        brush.removeObstacles([(5.25,5.25)])
+        self.assertEqual(brush.version, 2)
+        self.assertEqual(brush.globalMap[10][10], 0)
+        self.assertTrue(brush.updateLocal(5.1,5.1))
+        self.assertEqual(brush.localMap[6][6], 0)
+
+        # moved to the next cell
+        self.assertTrue(brush.updateLocal(5.6,5.1))
+
+    def test_gradientPath(self):
+        self.assertRaises(ValueError, BrushFire, (0,0), (10,10), 20, 5, None, 'wavefront', 'straight')
+
+        for backend in ('wavefront','euclidean','dynamic'):
+            brush = BrushFire((0,0),(10,10),20,8,backend=backend,pathMode='gradient')
+            brush.updateGoal((6.25,6.75))
+            brush.updateLocal(3.25,5.25)
+            brush.computePath()
+
+            # without obstacles close by the path stays within a
+            # tenth of a cell of the straight line to the goal and
+            # moves in steps of half a cell
+            path = brush.pathList
+            self.assertTrue(len(path) > 10)
+            self.assertEqual(path[-1], (6.25,6.75))
+            last = (3.25,5.25)
+            for point in path:
+                self.assertTrue(np.hypot(point[0]-last[0],point[1]-last[1]) <= 0.25 + 1e-9)
+                offLine = abs((point[0]-3.25) - (point[1]-5.25)*2.0)/np.sqrt(5)
+                self.assertTrue(offLine < 0.05)
+                last = point
+
+    def test_gradientObstacle(self):
+        brush = BrushFire((0,0),(10,10),20,8,backend='euclidean',pathMode='gradient')
+        brush.updateGlobalGrid([(5.25,4.25),(5.25,4.6)])
+        brush.updateGoal((6.25,5.25))
+        brush.updateLocal(3.25,5.25)
+        brush.computePath()
+
+        # the path bends away from the obstacle below
+        # the straight line and comes back to the goal
+        path = brush.pathList
+        self.assertEqual(path[-1], (6.25,5.25))
+        self.assertTrue(max([y for x,y in path]) > 5.5)
+        for x,y in path:
+            self.assertTrue(np.hypot(x-5.25,y-4.75) > 0.7)
+
+        # a wall across the way is a maximum of the potential
+        brush.updateGlobalGrid([(5.25,5.25),(5.25,5.75),(5.25,6.25)])
+        brush.updateLocal(3.25,5.25)
+        brush.computePath()
+        path = brush.pathList
+        self.assertTrue(len(path) > 0)
+        for x,y in path:
+            self.assertTrue(x < 5)
+
+    def test_goalField(self):
+        brush = BrushFire((0,0),(10,10),20,5,pathMode='gradient')
+        self.assertEqual(brush.goalField, None)
+
+        brush.updateGoal((5.25,5.25))
+        goalField = brush.goalField
+        self.assertEqual(goalField.shape, brush.paddedMap.shape)
+        self.assertEqual(goalField[10+6][10+6], 0)
+        self.assertAlmostEqual(goalField[6][10+6], 5)
+
+        # only computed again for a new goal
+        brush.updateGoal((5.25,5.25))
+        self.assertTrue(brush.goalField is goalField)
+
+        brush.goal = (5.25,7.25)
+        brush.updateLocal(5.25,5.25)
+        brush.computePath()
+        self.assertTrue(brush.goalField is not goalField)
+        self.assertEqual(brush.pathList[-1], (5.25,7.25))
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
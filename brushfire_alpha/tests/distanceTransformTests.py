@@ -0,0 +1,64 @@
+'''
+Created on Oct 17, 2026
+
+@author: agent
+'''
+import unittest
+
+import numpy as np
+
+from distance_transform import euclideanDistance, lineDistance, lowerEnvelope
+
+def bruteForce(obstacles, xStep, yStep):
+    '''
+    Distance from every cell to every obstacle, keeping the smallest
+    '''
+    (xs,ys) = np.nonzero(obstacles)
+    distances = np.empty(obstacles.shape)
+    distances.fill(np.inf)
+    for x in range(obstacles.shape[0]):
+        for y in range(obstacles.shape[1]):
+            if len(xs) > 0:
+                distances[x][y] = np.sqrt(((xs-x)*xStep)**2 + ((ys-y)*yStep)**2).min()
+    return distances
+
+class Test(unittest.TestCase):
+
+    def test_lowerEnvelope(self):
+        f = np.array([[np.inf,4,np.inf,np.inf,0,np.inf],
+                      [np.inf,np.inf,np.inf,np.inf,np.inf,np.inf],
+                      [1,np.inf,np.inf,np.inf,np.inf,2]])
+        d = lowerEnvelope(f, 2.0)
+        for r in range(3):
+            for q in range(6):
+                expected = min([2.0*(q-v)**2 + f[r][v] for v in range(6)])
+                self.assertEqual(d[r][q], expected)
+
+    def test_lineDistance(self):
+        obstacles = np.array([[False,True,False,False,False,True,False],
+                              [False,False,False,False,False,False,False]])
+        d = lineDistance(obstacles, 0.5)
+        self.assertEqual(d[0].tolist(), [0.5,0,0.5,2,0.5,0,0.5])
+        self.assertTrue(np.isinf(d[1]).all())
+
+    def test_euclideanDistance(self):
+        random = np.random.RandomState(22)
+        for (width,height) in ((1,1),(1,9),(7,3),(20,25)):
+            for density in (0.0,0.01,0.1,0.5,1.0):
+                obstacles = random.random_sample((width,height)) < density
+                d = euclideanDistance(obstacles, 0.22, 0.2)
+                expected = bruteForce(obstacles, 0.22, 0.2)
+                self.assertEqual(d.shape, (width,height))
+                self.assertTrue(np.allclose(d, expected))
+
+        # one obstacle in the corner
+        obstacles = np.zeros((5,5), dtype=bool)
+        obstacles[0][0] = True
+        d = euclideanDistance(obstacles)
+        self.assertEqual(d[0][0], 0)
+        self.assertEqual(d[3][4], 5)
+        self.assertAlmostEqual(d[4][4], np.sqrt(32))
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
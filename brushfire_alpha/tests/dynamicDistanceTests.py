@@ -0,0 +1,158 @@
+'''
+Created on Oct 17, 2026
+
+@author: agent
+'''
+import unittest
+import random
+
+import numpy as np
+
+from distance_transform import euclideanDistance
+from dynamic_distance import DynamicDistanceMap
+
+def bruteForce(occupied, xStep, yStep):
+    '''
+    Distance from every cell to every obstacle, keeping the smallest
+    '''
+    (xs,ys) = np.nonzero(occupied)
+    distances = np.empty(occupied.shape)
+    distances.fill(np.inf)
+    for x in range(occupied.shape[0]):
+        for y in range(occupied.shape[1]):
+            if len(xs) > 0:
+                distances[x][y] = np.sqrt(((xs-x)*xStep)**2 + ((ys-y)*yStep)**2).min()
+    return distances
+
+def distances(dynamicMap):
+    return np.array([[dynamicMap.distance(x,y) for y in range(dynamicMap.height)]
+                     for x in range(dynamicMap.width)])
+
+class Test(unittest.TestCase):
+
+    def test_setObstacle(self):
+        dynamicMap = DynamicDistanceMap(5,4)
+        self.assertEqual(dynamicMap.update(), 0)
+        self.assertEqual(dynamicMap.distance(2,2), float('inf'))
+
+        self.assertTrue(dynamicMap.setObstacle(0,0))
+        self.assertFalse(dynamicMap.setObstacle(0,0))
+        self.assertEqual(dynamicMap.update(), 20)
+        self.assertEqual(dynamicMap.distance(0,0), 0)
+        self.assertEqual(dynamicMap.distance(4,3), 5)
+
+        # only the cells that are closer to the new obstacle change
+        self.assertTrue(dynamicMap.setObstacle(4,3))
+        self.assertTrue(dynamicMap.update() < 20)
+        self.assertEqual(dynamicMap.distance(4,3), 0)
+        self.assertEqual(dynamicMap.distance(4,0), 3)
+        self.assertEqual(dynamicMap.distance(1,1), np.sqrt(2))
+
+    def test_removeObstacle(self):
+        dynamicMap = DynamicDistanceMap(5,4,2.0,1.0)
+        self.assertFalse(dynamicMap.removeObstacle(1,1))
+
+        dynamicMap.setObstacle(1,1)
+        dynamicMap.setObstacle(4,1)
+        dynamicMap.update()
+        self.assertEqual(dynamicMap.distance(2,1), 2)
+        self.assertEqual(dynamicMap.distance(3,1), 2)
+
+        self.assertTrue(dynamicMap.removeObstacle(1,1))
+        dynamicMap.update()
+        self.assertEqual(dynamicMap.distance(1,1), 6)
+        self.assertEqual(dynamicMap.distance(2,1), 4)
+        self.assertEqual(dynamicMap.distance(3,1), 2)
+
+        # nothing left
+        dynamicMap.removeObstacle(4,1)
+        dynamicMap.update()
+        self.assertTrue(np.isinf(distances(dynamicMap)).all())
+
+    def test_maxDistance(self):
+        dynamicMap = DynamicDistanceMap(10,1,maxDistance=3)
+        dynamicMap.setObstacle(0,0)
+        dynamicMap.update()
+        self.assertEqual(dynamicMap.distance(3,0), 3)
+        self.assertEqual(dynamicMap.distance(4,0), float('inf'))
+
+    def test_random(self):
+        random.seed(23)
+
+        for i in range(20):
+            width = random.randint(1,25)
+            height = random.randint(1,25)
+            (xStep,yStep) = random.choice([(1.0,1.0),(0.22,0.2)])
+
+            dynamicMap = DynamicDistanceMap(width,height,xStep,yStep)
+            occupied = np.zeros((width,height), dtype=bool)
+            for j in range(10):
+                for k in range(random.randint(0,15)):
+                    x = random.randrange(width)
+                    y = random.randrange(height)
+                    if random.random() < 0.6:
+                        dynamicMap.setObstacle(x,y)
+                        occupied[x][y] = True
+                    else:
+                        dynamicMap.removeObstacle(x,y)
+                        occupied[x][y] = False
+                dynamicMap.update()
+                result = distances(dynamicMap)
+
+                # the same as adding the obstacles to a new map
+                fresh = DynamicDistanceMap(width,height,xStep,yStep)
+                for x,y in zip(*np.nonzero(occupied)):
+                    fresh.setObstacle(x,y)
+                fresh.update()
+                self.assertEqual(result.tolist(), distances(fresh).tolist())
+
+                # following the closest obstacle from cell to cell
+                # can miss the exact closest one, but never by much
+                exact = euclideanDistance(occupied,xStep,yStep)
+                self.assertEqual(np.isinf(result).tolist(), np.isinf(exact).tolist())
+                finite = np.isfinite(exact)
+                self.assertTrue((result[finite] >= exact[finite] - 1e-9).all())
+                self.assertTrue((result[finite] <= exact[finite] + 0.1*max(xStep,yStep)).all())
+
+    def test_errorBound(self):
+        random.seed(24)
+
+        # the distances are never too short and only ever too long
+        # by a small fraction of a cell, after any sequence of
+        # obstacles coming and going
+        wrong = 0
+        total = 0
+        for i in range(200):
+            width = random.randint(5,25)
+            height = random.randint(5,25)
+            (xStep,yStep) = random.choice([(1.0,1.0),(0.22,0.2),(0.5,0.5)])
+
+            dynamicMap = DynamicDistanceMap(width,height,xStep,yStep)
+            occupied = np.zeros((width,height), dtype=bool)
+            for j in range(6):
+                for k in range(random.randint(0,6)):
+                    x = random.randrange(width)
+                    y = random.randrange(height)
+                    if random.random() < 0.6:
+                        dynamicMap.setObstacle(x,y)
+                        occupied[x][y] = True
+                    else:
+                        dynamicMap.removeObstacle(x,y)
+                        occupied[x][y] = False
+                dynamicMap.update()
+
+            result = distances(dynamicMap)
+            exact = bruteForce(occupied,xStep,yStep)
+            self.assertEqual(np.isinf(result).tolist(), np.isinf(exact).tolist())
+            finite = np.isfinite(exact)
+            self.assertTrue((result[finite] >= exact[finite] - 1e-9).all())
+            self.assertTrue((result[finite] <= exact[finite] + 0.1*max(xStep,yStep)).all())
+            wrong += (result[finite] > exact[finite] + 1e-9).sum()
+            total += finite.sum()
+
+        # and that is rare
+        self.assertTrue(wrong <= 0.001*total)
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()